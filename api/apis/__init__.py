@@ -3,6 +3,7 @@ from flask_restplus import Api
 from .openmp import api as openmp_namespace
 from .openacc import api as openacc_namespace
 from .compiler import api as compiler_namespace
+from .jobs import api as jobs_namespace
 
 
 api = Api(
@@ -15,3 +16,4 @@ api = Api(
 api.add_namespace(openmp_namespace)
 api.add_namespace(openacc_namespace)
 api.add_namespace(compiler_namespace)
+api.add_namespace(jobs_namespace)
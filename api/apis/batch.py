@@ -0,0 +1,115 @@
+"""Batch Module.
+The /batch resource shared by the namespaces of the directives, it
+annotates the same code once for each given parallel file.
+"""
+
+from flask import request
+from flask_restplus import Resource, fields
+
+from compiler.manager import GccManager
+
+from . import data
+from . import tasks
+
+
+def add_batch_resource(api,directives):
+    """Add the /batch resource to a namespace.
+
+    Args:
+        api (flask_restplus.Namespace): The namespace of the directives.
+        directives (str): 'openmp' or 'openacc', it selects the manager
+            which annotates the code, see pragcc.executor.MANAGERS.
+
+    Returns:
+        type: The added resource.
+    """
+    # Defining batch json model
+    batch_model = api.model('Batch',{
+        'raw_parallel_files': fields.List(
+            fields.String,
+            required=True,
+            description=(
+                'Several descriptions about how the C source should be parallelized '
+                'or annotated, the code is annotated once for each description.'
+            ),
+            default=[data.PARALLEL_FILE]
+        ),
+        'raw_c_code': fields.String(
+            required=True,
+            description='The C source code to be parallelized or annotated with compiler directives.',
+            default=data.RAW_C_CODE
+        )
+
+    })
+
+    @api.route('/batch')
+    class Batch(Resource):
+        """Deals with several parallelizations of the same C99 Source code."""
+
+        def head(self):
+            """Used for clients to check if the resource is available."""
+            data = {}
+            return data
+
+        @api.expect(batch_model)
+        def post(self):
+            """Returns C99 source code annotated once for each given parallel file.
+
+            The source code is compiled and parsed only once.
+            """
+
+            data = request.json
+            raw_parallel_files = data.get('raw_parallel_files',[])
+            raw_c_code = data.get('raw_c_code','')
+
+            # Checking if the parallel files were given
+            if not raw_parallel_files:
+                message = 'Parallel files were not provided'
+                return message, 400
+
+            # Checking if the C99 source code was given
+            if not raw_c_code:
+                message = 'C99 source code was not provided'
+                return message, 400
+
+            # Checking if source code compiles 
+            manager = GccManager()
+            result = manager.check_raw_code(raw_c_code)
+
+            if not result.succeeded:
+                data = {
+                    'message': (
+                        'The code can be parallelized because '
+                        'it does not compile correctly, please '
+                        'compile and look for erros in the code.'
+                    ),
+                    'error': result.stderr
+                }
+                return data, 400
+
+
+            # Performing the code parallelizations
+            codes_data = tasks.get_annotated_codes_data(
+                directives=directives,
+                raw_parallel_files=raw_parallel_files,
+                raw_c_code=raw_c_code
+            )
+
+            results = []
+            for code_data, error in codes_data:
+
+                if error:
+                    code_data = {
+                        'message': "The code can not be parallelized !!",
+                        'error': error
+                    }
+
+                results.append(code_data)
+
+            data = {
+                'results': results
+            }
+
+            return data
+
+    return Batch
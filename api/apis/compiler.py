@@ -41,15 +41,15 @@ class Gcc(Resource):
             return message, 400
 
         manager = GccManager()
-        stdout, stderror = manager.compile_raw_code(raw_c_code)
+        result = manager.compile_raw_code(raw_c_code)
 
-        if stderror:
+        if not result.succeeded:
             message = {
                 'message':(
                     "The code can't be compiled correctly,"
                     " please look for errors in the code."
                 ),
-                'error': stderror
+                'error': result.stderr
             }
 
             return message, 400
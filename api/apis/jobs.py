@@ -0,0 +1,41 @@
+from flask import request
+from flask_restplus import Namespace, Resource
+
+from . import tasks
+
+
+# Defining the name space for the annotation jobs
+api = Namespace('jobs',description='Results of the asynchronous annotation jobs.')
+
+
+@api.route('')
+class Jobs(Resource):
+    """Deals with the state of the jobs queue."""
+
+    def get(self):
+        """Returns the queue depth and the latency of the jobs."""
+        return tasks.JOBS.stats
+
+
+@api.route('/<string:job_id>')
+@api.param('job_id','The id returned when the job was submitted.')
+class Job(Resource):
+    """Deals with the result of a single job."""
+
+    @api.param('wait','Seconds to wait for the job to finish (long-poll), at most %g.' % tasks.MAX_JOB_WAIT)
+    def get(self,job_id):
+        """Returns the job state, and its result once it finishes."""
+
+        try:
+            wait = float(request.args.get('wait',0))
+        except ValueError:
+            message = 'The wait parameter must be a number of seconds'
+            return message, 400
+
+        job = tasks.JOBS.get(job_id,wait=wait)
+
+        if not job:
+            message = 'The job does not exist'
+            return message, 404
+
+        return job.to_dict()
@@ -1,10 +1,11 @@
 from flask import request
 from flask_restplus import Namespace, Resource, fields
 
-from pragcc.manager import OpenACCManager
 from compiler.manager import GccManager
 
+from . import batch
 from . import data
+from . import tasks
 
 
 # Defining the name space for Catt cafile
@@ -27,6 +28,19 @@ Files = api.model('Files',{
 })
 
 
+# Defining the json model of a document version, it is annotated
+# incrementally when its previous version was annotated.
+Document = api.inherit('Document',Files,{
+    'document_id': fields.String(
+        required=False,
+        description=(
+            'Identifies the document across its versions, only the functions '
+            'changed since the previous version are annotated again.'
+        )
+    )
+})
+
+
 @api.route('')
 class OpenACC(Resource):
     """Deals with the parallelization of C99 Source code with OpenACC directives."""
@@ -36,13 +50,14 @@ class OpenACC(Resource):
         data = {}
         return data
 
-    @api.expect(Files)
+    @api.expect(Document)
     def post(self):
         """Returns C99 source code annotated with OpenACC compiler directives."""
 
         data = request.json
         raw_parallel_file = data.get('raw_parallel_file','')
         raw_c_code = data.get('raw_c_code','')
+        document_id = data.get('document_id')
 
         # Checking if the parallel file was given
         if not raw_parallel_file:
@@ -56,26 +71,34 @@ class OpenACC(Resource):
 
         # Checking if source code compiles 
         manager = GccManager()
-        stdout, stderror = manager.compile_raw_code(raw_c_code)
+        result = manager.check_raw_code(raw_c_code)
 
-        if stderror:
+        if not result.succeeded:
             data = {
                 'message': (
                     'The code can be parallelized because '
                     'it does not compile correctly, please '
                     'compile and look for erros in the code.'
                 ),
-                'error': stderror
+                'error': result.stderr
             }
             return data, 400
 
 
         # Performing code parallelization
-        manager = OpenACCManager()
-        code_data, error = manager.get_annotated_code_data(
-            raw_parallel_file=raw_parallel_file,
-            raw_c_code=raw_c_code
-        )
+        if document_id:
+            code_data, error = tasks.get_annotated_document_data(
+                directives='openacc',
+                document_id=document_id,
+                raw_parallel_file=raw_parallel_file,
+                raw_c_code=raw_c_code
+            )
+        else:
+            code_data, error = tasks.get_annotated_code_data(
+                directives='openacc',
+                raw_parallel_file=raw_parallel_file,
+                raw_c_code=raw_c_code
+            )
 
         if error:
 
@@ -86,4 +109,52 @@ class OpenACC(Resource):
 
             return data, 400 
 
-        return code_data
\ No newline at end of file
+        return code_data
+
+
+# Defining the resource which annotates a code several times
+OpenACCBatch = batch.add_batch_resource(api,'openacc')
+
+
+@api.route('/jobs')
+class OpenACCJob(Resource):
+    """Deals with the asynchronous parallelization of C99 Source code with OpenACC directives."""
+
+    def head(self):
+        """Used for clients to check if the resource is available."""
+        data = {}
+        return data
+
+    @api.expect(Files)
+    def post(self):
+        """Queues the annotation of C99 source code with OpenACC compiler directives.
+
+        The result is polled from /jobs/<job_id>.
+        """
+
+        data = request.json
+        raw_parallel_file = data.get('raw_parallel_file','')
+        raw_c_code = data.get('raw_c_code','')
+
+        # Checking if the parallel file was given
+        if not raw_parallel_file:
+            message = 'Parallel file was not provided'
+            return message, 400
+
+        # Checking if the C99 source code was given
+        if not raw_c_code:
+            message = 'C99 source code was not provided'
+            return message, 400
+
+        try:
+            job = tasks.JOBS.submit(tasks.annotate,'openacc',raw_parallel_file,raw_c_code)
+        except tasks.QueueFull:
+            message = 'Too many pending jobs, please try again later'
+            return message, 503
+
+        data = {
+            'job_id': job.id,
+            'status': job.status
+        }
+
+        return data, 202
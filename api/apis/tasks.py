@@ -0,0 +1,273 @@
+"""Tasks Module.
+Runs the annotation requests on a pool of pre-forked worker processes,
+so the CPU bound parsing scales across cores. The synchronous endpoints
+wait for the result, the asynchronous ones become jobs which are polled.
+
+The annotation runs on the request thread until configure() is called,
+which is done by the production serving mode of the app.
+"""
+
+import os
+import time
+import uuid
+import threading
+import collections
+from concurrent import futures
+
+from pragcc import executor
+from compiler.manager import GccManager
+
+
+MAX_WORKERS = os.cpu_count() or 1
+"""int: Number of worker processes."""
+
+TASK_TIMEOUT = None
+"""Optional[float]: Maximum seconds an annotation can run, unlimited if None."""
+
+MAX_PENDING_JOBS = 64
+"""int: Jobs queued or running at the same time, new jobs are rejected beyond it."""
+
+MAX_FINISHED_JOBS = 1024
+"""int: Finished jobs kept to be polled, the oldest ones are forgotten."""
+
+MAX_JOB_WAIT = 30.0
+"""float: Maximum seconds a poll can wait for a job to finish."""
+
+EXECUTOR = None
+"""Optional[executor.ProcessExecutor]: The worker processes, see configure()."""
+
+
+def configure(workers=MAX_WORKERS,timeout=TASK_TIMEOUT):
+    """Start the worker processes, annotations are dispatched to them from now on.
+
+    Args:
+        workers (int): Number of worker processes.
+        timeout (Optional[float]): Maximum seconds an annotation can run.
+    """
+    global MAX_WORKERS, TASK_TIMEOUT, EXECUTOR
+
+    MAX_WORKERS = workers
+    TASK_TIMEOUT = timeout
+    EXECUTOR = executor.ProcessExecutor(workers,timeout)
+
+
+def get_executor():
+    """Return the worker processes, they are started if configure() was not called."""
+    if EXECUTOR is None:
+        configure(MAX_WORKERS,TASK_TIMEOUT)
+    return EXECUTOR
+
+
+def get_annotated_code_data(directives,raw_parallel_file,raw_c_code):
+    """Annotate a code, on a worker process if they were started.
+
+    Returns:
+        tuple(dict,str): The annotated code data and None, or None
+            and an error message.
+    """
+    if EXECUTOR is None:
+        return executor.annotate(directives,raw_parallel_file,raw_c_code)
+    return EXECUTOR.get_annotated_code_data(directives,raw_parallel_file,raw_c_code)
+
+
+def get_annotated_codes_data(directives,raw_parallel_files,raw_c_code):
+    """Annotate a code once for each parallel file, on a worker process if they were started.
+
+    Returns:
+        List[tuple(dict,str)]: The result of each annotation.
+    """
+    if EXECUTOR is None:
+        return executor.annotate_batch(directives,raw_parallel_files,raw_c_code)
+    return EXECUTOR.get_annotated_codes_data(directives,raw_parallel_files,raw_c_code)
+
+
+def get_annotated_document_data(directives,document_id,raw_parallel_file,raw_c_code):
+    """Annotate a version of a document incrementally, on a worker process if they were started.
+
+    Returns:
+        tuple(dict,str): The annotated code data and None, or None
+            and an error message.
+    """
+    if EXECUTOR is None:
+        return executor.annotate_document(directives,document_id,raw_parallel_file,raw_c_code)
+    return EXECUTOR.get_annotated_document_data(
+        directives,document_id,raw_parallel_file,raw_c_code
+    )
+
+
+def annotate(directives,raw_parallel_file,raw_c_code):
+    """Check that the code compiles and annotate it.
+
+    This function runs on a worker process.
+
+    Args:
+        directives (str): 'openmp' or 'openacc'.
+        raw_parallel_file (str): The parallel.yml content.
+        raw_c_code (str): The C99 source code to be annotated.
+
+    Returns:
+        tuple(dict,int): The response data and its status code.
+    """
+    manager = GccManager()
+    result = manager.check_raw_code(raw_c_code)
+
+    if not result.succeeded:
+        data = {
+            'message': (
+                'The code can be parallelized because '
+                'it does not compile correctly, please '
+                'compile and look for erros in the code.'
+            ),
+            'error': result.stderr
+        }
+        return data, 400
+
+    code_data, error = executor.annotate(directives,raw_parallel_file,raw_c_code)
+
+    if error:
+        data = {
+            'message': "The code can not be parallelized !!",
+            'error': error
+        }
+        return data, 400
+
+    return code_data, 200
+
+
+class QueueFull(Exception):
+    """Raised when a job is submitted and MAX_PENDING_JOBS are pending."""
+
+
+class Job(object):
+    """An annotation request being processed."""
+
+    def __init__(self,future):
+        self.id = uuid.uuid4().hex
+        self.future = future
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def latency(self):
+        """float: Seconds from submission to completion, None if not finished."""
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.submitted_at
+
+    @property
+    def status(self):
+        """str: 'queued' or 'running' until the job finishes, then 'finished' or 'failed'."""
+        if self.future.done():
+            return 'failed' if self.future.exception() else 'finished'
+        if self.future.running():
+            return 'running'
+        return 'queued'
+
+    def to_dict(self):
+        status = self.status
+        data = {
+            'id': self.id,
+            'status': status,
+            'latency': self.latency
+        }
+
+        if status == 'finished':
+            result, status_code = self.future.result()
+            data['result'] = result
+            data['status_code'] = status_code
+        elif status == 'failed':
+            data['error'] = str(self.future.exception())
+
+        return data
+
+
+class JobQueue(object):
+    """A bounded queue of jobs executed on the worker processes."""
+
+    def __init__(self,max_pending=MAX_PENDING_JOBS,max_finished=MAX_FINISHED_JOBS,
+        max_wait=MAX_JOB_WAIT):
+
+        self._max_pending = max_pending
+        self._max_finished = max_finished
+        self._max_wait = max_wait
+
+        self._jobs = {}
+        self._finished = collections.deque()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        self._completed = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    @property
+    def stats(self):
+        """dict: Queue depth and jobs latency."""
+        with self._lock:
+            completed = self._completed
+            return {
+                'workers': MAX_WORKERS,
+                'pending': self._pending,
+                'max_pending': self._max_pending,
+                'completed': completed,
+                'average_latency': self._total_latency / completed if completed else None,
+                'max_latency': self._max_latency if completed else None
+            }
+
+    def _job_done(self,job):
+        job.finished_at = time.time()
+
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+            self._total_latency += job.latency
+            self._max_latency = max(self._max_latency,job.latency)
+
+            self._finished.append(job.id)
+            while len(self._finished) > self._max_finished:
+                self._jobs.pop(self._finished.popleft(),None)
+
+    def submit(self,function,*args):
+        """Queue a function call, it runs on a worker process.
+
+        Returns:
+            Job: The submitted job.
+
+        Raises:
+            QueueFull: When there are too many pending jobs.
+        """
+        with self._lock:
+            if self._pending >= self._max_pending:
+                raise QueueFull('There are %d pending jobs' % self._pending)
+
+            # The worker processes are started on the first submission
+            # if the app did not start them, so no process is forked
+            # when the module is imported.
+            future = get_executor().submit(function,*args)
+            job = Job(future)
+            self._jobs[job.id] = job
+            self._pending += 1
+
+        future.add_done_callback(lambda future: self._job_done(job))
+
+        return job
+
+    def get(self,job_id,wait=0):
+        """Return the job with the given id.
+
+        Args:
+            job_id (str): The job id.
+            wait (float): Seconds to wait for the job to finish (long-poll),
+                at most max_wait seconds.
+
+        Returns:
+            Job: The job, or None if it does not exist.
+        """
+        job = self._jobs.get(job_id)
+        if job and wait > 0:
+            futures.wait([job.future],timeout=min(wait,self._max_wait))
+        return job
+
+
+JOBS = JobQueue()
+"""JobQueue: Jobs of the annotation API."""
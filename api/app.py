@@ -1,12 +1,50 @@
 import sys
+import argparse
 
 # To include the pragcc module in the python path
 sys.path.extend(['.', '..'])
 
 from flask import Flask
 from apis import api
+from apis import tasks
 
 app = Flask(__name__)
 api.init_app(app)
 
-app.run(debug=True,host='0.0.0.0',port=5000)
\ No newline at end of file
+
+def main():
+    parser = argparse.ArgumentParser(description='Pragcc API server.')
+    parser.add_argument('--host',default='0.0.0.0')
+    parser.add_argument('--port',type=int,default=5000)
+    parser.add_argument(
+        '--production',
+        action='store_true',
+        help=(
+            'Serve without the debugger and run the annotations on a pool '
+            'of pre-forked worker processes.'
+        )
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=tasks.MAX_WORKERS,
+        help='Number of worker processes in production mode.'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=tasks.TASK_TIMEOUT,
+        help='Maximum seconds an annotation can run in production mode.'
+    )
+    args = parser.parse_args()
+
+    if args.production:
+        # The workers are forked before the server threads are started
+        tasks.configure(args.workers,args.timeout)
+        app.run(debug=False,threaded=True,host=args.host,port=args.port)
+    else:
+        app.run(debug=True,host=args.host,port=args.port)
+
+
+if __name__ == '__main__':
+    main()
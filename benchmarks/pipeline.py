@@ -0,0 +1,306 @@
+# -*- encoding: utf-8 -*-
+"""Annotation Pipeline Benchmarks.
+Times each stage of the annotation pipeline on synthetic stencil codes
+of several sizes and loop nesting depths. The results are written as
+JSON, and they can be compared against a stored baseline to flag the
+stages that got slower.
+
+Example:
+
+    python3 -m benchmarks.pipeline --sizes 100 1000 --output results.json
+    python3 -m benchmarks.pipeline --baseline results.json
+
+Stages:
+
+    fake        Fake the include headers, parser.fake_ctext.
+    cpp         Preprocess the faked code, parser.preprocess_ctext.
+    parse       Parse the preprocessed code, CParser.parse.
+    visit       Extract the functions and their loops from the AST.
+    insert      Insert a pragma before each loop, insert_lines.
+    raw         Assemble the annotated code, CCode.raw.
+    gcc         Check the annotated code with GccManager.
+    annotate    The whole annotation, OpenMPManager.get_annotated_code_data.
+
+"""
+
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+
+from pragcc.core import code
+from pragcc.core import settings
+from pragcc.core import parallelizer
+from pragcc.core.parser.c99 import parser
+from pragcc.core.parser.c99 import pool
+from pragcc.core.parser.c99 import ast_visitor
+from pragcc.manager import OpenMPManager
+
+
+SIZES = [100,1000,10000,100000]
+"""List[int]: Default number of lines of the synthetic codes."""
+
+DEPTHS = [1,2,3]
+"""List[int]: Default loop nesting depths of the synthetic codes."""
+
+TOLERANCE = 0.2
+"""float: A stage regresses if it is this fraction slower than its baseline."""
+
+MIN_SECONDS = 0.001
+"""float: Differences below this are noise, they are never regressions."""
+
+PRAGMA = '#pragma omp parallel for'
+
+
+def stencil_function(name,depth):
+    """Return a function applying a 3 point stencil on a depth-dimensional grid."""
+    indexes = ['i%d' % level for level in range(depth)]
+
+    lines = ['void %s(double *A, double *B)' % name,'{']
+    lines.append('    int %s;' % ', '.join(indexes))
+    for level, index in enumerate(indexes):
+        indent = '    ' * (level + 1)
+        lines.append('%sfor (%s = 1; %s < N - 1; ++%s)' % (indent,index,index,index))
+        lines.append('%s{' % indent)
+
+    indent = '    ' * (depth + 1)
+    offset = '0'
+    for index in indexes:
+        offset = '(%s) * N + %s' % (offset,index)
+    lines.append('%sint c = %s;' % (indent,offset))
+    lines.append('%sB[c] = (A[c - 1] + A[c] + A[c + 1]) / 3.0;' % indent)
+
+    for level in reversed(range(depth)):
+        lines.append('%s}' % ('    ' * (level + 1)))
+    lines.append('}')
+    lines.append('')
+
+    return lines
+
+
+def stencil_code(size,depth):
+    """Return a C99 stencil code of about size lines.
+
+    Returns:
+        tuple(str,str): The source code and a parallel file with a
+            parallel for directive on the outer loop of each function.
+    """
+    lines = [
+        '#include <stdio.h>',
+        '#include <stdlib.h>',
+        '',
+        '#define N 64',
+        ''
+    ]
+
+    functions = []
+    while True:
+        function_lines = stencil_function('stencil_%d' % len(functions),depth)
+        if functions and len(lines) + len(function_lines) > size:
+            break
+        functions.append('stencil_%d' % len(functions))
+        lines += function_lines
+
+    lines += ['int main()','{','    return 0;','}','']
+
+    parallel_file = ['functs:','  parallel:']
+    for function_name in functions:
+        parallel_file += [
+            '    %s:' % function_name,
+            '      mp:',
+            '        parallel_for:',
+            '          - nro: 0',
+            '            clauses:',
+            '              private: [%s]' % ','.join('i%d' % level for level in range(depth))
+        ]
+
+    return '\n'.join(lines), '\n'.join(parallel_file) + '\n'
+
+
+def measure(function,repeat):
+    """Run a function several times.
+
+    Returns:
+        tuple(object,float,float): The last result, the best and the
+            mean time in seconds.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+
+    return result, min(times), sum(times) / len(times)
+
+
+def run_case(size,depth,repeat=3,stages=None):
+    """Time the stages of the pipeline on a synthetic code.
+
+    Each stage takes as input the output of the previous ones, so they
+    are always measured in pipeline order.
+
+    Returns:
+        List[dict]: A result for each stage.
+    """
+    text, raw_parallel_file = stencil_code(size,depth)
+    lines = text.count('\n') + 1
+    results = []
+
+    def run(stage,function):
+        if stages is not None and stage not in stages:
+            return function()
+
+        result, best, mean = measure(function,repeat)
+        results.append({
+            'stage': stage,
+            'size': size,
+            'depth': depth,
+            'lines': lines,
+            'seconds': best,
+            'mean': mean,
+            'repeat': repeat
+        })
+        return result
+
+    def parse():
+        with pool.PARSERS.parser() as cparser:
+            return cparser.parse(preprocessed_text,'')
+
+    def insert():
+        return [
+            parallelizer.BaseParallelizer.insert_lines(
+                function['raw'],
+                [(PRAGMA,ccode.get_loop_line(function['name'],0))]
+            )
+            for function in code_data['functions']
+            if function['for_loops']
+        ]
+
+    def annotate():
+        return OpenMPManager().get_annotated_code_data(raw_parallel_file,text)
+
+    # The parse and preprocess caches would make every run of a
+    # stage after the first free
+    parse_cache_enabled = settings.PARSE_CACHE_ENABLED
+    preprocess_cache = parser.PREPROCESS_CACHE
+    settings.PARSE_CACHE_ENABLED = False
+    parser.PREPROCESS_CACHE = None
+    try:
+        faked_text = run('fake',lambda: parser.fake_ctext(text))
+        preprocessed_text = run('cpp',lambda: parser.preprocess_ctext(faked_text))
+        ast = run('parse',parse)
+        functions_data = run('visit',lambda: ast_visitor.FuncDefForVisitor.funcdefs_data(ast))
+
+        code_data = parser._split_sections(text,functions_data)
+        ccode = code.CCode(raw_code=text,code_data=code_data)
+
+        annotated_raws = run('insert',insert)
+        annotated_functions = [function for function in code_data['functions'] if function['for_loops']]
+        for function, raw in zip(annotated_functions,annotated_raws):
+            function['raw'] = raw
+
+        annotated_text = run('raw',lambda: ccode.raw)
+
+        if shutil.which('gcc'):
+            from compiler.manager import GccManager
+            gcc = GccManager(std='c99',openmp=True,cache=None)
+            run('gcc',lambda: gcc.check_raw_code(annotated_text))
+
+        run('annotate',annotate)
+    finally:
+        settings.PARSE_CACHE_ENABLED = parse_cache_enabled
+        parser.PREPROCESS_CACHE = preprocess_cache
+
+    return results
+
+
+def compare(results,baseline,tolerance=TOLERANCE,min_seconds=MIN_SECONDS):
+    """Compare the results with the baseline ones.
+
+    Args:
+        results (List[dict]): Results of run_case.
+        baseline (List[dict]): Stored results of a previous run, the
+            cases not present in both are ignored.
+
+    Returns:
+        List[dict]: The results that regressed, each one with the
+            baseline seconds and the ratio to them.
+    """
+    baseline_seconds = {
+        (result['stage'],result['size'],result['depth']): result['seconds']
+        for result in baseline
+    }
+
+    regressions = []
+    for result in results:
+        seconds = baseline_seconds.get((result['stage'],result['size'],result['depth']))
+        if seconds is None:
+            continue
+
+        if (result['seconds'] > seconds * (1 + tolerance)
+            and result['seconds'] - seconds > min_seconds):
+            regression = dict(result)
+            regression['baseline'] = seconds
+            regression['ratio'] = result['seconds'] / seconds if seconds else float('inf')
+            regressions.append(regression)
+
+    return regressions
+
+
+def create_parser():
+    arg_parser = argparse.ArgumentParser(description='Benchmark the annotation pipeline stages.')
+    arg_parser.add_argument('--sizes',type=int,nargs='+',default=SIZES,help='Lines of the synthetic codes.')
+    arg_parser.add_argument('--depths',type=int,nargs='+',default=DEPTHS,help='Loop nesting depths.')
+    arg_parser.add_argument('--stages',nargs='+',help='Stages to time, all of them by default.')
+    arg_parser.add_argument('--repeat',type=int,default=3,help='Runs of each stage, the best one is kept.')
+    arg_parser.add_argument('--output','-o',help='File where the JSON results are written.')
+    arg_parser.add_argument('--baseline','-b',help='JSON results to compare with.')
+    arg_parser.add_argument('--tolerance',type=float,default=TOLERANCE)
+    return arg_parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        for depth in args.depths:
+            for result in run_case(size,depth,args.repeat,args.stages):
+                print('%-9s %7d lines  depth %d  %10.4fs' % (
+                    result['stage'],result['lines'],result['depth'],result['seconds']
+                ))
+                sys.stdout.flush()
+                results.append(result)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output,'w') as file:
+            json.dump(report,file,indent=2)
+
+    if args.baseline:
+        with open(args.baseline,'r') as file:
+            baseline = json.load(file)['results']
+
+        regressions = compare(results,baseline,args.tolerance)
+        for regression in regressions:
+            print('REGRESSION %-9s %7d lines  depth %d  %10.4fs  baseline %10.4fs  x%.2f' % (
+                regression['stage'],regression['lines'],regression['depth'],
+                regression['seconds'],regression['baseline'],regression['ratio']
+            ))
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,25 +1,123 @@
-import tempfile
-import subprocess
 import os
+import subprocess
+import collections
+
+from pragcc.core.cache import LRUCache
+
+
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+"""int: Maximum size of the cached compilation results."""
+
+CACHE_TTL = 10 * 60
+"""int: Seconds a compilation result is reused."""
+
+COMPILE_ARGS = ['-o',os.devnull]
+"""List[str]: gcc arguments of a full compile, the executable is discarded."""
+
+CACHE = LRUCache(max_bytes=CACHE_MAX_BYTES,ttl=CACHE_TTL)
+"""LRUCache: Compilation results shared by every GccManager."""
+
+
+class CompilerResult(collections.namedtuple('CompilerResult',['stdout','stderr','returncode'])):
+    """The output of a compiler run.
+
+    The compiler may write warnings to stderr on success, so the
+    success is decided from its exit status.
+    """
+
+    __slots__ = ()
+
+    @property
+    def succeeded(self):
+        return self.returncode == 0
+
 
 class GccManager(object):
+    """Runs gcc on C source code given as text.
+
+    The code is piped through gcc stdin, so nothing is written to
+    the working directory. The results are cached by the source code,
+    the compiler and its flags.
+    """
+
+    def __init__(self,compiler='gcc',std=None,openmp=False,pedantic=False,cache=CACHE):
+        """
+        Args:
+            compiler (str): The gcc executable.
+            std (Optional[str]): Language standard, e.g. 'c99'.
+            openmp (bool): Enable the OpenMP directives.
+            pedantic (bool): Issue the warnings demanded by strict ISO C.
+            cache (Optional[LRUCache]): Cache of the compilation results,
+                nothing is cached if it is None.
+        """
+        self.compiler = compiler
+        self.cache = cache
+        self.flags = []
+
+        if std:
+            self.flags.append('-std=%s' % std)
+
+        if openmp:
+            self.flags.append('-fopenmp')
+
+        if pedantic:
+            self.flags.append('-pedantic')
+
+    def _args(self,args):
+        return [self.compiler] + args + self.flags + ['-x','c','-']
+
+    def _cached(self,args,text):
+        """Return the cached result of running gcc with the given arguments, or None."""
+        if self.cache is None:
+            return None
+
+        result = self.cache.get(LRUCache.key(*(self._args(args) + [text])))
+        return CompilerResult(*result) if result is not None else None
+
+    def _run(self,args,text):
+        result = self._cached(args,text)
+        if result is not None:
+            return result
+
+        args = self._args(args)
+
+        try:
+            process = subprocess.run(
+                args=args,
+                input=text,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True
+            )
+        except OSError as error:
+            # The compiler is missing or can not be run, it is not
+            # cached, the compiler may be installed later.
+            return CompilerResult('',"The compiler '%s' can not be run: %s" % (self.compiler,error),127)
+
+        result = CompilerResult(process.stdout,process.stderr,process.returncode)
+        if self.cache is not None:
+            self.cache.set(LRUCache.key(*(args + [text])),tuple(result))
+
+        return result
 
     def compile_raw_code(self,text):
-        
-        with tempfile.TemporaryDirectory() as dir_path:
-            file_path = os.path.join(dir_path,'temp.c')
-
-            with open(file_path,'w') as file:
-                file.write(text)
-                file.seek(0)
-
-                command = 'gcc %s' % file_path
-                process = subprocess.run(
-                    args=command,
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE, 
-                    shell=True, 
-                    universal_newlines=True
-                )
-
-                return process.stdout, process.stderr
\ No newline at end of file
+        """Compile and link the code, the executable is discarded.
+
+        Returns:
+            CompilerResult: gcc stdout, stderr and exit status.
+        """
+        return self._run(COMPILE_ARGS,text)
+
+    def check_raw_code(self,text):
+        """Check the code syntax and semantics, it is not compiled nor linked.
+
+        Returns:
+            CompilerResult: gcc stdout, stderr and exit status.
+        """
+        # The code is usually compiled by the /compiler endpoint before
+        # it is annotated, a successful compile passes the check too.
+        result = self._cached(COMPILE_ARGS,text)
+        if result is not None and result.succeeded:
+            return result
+
+        return self._run(['-fsyntax-only'],text)
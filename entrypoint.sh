@@ -1,3 +1,3 @@
 #!/bin/sh
 
-python3 ./api/app.py
\ No newline at end of file
+python3 ./api/app.py --production
\ No newline at end of file
@@ -0,0 +1,8 @@
+# -*- encoding: utf-8 -*-
+
+import sys
+
+from .cli import main
+
+
+sys.exit(main())
@@ -0,0 +1,248 @@
+# -*- encoding: utf-8 -*-
+"""Command Line Interface.
+Annotates whole projects, the C files are annotated on a pool of
+worker processes and each annotated file is written as soon as it
+is ready.
+
+Example:
+
+    python -m pragcc annotate src/ 'tests/**/*.c' --output build/omp
+
+The parallel file of each C file is the first one found of:
+
+    1. <name>.yml next to the file <name>.c
+    2. parallel.yml in the directory of the file
+    3. The project parallel file given with --parallel-file
+
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent import futures
+
+from . import executor
+from .core import settings
+
+
+def find_c_files(paths):
+    """Return the C files in the given directories, files or glob patterns.
+
+    Args:
+        paths (List[str]): Directories are searched recursively.
+
+    Returns:
+        List[tuple(str,str)]: Pairs of file path and its path relative to
+            the common directory of the inputs, i.e. the given directories
+            and the directories of the given files. The directory structure
+            is kept, so no two files have the same relative path. Each file
+            is listed once.
+    """
+    file_paths = []
+    base_dirs = []
+    seen = set()
+
+    def add(file_path):
+        real_path = os.path.realpath(file_path)
+        if real_path not in seen:
+            seen.add(real_path)
+            file_paths.append(file_path)
+
+    for path in paths:
+        if os.path.isdir(path):
+            base_dirs.append(os.path.abspath(path))
+            for dir_path, dir_names, file_names in os.walk(path):
+                dir_names.sort()
+                for file_name in sorted(file_names):
+                    if file_name.endswith('.c'):
+                        add(os.path.join(dir_path,file_name))
+        else:
+            for file_path in sorted(glob.glob(path,recursive=True)):
+                if os.path.isfile(file_path):
+                    base_dirs.append(os.path.dirname(os.path.abspath(file_path)))
+                    add(file_path)
+
+    if not file_paths:
+        return []
+
+    base_dir = os.path.commonpath(base_dirs)
+    return [
+        (file_path,os.path.relpath(os.path.abspath(file_path),base_dir))
+        for file_path in file_paths
+    ]
+
+
+def find_parallel_file(file_path,project_parallel_file=None):
+    """Return the path of the parallel file of a C file, or None."""
+    candidates = [
+        os.path.splitext(file_path)[0] + '.yml',
+        os.path.join(os.path.dirname(file_path),settings.PARALLEL_FILE_NAME),
+        project_parallel_file
+    ]
+
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate):
+            return candidate
+
+    return None
+
+
+def annotate_file(directives,raw_parallel_file,raw_c_code):
+    """Annotate a code, see executor.annotate.
+
+    This function runs on a worker process.
+
+    Returns:
+        tuple(dict,str,float): The annotated code data, the error
+            message and the seconds the annotation took.
+    """
+    start = time.time()
+    data, error = executor.annotate(directives,raw_parallel_file,raw_c_code)
+    return data, error, time.time() - start
+
+
+def find_input_dir(output,paths,c_files):
+    """Return the input directory which holds the output directory, or None.
+
+    An output inside the inputs would overwrite the C files, and the
+    next run would annotate the annotated files again.
+
+    Args:
+        output (str): The output directory.
+        paths (List[str]): The given directories, files or glob patterns.
+        c_files (List[tuple(str,str)]): The C files found, see find_c_files.
+    """
+    output_dir = os.path.realpath(output)
+    input_dirs = [path for path in paths if os.path.isdir(path)]
+    input_dirs += [os.path.dirname(os.path.abspath(file_path)) for file_path, _ in c_files]
+
+    for input_dir in input_dirs:
+        input_dir = os.path.realpath(input_dir)
+        if os.path.commonpath([input_dir,output_dir]) == input_dir:
+            return input_dir
+
+    return None
+
+
+def annotate(args,stdout=sys.stdout,stderr=sys.stderr):
+    """Run the annotate command.
+
+    Returns:
+        int: The exit status, 1 if any file could not be annotated.
+    """
+    c_files = find_c_files(args.paths)
+    if not c_files:
+        stderr.write('No C files found\n')
+        return 1
+
+    input_dir = find_input_dir(args.output,args.paths,c_files)
+    if input_dir is not None:
+        stderr.write('The output directory %s is inside the input directory %s\n' % (
+            args.output,input_dir
+        ))
+        return 1
+
+    pool = executor.ProcessExecutor(args.workers,args.timeout)
+    start = time.time()
+
+    try:
+        pending = {}
+        failed = 0
+        for file_path, relative_path in c_files:
+            parallel_file = find_parallel_file(file_path,args.parallel_file)
+            if parallel_file is None:
+                stderr.write('error  %s: parallel file not found\n' % file_path)
+                failed += 1
+                continue
+
+            with open(parallel_file,'r') as file:
+                raw_parallel_file = file.read()
+
+            with open(file_path,'r') as file:
+                raw_c_code = file.read()
+
+            future = pool.submit(annotate_file,args.directives,raw_parallel_file,raw_c_code)
+            pending[future] = (file_path,relative_path)
+
+        # The results are written in the order they are completed
+        for future in futures.as_completed(pending):
+            file_path, relative_path = pending[future]
+
+            try:
+                data, error, elapsed = future.result()
+            except executor.TaskTimeout:
+                data, error, elapsed = None, executor.TIMEOUT_ERROR, args.timeout
+            except Exception as exception:
+                # A failed file must not stop the annotation of the others
+                data, error, elapsed = None, '%s: %s' % (type(exception).__name__,exception), 0.0
+
+            if error:
+                stderr.write('error  %8.3fs  %s: %s\n' % (elapsed,file_path,error))
+                failed += 1
+                continue
+
+            output_path = os.path.join(args.output,relative_path)
+            os.makedirs(os.path.dirname(output_path) or os.curdir,exist_ok=True)
+            with open(output_path,'w') as file:
+                file.write(data['text'])
+
+            stdout.write('ok     %8.3fs  %s -> %s\n' % (elapsed,file_path,output_path))
+            stdout.flush()
+
+    finally:
+        pool.shutdown()
+
+    stdout.write('%d files annotated, %d failed in %.3fs\n' % (
+        len(c_files) - failed,failed,time.time() - start
+    ))
+
+    return 1 if failed else 0
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog='pragcc',description='Annotate C99 code with compiler directives.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    annotate_parser = commands.add_parser('annotate',help='Annotate the C files of a project.')
+    annotate_parser.add_argument(
+        'paths',
+        nargs='+',
+        help='Directories, C files or glob patterns.'
+    )
+    annotate_parser.add_argument(
+        '--output','-o',
+        required=True,
+        help='Directory where the annotated files are written.'
+    )
+    annotate_parser.add_argument(
+        '--parallel-file','-p',
+        help='Project parallel file, used for C files without their own.'
+    )
+    annotate_parser.add_argument(
+        '--directives','-d',
+        choices=sorted(executor.MANAGERS),
+        default='openmp'
+    )
+    annotate_parser.add_argument(
+        '--workers','-j',
+        type=int,
+        default=None,
+        help='Number of worker processes, the number of CPUs by default.'
+    )
+    annotate_parser.add_argument(
+        '--timeout',
+        type=float,
+        default=None,
+        help='Maximum seconds the annotation of a file can take.'
+    )
+    annotate_parser.set_defaults(function=annotate)
+
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    return args.function(args)
@@ -0,0 +1,222 @@
+# -*- encoding: utf-8 -*-
+"""Cache Module.
+A content addressed cache with an in-memory LRU tier and an optional
+on-disk tier. Values are stored pickled, so each lookup returns a fresh
+copy the caller can modify, and the size of each entry is known to
+perform size based eviction.
+
+Example:
+
+    cache = LRUCache(max_bytes=1024 * 1024)
+    key = LRUCache.key(text)
+    data = cache.get(key)
+    if data is None:
+        data = compute(text)
+        cache.set(key,data)
+
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import tempfile
+import threading
+import collections
+
+
+class LRUCache(object):
+    """Least recently used cache of picklable values."""
+
+    @staticmethod
+    def key(*parts):
+        """Return a content address for the given strings.
+
+        Args:
+            *parts (str): Strings that identify the cached value.
+
+        Returns:
+            str: A sha256 hex digest.
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def __init__(self,max_bytes=64 * 1024 * 1024,dir_path=None,max_disk_bytes=None,ttl=None):
+        """Create the cache.
+
+        Args:
+            max_bytes (int): Maximum size of the pickled values kept in
+                memory, the least recently used are evicted first.
+            dir_path (Optional[str]): Directory of the on-disk tier,
+                the disk tier is disabled if it is not given.
+            max_disk_bytes (Optional[int]): Maximum size of the disk tier,
+                unlimited if it is not given.
+            ttl (Optional[float]): Seconds an entry is valid after it is
+                set, entries never expire if it is not given.
+        """
+        self._max_bytes = max_bytes
+        self._dir_path = dir_path
+        self._max_disk_bytes = max_disk_bytes
+        self._ttl = ttl
+
+        self._entries = collections.OrderedDict()
+        self._stored_at = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if dir_path:
+            os.makedirs(dir_path,exist_ok=True)
+
+    @property
+    def stats(self):
+        """dict: Counters and current size of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'entries': len(self._entries),
+            'bytes': self._bytes
+        }
+
+    def _entry_path(self,key):
+        return os.path.join(self._dir_path,key + '.pickle')
+
+    def _expired(self,stored_at):
+        return self._ttl is not None and time.time() - stored_at > self._ttl
+
+    def _store(self,key,raw,stored_at):
+        """Keep the pickled value in memory, evicting the oldest ones."""
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+                del self._stored_at[key]
+
+            if len(raw) > self._max_bytes:
+                return
+
+            self._entries[key] = raw
+            self._stored_at[key] = stored_at
+            self._bytes += len(raw)
+
+            while self._bytes > self._max_bytes:
+                old_key, old_raw = self._entries.popitem(last=False)
+                del self._stored_at[old_key]
+                self._bytes -= len(old_raw)
+                self.evictions += 1
+
+    def _load_from_memory(self,key):
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is None:
+                return None
+
+            if self._expired(self._stored_at[key]):
+                self._bytes -= len(self._entries.pop(key))
+                del self._stored_at[key]
+                self.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return raw
+
+    def _load_from_disk(self,key):
+        """Return the pickled value and the time it was set, or None and None.
+
+        The modification time of an entry is the time it was set,
+        its access time is the last time it was used.
+        """
+        if not self._dir_path:
+            return None, None
+
+        entry_path = self._entry_path(key)
+        try:
+            stored_at = os.stat(entry_path).st_mtime
+            if self._expired(stored_at):
+                os.remove(entry_path)
+                self.expirations += 1
+                return None, None
+
+            with open(entry_path,'rb') as file:
+                raw = file.read()
+            os.utime(entry_path,(time.time(),stored_at))
+        except OSError:
+            return None, None
+
+        return raw, stored_at
+
+    def _save_to_disk(self,key,raw):
+        if not self._dir_path:
+            return
+
+        # The entry is written to a temporary file first, so readers
+        # never see a partially written entry.
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self._dir_path)
+        with os.fdopen(file_descriptor,'wb') as file:
+            file.write(raw)
+        os.replace(temp_path,self._entry_path(key))
+
+        if self._max_disk_bytes is not None:
+            self._evict_from_disk()
+
+    def _evict_from_disk(self):
+        entries = []
+        for entry in os.scandir(self._dir_path):
+            if entry.name.endswith('.pickle'):
+                stat = entry.stat()
+                entries.append((stat.st_atime,stat.st_size,entry.path))
+
+        disk_bytes = sum(size for atime, size, path in entries)
+        for atime, size, path in sorted(entries):
+            if disk_bytes <= self._max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            disk_bytes -= size
+            self.evictions += 1
+
+    def get(self,key,default=None):
+        """Return a copy of the value cached under the given key.
+
+        Args:
+            key (str): A key created with LRUCache.key.
+            default: Value returned on a cache miss.
+        """
+        raw = self._load_from_memory(key)
+
+        if raw is None:
+            raw, stored_at = self._load_from_disk(key)
+            if raw is None:
+                self.misses += 1
+                return default
+
+            self.disk_hits += 1
+            self._store(key,raw,stored_at)
+
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self,key,value):
+        """Cache a picklable value under the given key."""
+        raw = pickle.dumps(value,protocol=pickle.HIGHEST_PROTOCOL)
+        self._store(key,raw,time.time())
+        self._save_to_disk(key,raw)
+
+    def clear(self):
+        """Remove every entry from memory, the disk tier is kept."""
+        with self._lock:
+            self._entries.clear()
+            self._stored_at.clear()
+            self._bytes = 0
@@ -1,11 +1,21 @@
 # -*- encoding: utf-8 -*-
 
 import os
+import copy
 import shutil
-import tempfile
+from . import cache
+from . import settings
 from .parser.c99 import parser
 
 
+PARSE_CACHE = cache.LRUCache(
+    max_bytes=settings.PARSE_CACHE_MAX_BYTES,
+    dir_path=settings.PARSE_CACHE_DIR,
+    max_disk_bytes=settings.PARSE_CACHE_MAX_DISK_BYTES
+)
+"""cache.LRUCache: Parse results shared by every CCode object."""
+
+
 class CCode(object):
 
     @staticmethod
@@ -20,32 +30,44 @@ class CCode(object):
         return new_file_path
 
     @staticmethod
-    def load_data_from_file(file_path):
-        code_data = parser.get_data_from_cfile(file_path)
+    def load_data_from_file(file_path,functions=None):
+        cache = PARSE_CACHE if settings.PARSE_CACHE_ENABLED else None
+        code_data = parser.get_data_from_cfile(
+            file_path,cache=cache,lazy=True,functions=functions
+        )
         return code_data
 
     @staticmethod
-    def load_data_from_text(text):
-        with tempfile.TemporaryDirectory() as dir_path:
-            file_path = os.path.join(dir_path,'temp.c')
-
-            with open(file_path,'w') as file:
-                file.write(text)
-                file.seek(0)
-
-            return CCode.load_data_from_file(file_path)
+    def load_data_from_text(text,functions=None):
+        cache = PARSE_CACHE if settings.PARSE_CACHE_ENABLED else None
+        code_data = parser.get_data_from_text(
+            text,cache=cache,lazy=True,functions=functions
+        )
+        return code_data
 
 
-    def __init__(self,file_suffix='ccode_',file_path=None,raw_code=None):
+    def __init__(self,file_suffix='ccode_',file_path=None,raw_code=None,functions=None,
+        code_data=None):
+        """
+        Args:
+            functions (Optional[Iterable[str]]): The functions which are
+                going to be parallelized, if given only those functions
+                are parsed, see parser.get_data_from_text.
+            code_data (Optional[dict]): The already parsed data of the
+                given raw code, the code is not parsed again.
+        """
 
         self._file_path = file_path
         self._raw_code = raw_code
+        self._parsed_functions = functions
 
-        if file_path and not raw_code:
+        if code_data is not None and raw_code and not file_path:
+            self._data = code_data
+        elif file_path and not raw_code:
             copied_file_path = CCode.copy_file(file_path,file_suffix)
-            self._data = CCode.load_data_from_file(copied_file_path)
+            self._data = CCode.load_data_from_file(copied_file_path,functions)
         elif raw_code and not file_path:
-            self._data = CCode.load_data_from_text(raw_code)
+            self._data = CCode.load_data_from_text(raw_code,functions)
         else:
             # When this happend we need to raise and exception
             # The data dict can't be None
@@ -53,7 +75,71 @@ class CCode(object):
                 """file_path or raw_code kwargs any of these 
                 parameters must be given. but not both."""
             )
-            
+
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Index the functions of the code data by their exact name.
+
+        The index holds the same records stored in the code data, so
+        in-place updates of a function are seen through both. The loops
+        are indexed by (function_name, nro), each function is indexed on
+        the first lookup of its loops so they are not loaded before.
+        """
+        self._functions = {}
+        for function in self._data['functions']:
+            self._functions[function['name']] = function
+
+        self._loops = {}
+        self._indexed_functions = set()
+
+    def _get_loop(self,function_name,loop_nro):
+        """Return the loop with the given nro inside a function, or None."""
+        if not isinstance(loop_nro,int):
+            return None
+
+        if function_name not in self._indexed_functions:
+            function = self._functions.get(function_name)
+            if function is None:
+                return None
+
+            for loop in function['for_loops']:
+                self._loops[(function_name,loop['nro'])] = loop
+            self._indexed_functions.add(function_name)
+
+        return self._loops.get((function_name,loop_nro))
+
+    @property
+    def stats(self):
+        """dict: How many functions had their loops loaded.
+
+        The loops of a function are loaded when they are first needed,
+        unless the code data comes from the parse cache.
+        """
+        functions = self._data['functions']
+        loaded = [function for function in functions if function.loops_loaded]
+        return {
+            'functions': len(functions),
+            'loaded_functions': len(loaded),
+            'loaded_loops': sum(len(function.for_loops) for function in loaded)
+        }
+
+    def copy(self):
+        """Return an independent copy of this object, the code is not parsed again.
+
+        It allows to annotate the same code in several ways, each
+        parallelizer modifies its own copy. Only the raw code of the
+        functions is modified, so the function records are shallow
+        copies which share the loops and do not load them.
+        """
+        ccode = copy.copy(self)
+        ccode._data = dict(self._data)
+        ccode._data['functions'] = [
+            function.copy() for function in self._data['functions']
+        ]
+        ccode._build_indexes()
+        return ccode
+
     @property
     def raw(self):
         raw_code = ''
@@ -69,54 +155,45 @@ class CCode(object):
         return 'c99'
 
     def get_function_raw(self,function_name):
-        condition = lambda function: function['name'] in function_name
-        function = next(filter(condition,self._data['functions']),None)
+        function = self._functions.get(function_name)
         function_raw = ''
         if function:
             function_raw = function['raw']     
         return function_raw
 
     def get_for_loops_scope(self,function_name,loop_nro): 
-        condition = lambda function: function['name'] in function_name
-        function = next(filter(condition,self._data['functions']),None)
-
-        if function:
+        loop = self._get_loop(function_name,loop_nro)
 
-            loops = function['for_loops']
-
-            condition = lambda loop: loop['nro'] is loop_nro
-            first_loop = next(filter(condition,loops),None)
-
-            if first_loop:
-                begin = first_loop['begin']['relative']
-                end = first_loop['end']['relative']
-            
-                return tuple((begin,end))
+        if loop:
+            begin = loop['begin']['relative']
+            end = loop['end']['relative']
+        
+            return tuple((begin,end))
 
         return tuple()
 
     def get_loop_line(self,function_name,loop_nro,relative=True):
-        condition = lambda function: function['name'] in function_name
-        function = next(filter(condition,self._data['functions']),None)
+        loop = self._get_loop(function_name,loop_nro)
         loop_line = None
-        if function:
-            function_loops = function['for_loops']
-            condition = lambda loop: loop['nro'] is loop_nro
-            loop = next(filter(condition,function_loops),None)
-
-            # If the loop whit the give loop_nro is founded 
-            # we return the line on which that loop begins
-            # in the source code
-            if loop:
-                absolute_line = loop['begin']['absolute']
-                relative_line = loop['begin']['relative']
-                loop_line = relative_line if relative else absolute_line
+
+        # If the loop whit the give loop_nro is founded 
+        # we return the line on which that loop begins
+        # in the source code
+        if loop:
+            absolute_line = loop['begin']['absolute']
+            relative_line = loop['begin']['relative']
+            loop_line = relative_line if relative else absolute_line
             
         return loop_line
 
     def update_function_raw_code(self,function_name,new_raw,commit=True):
-        condition = lambda function: function['name'] in function_name
-        function = next(filter(condition,self._data['functions']),None)
+        function = self._functions.get(function_name)
+
+        if function is None:
+            raise ValueError(
+                "The function '%s' is not present in the code." % function_name
+            )
+
         function['raw'] = new_raw
 
         # This functionality needs to be tested, when we read the code 
@@ -134,12 +211,14 @@ class CCode(object):
             file.write(new_raw_data)
         
         if self._file_path:
-            self._data = CCode.load_data_from_file(self._file_path)
+            self._data = CCode.load_data_from_file(self._file_path,self._parsed_functions)
         elif self._raw_code:
-            self._data = CCode.load_data_from_text(self._raw_code)
+            self._data = CCode.load_data_from_text(self._raw_code,self._parsed_functions)
         else:
             raise ValueError(
                 """file_path or raw_code kwargs any of these 
                 parameters must be configured"""
             )
 
+        self._build_indexes()
+
@@ -2,9 +2,209 @@
 
 import os
 import yaml
+import types
 import shutil
+import hashlib
+import threading
+import collections
 from . import settings
 
+try:
+    # The C loader of LibYAML is much faster, if PyYAML was built with it
+    from yaml import CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeLoader as Loader
+
+
+class ParallelFileError(ValueError):
+    """Raised when a parallel file does not follow the parallel file schema."""
+
+
+def _check(condition,message,*args):
+    if not condition:
+        raise ParallelFileError(message % args)
+
+
+def _check_integer(properties,key,message,*args):
+    """Convert properties[key] with int(), so a quoted '0' is accepted."""
+    value = properties.get(key)
+    _check(not isinstance(value,bool),message,*args)
+    try:
+        properties[key] = int(value)
+    except (TypeError,ValueError):
+        raise ParallelFileError(message % args)
+
+
+def validate(data):
+    """Check the structure of the parallel file data.
+
+    The parallelizers rely on this structure: the functions to be
+    parallelized are under functs.parallel, each one maps directive
+    types (mp, acc) to its directives. Block directives map to their
+    properties, an integer scope and the clauses. Loop directives are
+    lists of loops, each one with an integer nro and the clauses. The
+    nro and the scope are converted to int in place, as int() does.
+
+    Args:
+        data (dict): The loaded parallel file.
+
+    Raises:
+        ParallelFileError: If the data does not follow the schema.
+    """
+    _check(isinstance(data,dict),'The parallel file must be a mapping')
+    _check(isinstance(data.get('functs'),dict),"The parallel file must have a 'functs' mapping")
+
+    parallel = data['functs'].get('parallel')
+    _check(isinstance(parallel,dict),"The parallel file must have a 'functs.parallel' mapping")
+
+    for funct_name, funct_directives in parallel.items():
+        path = 'functs.parallel.%s' % funct_name
+        _check(
+            funct_directives is None or isinstance(funct_directives,dict),
+            "'%s' must be a mapping of directive types",path
+        )
+
+        for directive_type, directives in (funct_directives or {}).items():
+            type_path = '%s.%s' % (path,directive_type)
+            _check(
+                directives is None or isinstance(directives,dict),
+                "'%s' must be a mapping of directives",type_path
+            )
+
+            for directive_name, properties in (directives or {}).items():
+                directive_path = '%s.%s' % (type_path,directive_name)
+                if isinstance(properties,list):
+                    for loop in properties:
+                        _check(
+                            isinstance(loop,dict),
+                            "The loops of '%s' must be mappings",directive_path
+                        )
+                        _check_integer(
+                            loop,'nro',
+                            "The loops of '%s' must have an integer 'nro'",directive_path
+                        )
+                        _check_clauses(loop,directive_path)
+                else:
+                    _check(
+                        properties is None or isinstance(properties,dict),
+                        "'%s' must be a mapping or a list of loops",directive_path
+                    )
+                    if properties and 'scope' in properties:
+                        _check_integer(
+                            properties,'scope',
+                            "The scope of '%s' must be an integer",directive_path
+                        )
+                    _check_clauses(properties or {},directive_path)
+
+
+def _check_clauses(properties,directive_path):
+    clauses = properties.get('clauses')
+    _check(
+        clauses is None or isinstance(clauses,dict),
+        "The clauses of '%s' must be a mapping",directive_path
+    )
+
+
+def _freeze(value):
+    """Return a read only copy of the loaded data, dicts become
+    mapping proxies and lists become tuples."""
+    if isinstance(value,dict):
+        return types.MappingProxyType(
+            {key: _freeze(item) for key, item in value.items()}
+        )
+    if isinstance(value,list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Return a mutable copy of the frozen data."""
+    if isinstance(value,types.MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value,tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+class DirectivePlan(object):
+    """The validated and read only directives of a parallel file.
+
+    A plan is immutable, so a single plan is shared by every Parallel
+    object created from the same parallel file.
+    """
+
+    __slots__ = ('data','functions','_directives')
+
+    def __init__(self,data):
+        """
+        Args:
+            data (dict): The loaded parallel file, it is validated.
+
+        Raises:
+            ParallelFileError: If the data does not follow the schema.
+        """
+        validate(data)
+
+        #: MappingProxyType: Read only copy of the parallel file data.
+        self.data = _freeze(data)
+
+        parallel = self.data['functs']['parallel']
+
+        #: Tuple[str]: The functions to be parallelized, in file order.
+        self.functions = tuple(parallel)
+
+        directives = collections.OrderedDict()
+        for funct_name, funct_directives in parallel.items():
+            for directive_type, funct_type_directives in (funct_directives or {}).items():
+                directives.setdefault(directive_type,[]).append(
+                    (funct_name,funct_type_directives or types.MappingProxyType({}))
+                )
+
+        #: Dict[str,Tuple[tuple(str,MappingProxyType)]]: Function directives by directive type.
+        self._directives = {
+            directive_type: tuple(functs_directives)
+            for directive_type, functs_directives in directives.items()
+        }
+
+    def get_directives(self,directive_type):
+        return self._directives.get(directive_type,())
+
+
+class PlanCache(object):
+    """Memoizes the directive plans by the hash of the parallel file text."""
+
+    def __init__(self,max_plans):
+        self._max_plans = max_plans
+        self._plans = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self,text):
+        """Return the plan of a parallel file text, it is loaded once."""
+        key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                return plan
+
+        plan = DirectivePlan(yaml.load(text,Loader=Loader))
+
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self._max_plans:
+                self._plans.popitem(last=False)
+
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+
+PLANS = PlanCache(settings.PARALLEL_PLAN_CACHE_SIZE)
+
+
 class Parallel(object):
 
     OPEN_MP = 'mp'
@@ -15,18 +215,16 @@ class Parallel(object):
 
     @staticmethod
     def _load_from_text(text):
-        data = yaml.load(text)
-        return data
+        return PLANS.get(text)
 
     @staticmethod
     def _load_from_file(file_path):
         with open(file_path,'r') as file:
-            data = yaml.load(file)
-            return data
+            return PLANS.get(file.read())
 
     @staticmethod
     def is_block_directive(directive_name):
-        return directive_name in ParallelFile.BLOCK_DIRECTIVES
+        return directive_name in Parallel.BLOCK_DIRECTIVES
 
     @staticmethod
     def get_loop_clauses(loop_metadata):
@@ -39,36 +237,48 @@ class Parallel(object):
     def __init__(self,raw_text=None,file_path=None, data=None):
         """Parallel file metadata class.
 
-        The parallel file describes how a code that follows a given cellular 
+        The parallel file describes how a code that follows a given cellular
         automata programming pattern should to be parallelized.
 
         Args:
-            dir_path (str): An unique location to the dir on which a 
-                parallel.yml must exists.
+            raw_text (Optional[str]): The parallel file content.
+            file_path (Optional[str]): A unique path to a parallel file.
+            data (Optional[dict]): An already loaded parallel file.
 
+        Raises:
+            ParallelFileError: If the parallel file does not follow
+                the parallel file schema.
+            yaml.YAMLError: If the parallel file is not valid YAML.
         """
 
         if raw_text:
-            self._data = self._load_from_text(raw_text)
+            self._plan = self._load_from_text(raw_text)
         elif file_path:
-            self._data = self._load_from_file(file_path)
+            self._plan = self._load_from_file(file_path)
         elif data:
-            self._data = data
+            self._plan = DirectivePlan(data)
         else:
-            self._data = None
+            self._plan = None
+
+    @property
+    def plan(self):
+        """DirectivePlan: The read only directives of the parallel file."""
+        return self._plan
 
     @property
     def data(self):
-        return self._data
+        """dict: A mutable copy of the parallel file data."""
+        return _thaw(self._plan.data) if self._plan else None
+
+    def get_functions(self):
+        """Return the names of the functions to be parallelized."""
+        return self._plan.functions
 
     def get_directives(self,directive_type):
-        # Getting the parallelizable functions metadata.
-        parallel = self._data['functs']['parallel']
-        
-        functs_metadata = []
-        for funct_name, data in parallel.items():
-            if directive_type in data:
-                directives = data[directive_type]
-                functs_metadata.append((funct_name,directives))
-
-        return tuple(functs_metadata)
+        """Return the read only directives of each function.
+
+        Returns:
+            Tuple[tuple(str,Mapping)]: Pairs of function name and its
+                directives of the given type, e.g. mp or acc.
+        """
+        return self._plan.get_directives(directive_type)
@@ -1,7 +1,76 @@
 # -*- encoding: utf-8 -*-
 
+import types
+import threading
+import collections
+
 from . import code
 from . import metadata
+from . import settings
+
+
+def render_clause(clause_name,value):
+    """Return the raw code of a clause, followed by a space."""
+
+    # Clause with no arguments
+    if value is None:
+        return clause_name + ' '
+
+    # Clause witha list of arguments string
+    if isinstance(value,(list,tuple)):
+        return '%s(%s) ' % (clause_name,','.join(value))
+
+    # Clause with a single argument, int or string
+    return '%s(%s) ' % (clause_name,value)
+
+
+def render_clauses(clauses):
+    """Return the raw code of the given clauses, in their order."""
+    if not clauses:
+        return ''
+
+    return ''.join(
+        render_clause(clause_name,value)
+        for clause_name, value in clauses.items()
+    )
+
+
+class PragmaCache(object):
+    """Rendered pragmas of the read only clauses of the directive plans.
+
+    The plans are shared by the requests with the same parallel file,
+    so their clauses are rendered once. A cached entry is found by the
+    identity of its clauses, the entry keeps them alive so the identity
+    is not reused by other clauses.
+    """
+
+    def __init__(self,max_pragmas):
+        self._max_pragmas = max_pragmas
+        self._pragmas = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self,library_name,directive_name,clauses):
+        key = (library_name,directive_name,id(clauses))
+
+        with self._lock:
+            entry = self._pragmas.get(key)
+            if entry is not None and entry[0] is clauses:
+                return entry[1]
+
+        raw_pragma = '#pragma %s %s %s' % (
+            library_name,directive_name,render_clauses(clauses)
+        )
+
+        with self._lock:
+            self._pragmas[key] = (clauses,raw_pragma)
+            while len(self._pragmas) > self._max_pragmas:
+                self._pragmas.popitem(last=False)
+
+        return raw_pragma
+
+
+PRAGMAS = PragmaCache(settings.PRAGMA_CACHE_SIZE)
+
 
 class DirectiveFactory(object):
     """Deals with OpenMP and OpenACC raw pragmas creation."""
@@ -9,6 +78,9 @@ class DirectiveFactory(object):
     def create_raw_pragma(self,library_name,directive_name,clauses):
         """Return a raw pragma with its clausules.
 
+        The pragmas of read only clauses, as the clauses of the directive
+        plans, are cached. Other clauses are rendered on each call.
+
         Args:
             libary_name (str): omp or acc.
             directive_name (str): the name of the directive 
@@ -19,64 +91,73 @@ class DirectiveFactory(object):
         Returns: 
             A raw pragma.
         """
-        raw_pragma = '#pragma %s %s %s'
-        raw_clauses = ''
-
-        for clause_name, value in clauses.items():
-            raw_clauses += clause_name
-
-            # Clause with no arguments
-            if value is None:
-                raw_clauses += ' '
-
-            # Clause witha list of arguments string
-            elif type(value) is list:
-                raw_clauses += '(' + ','.join(value) + ') '
+        if isinstance(clauses,types.MappingProxyType):
+            return PRAGMAS.get(library_name,directive_name,clauses)
 
-            # Clause with a single argument int
-            elif type(value) is int:
-                raw_clauses += '(' + str(value) + ') '
-
-            # Clause with a single argument string
-            else:
-                raw_clauses += '(' + value + ') '
-
-        return raw_pragma % (library_name,directive_name,raw_clauses)
+        return '#pragma %s %s %s' % (
+            library_name,directive_name,render_clauses(clauses)
+        )
 
 
 class BaseParallelizer(object):
     """Define a set of functions required on each paralelization method."""
 
     @staticmethod
-    def insert_lines(raw,insertions=[]):
+    def insert_lines(raw,insertions=()):
         """Given a raw string, perfonms a set of insertions on it.
 
+        The insertions are sorted once by line and performed in a single
+        pass over the lines of the raw string. Insertions on the same line
+        keep their given order. If any insertion line does not exist in
+        the raw string, no insertions are performed and an empty string
+        is returned.
+
         Args:
             raw (str): The string on which some string insertions
                 must be performed.
-            insertions (List[tuple(str,int,int)]): A list of directives 
-                to be inserted in the given section of raw code.
+            insertions (List[tuple(str,int)]): A list of directives 
+                to be inserted in the given section of raw code, each
+                one is inserted before the line with the given number.
 
         Returns:
             str, a raw string with some insertions performed on it.
         """
         lines = raw.splitlines()
-        numbered_lines = list(enumerate(lines))
-        fake_line = -1
+        if not insertions:
+            return '\n'.join(lines)
 
-        new_numbered_lines = []
+        # sorted is stable, so the insertions on the same
+        # line keep the order in which they were given.
+        insertions = sorted(insertions,key=lambda insertion: insertion[1])
+
+        first_line = insertions[0][1]
+        last_line = insertions[-1][1]
+        if first_line < 0 or last_line >= len(lines):
+            return ''
+
+        new_lines = []
+        position = 0
         for new_raw, insertion_line in insertions:
-            for list_index, code in enumerate(numbered_lines):
-                line_in_code = code[0]
-                if line_in_code is insertion_line:
-                    new_numbered_lines += numbered_lines[:list_index]
-                    new_numbered_lines += [(fake_line,new_raw)]
-                    new_numbered_lines += numbered_lines[list_index:]
+            new_lines.extend(lines[position:insertion_line])
+            new_lines.append(new_raw)
+            position = insertion_line
 
-            numbered_lines = new_numbered_lines
-            new_numbered_lines = []
+        new_lines.extend(lines[position:])
 
-        return '\n'.join([code[1] for code in numbered_lines])
+        return '\n'.join(new_lines)
+
+    def insert_functions_lines(self,functions_insertions):
+        """Performs the insertions of several functions of the code at once.
+
+        Args:
+            functions_insertions (List[tuple(str,List[tuple(str,int)])]): 
+                Pairs of function name and the insertions to be
+                performed on the raw code of that function.
+        """
+        for function_name, insertions in functions_insertions:
+            raw_code = self._code.get_function_raw(function_name)
+            new_raw_code = self.insert_lines(raw_code,insertions)
+            self._code.update_function_raw_code(function_name,new_raw_code)
 
     def get_raw_pragma(self,directive_name,clauses):
         """Returns a raw pragma with its clausules.
@@ -90,6 +171,21 @@ class BaseParallelizer(object):
         """
         raise NotImplementedError('This method needs to be implemented')
 
+    def get_directives_inserts(self,function_name,directives):
+        """Returns the insertions needed to apply a set of directives.
+
+        Args:
+            function_name (str): The name of a given function
+                existing in the code to be paralleized.
+            directives (dict): Containing the directives to be 
+                applied to the given function.
+
+        Returns:
+            List[tuple(str,int)], the insertions to be performed 
+                on the raw code of the given function.
+        """
+        raise NotImplementedError('This method needs to be implemented')
+
     def insert_directives(self,function_name,directives):
         """Insert a set of directive on the given function.
 
@@ -108,32 +204,58 @@ class BaseParallelizer(object):
 
 
         """
-        raise NotImplementedError('This method needs to be implemented')
+        insertions = self.get_directives_inserts(function_name,directives)
+        self.insert_functions_lines([(function_name,insertions)])
+
+        return insertions
+
+    def insert_functions_directives(self,functs_directives):
+        """Insert the directives of several functions at once.
 
-    def parallelize(self,metadata):
+        All the insertions are computed before any function raw 
+        code is modified, then they are applied in a single batch.
+
+        Args:
+            functs_directives (List[tuple(str,dict)]): Pairs of function 
+                name and the directives to be applied to that function.
+        """
+        functions_insertions = [
+            (funct_name,self.get_directives_inserts(funct_name,directives))
+            for funct_name, directives in functs_directives
+        ]
+
+        self.insert_functions_lines(functions_insertions)
+
+        return functions_insertions
+
+    def parallelize(self,metadata,functions=None):
         """Performs the code paralelization.
 
         Args:
             metadata (metadata.Parallel): A file in YML format containing
                 information about how to paralleize the given code.
+            functions (Optional[Iterable[str]]): Annotate only these
+                functions, all the functions in the metadata by default.
         """
         raise NotImplementedError('This method needs to be implemented')
 
 
 class OpenMP(BaseParallelizer):
 
-    def __init__(self,file_path=None,raw_code=None):
+    def __init__(self,file_path=None,raw_code=None,ccode=None):
         """Allow code parallelization with OpenMP compiler directives.
 
         Args:
             file_path (Optional[str]): A unique path to the file to be parallelized.
             raw_code (Optional[str]): The raw code to be parallelized. 
+            ccode (Optional[code.CCode]): An already parsed code to be
+                parallelized, it is modified in place.
         """
 
         super(OpenMP,self).__init__()
 
         #: code.CCode: An instance that contains the information about the ccode.
-        self._code = code.CCode(
+        self._code = ccode or code.CCode(
             file_suffix='mp_',
             file_path=file_path,
             raw_code=raw_code
@@ -318,7 +440,7 @@ class OpenMP(BaseParallelizer):
 
         return insertions
 
-    def insert_directives(self,function_name,directives):
+    def get_directives_inserts(self,function_name,directives):
         insertions = []
 
         #  Available directives
@@ -332,18 +454,15 @@ class OpenMP(BaseParallelizer):
         # Parallel For directive inserts
         insertions += self.get_parallel_for_directive_inserts(function_name,directives)
 
-        raw_code = self._code.get_function_raw(function_name)
-        new_raw_code = self.insert_lines(raw_code,insertions)
-
-        self._code.update_function_raw_code(function_name,new_raw_code)
-
         return insertions
 
-    def parallelize(self, meta):
+    def parallelize(self, meta, functions=None):
         """Return a parallelized cccode object.
 
         Args:
             meta (metadata.Parallel): The paralleization metadata.
+            functions (Optional[Iterable[str]]): Annotate only these
+                functions, all the functions in the metadata by default.
 
         Returns:
             code.CCode, which raw code is annotated with OpenMP
@@ -353,28 +472,36 @@ class OpenMP(BaseParallelizer):
         openmp = metadata.Parallel.OPEN_MP
 
         functs_directives = self._meta.get_directives(openmp)
-        for funct_name, directives in functs_directives:
-            self.insert_directives(funct_name,directives)
+        if functions is not None:
+            functs_directives = [
+                (funct_name,directives)
+                for funct_name, directives in functs_directives
+                if funct_name in functions
+            ]
+
+        self.insert_functions_directives(functs_directives)
 
         return self._code
 
 
 class OpenACC(BaseParallelizer):
 
-    def __init__(self,file_path=None,raw_code=None):
+    def __init__(self,file_path=None,raw_code=None,ccode=None):
         """Allow code parallelization with OpenACC compiler directives.
 
-        Note: file_path or raw_code must be given, but not both.
+        Note: file_path, raw_code or ccode must be given, but only one.
 
         Args:
             file_path (Optional[str]): A unique path to the file to be parallelized.
             raw_code (Optional[str]): The raw code to be parallelized. 
+            ccode (Optional[code.CCode]): An already parsed code to be
+                parallelized, it is modified in place.
         """
         
         super(OpenACC,self).__init__()
 
         #: code.CCode: An instance that contains the information about the ccode.
-        self._code = code.CCode(
+        self._code = ccode or code.CCode(
             file_suffix='mp_',
             file_path=file_path,
             raw_code=raw_code
@@ -596,7 +723,7 @@ class OpenACC(BaseParallelizer):
         return insertions
 
 
-    def insert_directives(self,function_name,directives):
+    def get_directives_inserts(self,function_name,directives):
         insertions = []
 
         #  Available directives
@@ -610,18 +737,15 @@ class OpenACC(BaseParallelizer):
         # Loop directive inserts
         insertions += self.get_loop_directive_inserts(function_name,directives)
 
-        raw_code = self._code.get_function_raw(function_name)
-        new_raw_code = self.insert_lines(raw_code,insertions)
-
-        self._code.update_function_raw_code(function_name,new_raw_code)
-
         return insertions
 
-    def parallelize(self, meta):
+    def parallelize(self, meta, functions=None):
         """Return a parallelized cccode object.
 
         Args:
             meta (metadata.Parallel): The paralleization metadata.
+            functions (Optional[Iterable[str]]): Annotate only these
+                functions, all the functions in the metadata by default.
 
         Returns:
             code.CCode, which raw code is annotated with OpenMP
@@ -631,7 +755,13 @@ class OpenACC(BaseParallelizer):
         openacc = metadata.Parallel.OPEN_ACC
 
         functs_directives = self._meta.get_directives(openacc)
-        for funct_name, directives in functs_directives:
-            self.insert_directives(funct_name,directives)
+        if functions is not None:
+            functs_directives = [
+                (funct_name,directives)
+                for funct_name, directives in functs_directives
+                if funct_name in functions
+            ]
+
+        self.insert_functions_directives(functs_directives)
 
         return self._code
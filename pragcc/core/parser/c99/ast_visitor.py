@@ -1,7 +1,10 @@
 # -*- encoding: utf-8 -*-
 """On this module are defined the interfaces to explore a pycparser AST."""
 
+import functools
+
 from . import pycparser
+from .records import FunctionInfo, LoopInfo
 
 
 class FuncDefVisitor(pycparser.c_ast.NodeVisitor):
@@ -98,16 +101,31 @@ class ForVisitor(pycparser.c_ast.NodeVisitor):
 
     @staticmethod
     def _for_loops(node,loop_depth=0):
-        """Return a list of pycparser.c_ast.For objects founded in the AST ."""
+        """Return a list of (depth, pycparser.c_ast.For) founded in the AST.
+
+        The loops are listed in the order they appear in the code. The
+        AST is walked with an explicit stack, so deeply nested code does
+        not reach the recursion limit.
+        """
         loops = []
-        new_loop_depth = loop_depth
-        if isinstance(node,pycparser.c_ast.For):
-            loops += [(loop_depth,node)]
-            new_loop_depth = loop_depth + 1
-        children_nodes = node.children()
-        if children_nodes:
-            for name, child_node in children_nodes:
-                loops += ForVisitor._for_loops(child_node,new_loop_depth)
+
+        # Each entry holds the iterator over the children of an open
+        # node, see c_ast.Node.__iter__, and the loop depth of them.
+        stack = [(iter((node,)),loop_depth)]
+        while stack:
+            children, loop_depth = stack[-1]
+
+            # Open the next child, or close the node if there are no more
+            for node in children:
+                if node.__class__ is pycparser.c_ast.For:
+                    loops.append((loop_depth,node))
+                    loop_depth += 1
+
+                stack.append((iter(node),loop_depth))
+                break
+            else:
+                stack.pop()
+
         return loops
 
     @staticmethod
@@ -187,3 +205,101 @@ class ForVisitor(pycparser.c_ast.NodeVisitor):
             loops_data.append(ForVisitor._for_loop_data(funcdef,loop,i))
 
         return loops_data
+
+
+class FuncDefForVisitor(object):
+    """Interface to the functions and their loops in a single AST traversal."""
+
+    @staticmethod
+    def for_loops_data(funcdef,function_begin=None):
+        """Extract the loops of a single function.
+
+        Args:
+            funcdef (pycparser.c_ast.FuncDef): A function definition.
+            function_begin (Optional[int]): Line where the function begins,
+                taken from the function declaration if it is not given.
+
+        Returns:
+            List[records.LoopInfo]: The loops, in the order they appear in the code.
+        """
+        if function_begin is None:
+            function_begin = funcdef.decl.coord.line
+
+        loops_data = []
+        for loop_depth, loop in ForVisitor._for_loops(funcdef.body):
+            # A loop with a single statement ends where it begins
+            end_coord = getattr(loop.stmt,'end_coord',loop.coord)
+            loops_data.append(LoopInfo(
+                nro=len(loops_data),
+                depth=loop_depth,
+                begin=loop.coord.line,
+                end=end_coord.line,
+                function_begin=function_begin
+            ))
+
+        return loops_data
+
+    @staticmethod
+    def funcdefs_data(node,lazy=False):
+        """Extract the data of every function reachable from the given node.
+
+        The functions and their loops are collected walking the AST
+        once with an explicit stack, so deeply nested code does not
+        reach the recursion limit.
+
+        Args:
+            node (pycparser.c_ast.Node): Usually the pycparser.c_ast.FileAST.
+            lazy (bool): If True, the function bodies are not walked, the
+                loops of each function are extracted on the first access
+                to its for_loops, the records keep the AST nodes meanwhile.
+
+        Returns:
+            List[records.FunctionInfo]: The functions, their dict view is
+                the data returned by FuncDefVisitor.funcdefs_data.
+        """
+        funcdefs_data = []
+
+        # Each entry holds the iterator over the children of an open
+        # node, the function they belong to and their loop depth
+        stack = [(iter((node,)),None,0)]
+        while stack:
+            children, function, loop_depth = stack[-1]
+
+            # Open the next child, or close the node if there are no more
+            for node in children:
+                node_class = node.__class__
+
+                if node_class is pycparser.c_ast.FuncDef:
+                    loader = None
+                    if lazy:
+                        loader = functools.partial(FuncDefForVisitor.for_loops_data,node)
+
+                    function = FunctionInfo(
+                        name=node.decl.name,
+                        begin=node.decl.coord.line,
+                        end=node.body.end_coord.line,
+                        loader=loader
+                    )
+                    funcdefs_data.append(function)
+
+                    if lazy:
+                        break
+
+                elif function is not None and node_class is pycparser.c_ast.For:
+                    # A loop with a single statement ends where it begins
+                    end_coord = getattr(node.stmt,'end_coord',node.coord)
+                    function.for_loops.append(LoopInfo(
+                        nro=len(function.for_loops),
+                        depth=loop_depth,
+                        begin=node.coord.line,
+                        end=end_coord.line,
+                        function_begin=function.begin
+                    ))
+                    loop_depth += 1
+
+                stack.append((iter(node),function,loop_depth))
+                break
+            else:
+                stack.pop()
+
+        return funcdefs_data
@@ -9,9 +9,20 @@ the original one.
    https://github.com/DonAurelio/pycparser
 """
 
+import io
 import os
+import re
+import shutil
+import functools
+import subprocess
+from ... import cache
 from . import ast_visitor
 from . import pycparser
+from . import pool
+from . import preprocessor
+from . import records
+from . import scanner
+from . import spans_parser
 
 
 FAKE_DEFINES = '#include <_fake_defines.h>'
@@ -52,6 +63,95 @@ The docstring may span multiple lines. The type may optionally be specified
 on the first line, separated by a colon.
 """
 
+CPP_BACKEND = 'cpp'
+"""str: Preprocess the code with an external C preprocessor (cpp)."""
+
+PLY_BACKEND = 'ply'
+"""str: Preprocess the code in-process with the PLY preprocessor.
+The fake libc headers are tokenized once and cached in memory, so
+no process is forked on each parse.
+"""
+
+PREPROCESSOR_BACKEND = CPP_BACKEND
+"""str: Preprocessing backend used when parse_cfile is not given one."""
+
+SNAPSHOT_FAKE_HEADERS = True
+"""bool: Parse the fake headers only once.
+The typedefs of each fake header are parsed once per process and the
+resulting parser scope is kept, each code is parsed from the scopes
+of the headers it includes, with their content removed from its
+preprocessed text. The ASTs do not include the fake headers
+declarations.
+"""
+
+FAKE_HEADER_SEGMENT = re.compile(r"""
+    ^\#[ \t]*(?:line[ \t]+)?\d+[ \t]+"[^"\n]*?(?P<header>_fake_(?:defines|typedefs)\.h)".*?
+    (?=^\#[ \t]*(?:line[ \t]+)?\d+[ \t]+"(?![^"\n]*_fake_(?:defines|typedefs)\.h")|\Z)
+""",re.VERBOSE | re.MULTILINE | re.DOTALL)
+"""re.Pattern: The preprocessed content of a fake header.
+From the line marker that enters a fake header to the line marker
+that returns to another file, which is kept.
+"""
+
+_fake_headers_scopes = {}
+
+SPANS_PARSING = True
+"""bool: Extract the functions data from a skeletal AST.
+The code is parsed with spans_parser.SpansCParser, which does not build the
+expressions and declarations the functions data does not need. The
+public parse functions always return the whole AST.
+"""
+
+PREPROCESS_CACHE = cache.LRUCache(max_bytes=32 * 1024 * 1024)
+"""cache.LRUCache: Preprocessed codes, None to disable the cache.
+An entry is keyed by the code, the preprocessor and its arguments. It
+keeps the state of the include dirs and of the files included by the
+code, the entry is discarded when any of them changes.
+"""
+
+LINE_MARKER = re.compile(r'^\#[ \t]*(?:line[ \t]+)?\d+[ \t]+"([^"\n]*)"',re.MULTILINE)
+"""re.Pattern: A line marker of the preprocessed code, it names a source file."""
+
+def split_lines(text):
+    """Split a C99 source code in lines, as a text file would be read.
+
+    Args:
+        text (str): C99 source code.
+
+    Returns:
+        List[str]: The source code lines, each one keeps its newline.
+    """
+    return io.StringIO(text,newline=None).readlines()
+
+def fake_ctext(text):
+    """Include fake include headers in a C99 source code given as text.
+
+    The first two *#include* lines are replaced by FAKE_INCLUDES, the
+    other ones are removed, see fake_cfile.
+
+    Args:
+        text (str): C99 source code which include headers needs
+            to be faked.
+
+    Returns:
+        str: The faked source code, it has the same number of lines
+            as the given one.
+    """
+    new_lines = []
+    fake_includes = FAKE_INCLUDES[:]
+
+    for line in split_lines(text):
+        if fake_includes and '#include' in line:
+            new_lines.append(fake_includes.pop(0) + '\n')
+
+        elif '#include' in line:
+            new_lines.append('//include removed' + '\n')
+            
+        else:
+            new_lines.append(line)
+
+    return ''.join(new_lines)
+
 def fake_cfile(file_path):
     """Include fake include header with the basic C99 type definitions.
     To parce a C99 source code it is not neccesary to get the whole
@@ -73,51 +173,358 @@ def fake_cfile(file_path):
     new_file_name = 'fake_' + file_name
     faked_file_path = os.path.join(dir_path,new_file_name)
 
-    file_lines = []
-    new_lines = []
-
     with open(file_path,'r') as file:
-        file_lines = file.readlines()
-        fake_includes = FAKE_INCLUDES[:]
+        faked_text = fake_ctext(file.read())
 
-        for line in file_lines:
-            if fake_includes and '#include' in line:
-                new_lines.append(fake_includes.pop(0) + '\n')
+    with open(faked_file_path,'w') as fakefile:
+        fakefile.write(faked_text)
 
-            elif '#include' in line:
-                new_lines.append('//include removed' + '\n')
-                
-            else:
-                new_lines.append(line)
+    return faked_file_path
 
-        with open(faked_file_path,'w') as fakefile:
-            fakefile.write(''.join(new_lines))
+def _file_state(path):
+    """Return the modification time and size of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns,stat.st_size)
 
-    return faked_file_path
+def _included_files(preprocessed_text,include_dirs,source=''):
+    """Return the paths of the files named in the line markers of a preprocessed code.
+
+    The source itself is not included, its text is already known.
+    """
+    paths = set()
+    for name in set(LINE_MARKER.findall(preprocessed_text)) - {source}:
+        for path in [name] + [os.path.join(include_dir,name) for include_dir in include_dirs]:
+            if os.path.isfile(path):
+                paths.add(os.path.realpath(path))
+                break
+
+    return sorted(paths)
+
+def _run_preprocessor(text,filename,preprocesor,backend,include_dirs):
+    """Preprocess a code with the given backend, see preprocess_ctext."""
+    if backend == PLY_BACKEND:
+        return preprocessor.preprocess_text(text,filename,include_dirs)
+
+    # cpp reads the code from stdin, the line marker names the
+    # source in its diagnostics and line markers instead of <stdin>
+    if filename:
+        text = '# 1 "%s"\n' % filename.replace('\\','\\\\').replace('"','\\"') + text
+
+    try:
+        process = subprocess.Popen(
+            [preprocesor,'-E'] + [r'-I%s' % include_dir for include_dir in include_dirs] + ['-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        preprocessed_text, errors = process.communicate(text)
+    except OSError as e:
+        raise RuntimeError("Unable to invoke 'cpp'.  " +
+            'Make sure its path was passed correctly\n' +
+            ('Original error: %s' % e))
+
+    if process.returncode != 0:
+        raise RuntimeError("'cpp' failed with exit status %d\n%s" % (
+            process.returncode,errors))
+
+    return preprocessed_text
+
+def preprocess_ctext(text,filename='',preprocesor='cpp',backend=None):
+    """Preprocess a C99 source code given as text, no file is written.
+
+    The preprocessed codes are kept in PREPROCESS_CACHE, so the
+    preprocessor is not run again for a code already seen unless the
+    include dirs or the headers it includes were changed.
+
+    Args:
+        text (str): The C99 source code, its headers already faked.
+        filename (str): Name of the source, used in the line markers
+            and in the diagnostics of the preprocessor.
+        preprocesor (str): C preprocessor, used by the cpp backend
+            which reads the source code from its standard input.
+        backend (Optional[str]): CPP_BACKEND or PLY_BACKEND, defaults
+            to PREPROCESSOR_BACKEND.
+
+    Returns:
+        str: The preprocessed source code.
+
+    Raises:
+        RuntimeError: If the preprocessor can not be run or it fails,
+            e.g. an included header is missing. Failures are not cached.
+    """
+    backend = backend or PREPROCESSOR_BACKEND
+
+    if backend not in (CPP_BACKEND,PLY_BACKEND):
+        raise ValueError('Unknown preprocessor backend %r' % backend)
+
+    include_dirs = [FAKE_INCLUDES_DIR]
+
+    preprocess_cache = PREPROCESS_CACHE
+    if preprocess_cache is None:
+        return _run_preprocessor(text,filename,preprocesor,backend,include_dirs)
+
+    # The PLY backend does not use the preprocessor
+    if backend == CPP_BACKEND:
+        preprocesor = shutil.which(preprocesor) or preprocesor
+        key = preprocess_cache.key(text,backend,filename,preprocesor,*include_dirs)
+    else:
+        key = preprocess_cache.key(text,backend,filename,*include_dirs)
+
+    entry = preprocess_cache.get(key)
+    if entry is not None:
+        preprocessed_text, files_state = entry
+        if all(_file_state(path) == state for path, state in files_state):
+            return preprocessed_text
+
+    preprocessed_text = _run_preprocessor(text,filename,preprocesor,backend,include_dirs)
+
+    # Adding or removing a header changes the state of its directory
+    paths = include_dirs + _included_files(preprocessed_text,include_dirs,filename)
+    files_state = [(path,_file_state(path)) for path in paths]
+    preprocess_cache.set(key,(preprocessed_text,files_state))
+
+    return preprocessed_text
+
+def parse_ctext(text,filename='',preprocesor='cpp',backend=None):
+    """Parse a C99 source code given as text into a Syntrax Abstract Tree.
+
+    The headers faking, the preprocessing and the parsing are 
+    performed in memory, no file is written.
+
+    Args:
+        text (str): The C99 source code to be parsed.
+        filename (str): Name of the source code, for error messages.
+        preprocesor (str): C preprocessor, used by the cpp backend.
+        backend (Optional[str]): CPP_BACKEND or PLY_BACKEND, defaults
+            to PREPROCESSOR_BACKEND.
+
+    Returns:
+        A Syntrax Abstract Tree.
+    """
+    return _parse_faked_ctext(fake_ctext(text),filename,preprocesor,backend)
+
+def fake_header_scope(header,preprocesor='cpp',backend=None):
+    """Return the parser scope after a fake header, it is parsed once.
+
+    Args:
+        header (str): The header file name, e.g. _fake_typedefs.h.
+
+    Returns:
+        dict: The typedef names declared by the header, see
+            pycparser.CParser.snapshot_scope.
+    """
+    scope = _fake_headers_scopes.get(header)
+
+    if scope is None:
+        header_text = '#include <%s>\n' % header
+        preprocessed_text = preprocess_ctext(header_text,'',preprocesor,backend)
+
+        with pool.PARSERS.parser() as cparser:
+            cparser.parse(preprocessed_text)
+            scope = _fake_headers_scopes[header] = cparser.snapshot_scope()
+
+    return scope
+
+def strip_fake_headers(preprocessed_text):
+    """Remove the content of the fake headers from a preprocessed code.
+
+    The line markers that return to the code are kept, so the
+    coordinates of the code are not changed.
+
+    Returns:
+        tuple(str,List[str]): The stripped code and the file names of
+            the fake headers removed, in the order they were included.
+    """
+    headers = []
+
+    def strip(match):
+        if match.group('header') not in headers:
+            headers.append(match.group('header'))
+        return ''
+
+    return FAKE_HEADER_SEGMENT.sub(strip,preprocessed_text), headers
 
-def parse_cfile(file_path,preprocesor='cpp'):
+def _parse_faked_ctext(faked_text,filename='',preprocesor='cpp',backend=None,skeletal=False):
+    """Parse a C99 source code which headers were already faked.
+
+    Args:
+        skeletal (bool): Parse with a spans_parser.SpansCParser, the AST holds
+            only the function definitions and their loops.
+    """
+    preprocessed_text = preprocess_ctext(faked_text,filename,preprocesor,backend)
+
+    scope = None
+    if SNAPSHOT_FAKE_HEADERS:
+        preprocessed_text, headers = strip_fake_headers(preprocessed_text)
+        scope = {}
+        for header in headers:
+            scope.update(fake_header_scope(header,preprocesor,backend))
+
+    # The parser is borrowed from a process-wide pool, so the
+    # LALR tables are not rebuilt on each parse.
+    parsers = spans_parser.PARSERS if skeletal else pool.PARSERS
+    with parsers.parser() as cparser:
+        ast = cparser.parse(preprocessed_text,filename,scope=scope)
+
+    return ast
+
+def parse_cfile(file_path,preprocesor='cpp',backend=None):
     """Parse a C99 source code into a Syntrax Abstract Tree.
     
     Args:
         file_path (str): Path to the file to be parsed.
-        preprocesor (str): C preprocessor.
+        preprocesor (str): C preprocessor, used by the cpp backend.
+        backend (Optional[str]): CPP_BACKEND or PLY_BACKEND, defaults
+            to PREPROCESSOR_BACKEND.
 
     Returns:
         A Syntrax Abstract Tree.
     """
-    faked_file_path = fake_cfile(file_path=file_path)
+    with open(file_path,'r') as file:
+        text = file.read()
 
-    ast = pycparser.parse_file(filename=faked_file_path,use_cpp=True,
-        cpp_path=preprocesor, cpp_args=['-E', r'-I%s' % FAKE_INCLUDES_DIR])
+    return parse_ctext(text,file_path,preprocesor,backend)
 
-    return ast
 
+def _blank_functions(faked_text,spans,names):
+    """Replace the definitions of the functions not in names by blank lines.
+
+    The line numbers are kept, so the coordinates of the remaining
+    functions are the same as in the whole code.
+    """
+    lines = split_lines(faked_text)
+    for span in spans:
+        if span.name not in names:
+            for index in range(span.first_line - 1,span.end):
+                lines[index] = '\n'
+
+    return ''.join(lines)
+
+
+def _selective_for_loops(faked_text,spans,name,filename=''):
+    """Parse a single function of the code and return its loops."""
+    code_ast = _parse_faked_ctext(
+        _blank_functions(faked_text,spans,{name}),filename,skeletal=SPANS_PARSING
+    )
+    function, = ast_visitor.FuncDefForVisitor.funcdefs_data(code_ast)
+    return function.for_loops
+
+
+class FunctionLoopsLoader(object):
+    """Loads the loops of a function parsing only that function.
+
+    The loader keeps the faked source code instead of the function AST,
+    so the records with unloaded loops are pickled as they are, e.g. by
+    the parse cache, see records.FunctionInfo.
+    """
+
+    __slots__ = ('faked_text','spans','name','filename')
+
+    #: bool: The loader is pickled along with the unloaded records.
+    picklable = True
+
+    def __init__(self,faked_text,spans,name,filename=''):
+        self.faked_text = faked_text
+        self.spans = spans
+        self.name = name
+        self.filename = filename
+
+    def __call__(self):
+        return _selective_for_loops(self.faked_text,self.spans,self.name,self.filename)
+
+    def __reduce__(self):
+        return (FunctionLoopsLoader,(self.faked_text,self.spans,self.name,self.filename))
 
-def get_data_from_cfile(file_path,compiler='gcc'):
+
+def _selective_funcdefs_data(faked_text,functions,filename='',lazy=False):
+    """Extract the functions data parsing only the given functions.
+
+    The function definitions are located with scanner.function_spans,
+    then the code is parsed with the other functions blanked out. The
+    loops of the other functions are parsed on the first access.
+
+    Returns:
+        List[records.FunctionInfo]: The functions data, or None if the
+            code can not be parsed selectively, e.g. the scanner does
+            not recognize some definition.
+    """
+    spans = scanner.function_spans(faked_text)
+    if spans is None:
+        return None
+
+    names = set(functions)
+    try:
+        code_ast = _parse_faked_ctext(
+            _blank_functions(faked_text,spans,names),filename,skeletal=SPANS_PARSING
+        )
+    except pycparser.plyparser.ParseError:
+        return None
+
+    parsed = {
+        function.name: function
+        for function in ast_visitor.FuncDefForVisitor.funcdefs_data(code_ast,lazy=lazy)
+    }
+
+    fundefs_data = []
+    for span in spans:
+        if span.name in names:
+            function = parsed.pop(span.name,None)
+            if function is None or (function.begin,function.end) != (span.begin,span.end):
+                return None
+        else:
+            loader = FunctionLoopsLoader(faked_text,spans,span.name,filename)
+            function = records.FunctionInfo(span.name,span.begin,span.end,loader=loader)
+
+        fundefs_data.append(function)
+
+    # A definition the scanner did not see, e.g. generated by a macro
+    if parsed:
+        return None
+
+    return fundefs_data
+
+
+def _cacheable_funcdefs_data(faked_text,fundefs_data,filename=''):
+    """Return the functions data in the form kept by the parse cache.
+
+    The loops which are not loaded yet are not loaded to be cached, each
+    of those functions gets a FunctionLoopsLoader instead of its AST.
+    If the code can not be scanned the loops are loaded when the data
+    is pickled.
+    """
+    if all(function.loops_loaded for function in fundefs_data):
+        return fundefs_data
+
+    spans = scanner.function_spans(faked_text)
+    if spans is None or [
+        (span.name,span.begin,span.end) for span in spans
+    ] != [
+        (function.name,function.begin,function.end) for function in fundefs_data
+    ]:
+        return fundefs_data
+
+    cacheable_data = []
+    for function in fundefs_data:
+        if not function.loops_loaded:
+            loader = FunctionLoopsLoader(faked_text,spans,function.name,filename)
+            function = records.FunctionInfo(
+                function.name,function.begin,function.end,raw=function.raw,loader=loader
+            )
+        cacheable_data.append(function)
+
+    return cacheable_data
+
+
+def get_data_from_text(text,file_path=None,cache=None,lazy=False,functions=None):
     """Split a C99 source code in sections.
 
     Use pycparser to parse a C99 source code and dive it into three sections.
-    **include**, **declaration**, **functions**. 
+    **include**, **declaration**, **functions**. The whole process works
+    on strings, no file is written or read.
 
     Example:
 
@@ -137,7 +544,8 @@ def get_data_from_cfile(file_path,compiler='gcc'):
         }
         
 
-        file_path, it is the path to the parsed file. Include, raw inclides 
+        file_path, it is the path to the parsed file (None when the code
+        was not read from a file). Include, raw inclides 
         sections in the file. Declarations, raw declarations in the file.
         Functions, a list of dict, which contains information about each 
         function, the line on which it begin and end in the code, finally 
@@ -148,35 +556,189 @@ def get_data_from_cfile(file_path,compiler='gcc'):
         it is to say, C99 source code.
 
     Args:
-        file_path (str): The path to the C99 source file to be parsed.
-        compiler (str): The compiler to preprocess the c99 source code file.
-
+        text (str): The C99 source code to be parsed.
+        file_path (Optional[str]): The path to the file the source code
+            was read from, if any.
+        cache (Optional[pragcc.core.cache.LRUCache]): A cache for the
+            functions data, keyed by the faked source code.
+        lazy (bool): If True, the loops of each function are extracted
+            on the first access to its for_loops. The cached data keeps
+            them unloaded, they are parsed from the code when needed.
+        functions (Optional[Iterable[str]]): Selective parsing, only the
+            given functions are parsed, the other ones are located with
+            a lexer scan and parsed on the first access to their loops.
+            The whole code is parsed if the scan fails.
 
     Returns:
         dict: a dict containing the sections of the C99 source code.
     """
 
-    code_ast = parse_cfile(file_path)
-    visitor = ast_visitor.FuncDefVisitor()
-    funcdefs = visitor.funcdefs(code_ast)
-    fundefs_data = visitor.funcdefs_data(funcdefs)
+    faked_text = fake_ctext(text)
+
+    # The functions data only depends on the faked text, the sections
+    # are always taken from the given text since sources which differ
+    # only in their include headers have the same faked text.
+    fundefs_data = None
+    if cache is not None:
+        cache_key = cache.key(faked_text)
+        fundefs_data = cache.get(cache_key)
+
+    # The selective data covers only some functions, so it is not cached
+    if fundefs_data is None and functions is not None:
+        fundefs_data = _selective_funcdefs_data(faked_text,functions,file_path or '',lazy)
+
+    if fundefs_data is None:
+        code_ast = _parse_faked_ctext(faked_text,file_path or '',skeletal=SPANS_PARSING)
+        fundefs_data = ast_visitor.FuncDefForVisitor.funcdefs_data(code_ast,lazy=lazy)
+
+        if cache is not None:
+            cache.set(cache_key,_cacheable_funcdefs_data(faked_text,fundefs_data,file_path or ''))
     
+    return _split_sections(text,fundefs_data,file_path)
+
+
+def _split_sections(text,fundefs_data,file_path=None):
+    """Return the code data of the given code and functions data.
+
+    The raw code of each function is set from the given code.
+    """
     code_data = {}
 
-    with open(file_path,'r') as file:
-        code_lines = file.readlines()
+    code_lines = split_lines(text)
+    includes_end_line = [ line + 1 for line, raw in enumerate(code_lines) \
+     if '#include' in raw ][-1]
+    fundef_init_line = fundefs_data[0]['begin'] - 1
+
+    code_data['file_path'] = file_path
+    code_data['include'] = ''.join(code_lines[:includes_end_line])
+    code_data['declaration'] = ''.join(code_lines[includes_end_line:fundef_init_line])
+    code_data['functions'] = fundefs_data
+
+    for funcdef_data in code_data['functions']:
+        begin = funcdef_data['begin'] - 1
+        end = funcdef_data['end']
+        funcdef_data['raw'] = ''.join(code_lines[begin:end])
+
+    return code_data
+
+
+def _shift_for_loops(function,offset):
+    """Return a copy of the loops of a function moved offset lines."""
+    return [
+        records.LoopInfo(
+            loop.nro,
+            loop.depth,
+            loop.begin + offset,
+            loop.end + offset,
+            loop.function_begin + offset
+        )
+        for loop in function.for_loops
+    ]
+
+
+def _shift_function(function,begin):
+    """Return a copy of a function data moved to begin in the given line.
+
+    If the loops of the function were not loaded yet, they are
+    loaded and moved on the first access to the copy loops.
+    """
+    offset = begin - function.begin
+    if function.loops_loaded:
+        return records.FunctionInfo(
+            function.name,
+            begin,
+            function.end + offset,
+            for_loops=_shift_for_loops(function,offset)
+        )
+
+    return records.FunctionInfo(
+        function.name,
+        begin,
+        function.end + offset,
+        loader=functools.partial(_shift_for_loops,function,offset)
+    )
+
+
+def get_updated_data_from_text(previous_data,text,file_path=None,lazy=False):
+    """Split a new version of a C99 source code reusing the previous data.
+
+    The new version is compared with the previous one function by
+    function. Only the functions whose code changed are parsed, the
+    data of the other ones is reused and moved to their new lines.
+    The whole code is parsed if its declarations changed or if it
+    can not be scanned, see scanner.function_spans.
+
+    Args:
+        previous_data (dict): The data of the previous version, as returned
+            by get_data_from_text, the raw code of its functions must
+            not be modified.
+        text (str): The new version of the source code.
+        file_path (Optional[str]): The path to the file the source code
+            was read from, if any.
+        lazy (bool): See get_data_from_text.
+
+    Returns:
+        tuple(dict,Optional[set]): The code data and the names of the parsed
+            functions, None if the whole code was parsed.
+    """
+    faked_text = fake_ctext(text)
+    spans = scanner.function_spans(faked_text)
+
+    if spans:
+        code_lines = split_lines(text)
         includes_end_line = [ line + 1 for line, raw in enumerate(code_lines) \
          if '#include' in raw ][-1]
-        fundef_init_line = fundefs_data[0]['begin'] - 1
+        declaration = ''.join(code_lines[includes_end_line:spans[0].begin - 1])
 
-        code_data['file_path'] = file_path
-        code_data['include'] = ''.join(code_lines[:includes_end_line])
-        code_data['declaration'] = ''.join(code_lines[includes_end_line:fundef_init_line])
-        code_data['functions'] = fundefs_data
+    if not spans or declaration != previous_data['declaration']:
+        return get_data_from_text(text,file_path,lazy=lazy), None
 
-        for funcdef_data in code_data['functions']:
-            begin = funcdef_data['begin'] - 1
-            end = funcdef_data['end']
-            funcdef_data['raw'] = ''.join(code_lines[begin:end])
+    previous_functions = {
+        function['name']: function for function in previous_data['functions']
+    }
 
-    return code_data
+    reused = {}
+    for span in spans:
+        function = previous_functions.get(span.name)
+        raw = ''.join(code_lines[span.begin - 1:span.end])
+        if function is not None and function['raw'] == raw:
+            reused[span.name] = _shift_function(function,span.begin)
+
+    changed = set(span.name for span in spans if span.name not in reused)
+
+    if changed:
+        fundefs_data = _selective_funcdefs_data(faked_text,changed,file_path or '',lazy)
+        if fundefs_data is None:
+            return get_data_from_text(text,file_path,lazy=lazy), None
+        fundefs_data = [
+            reused.get(function.name,function) for function in fundefs_data
+        ]
+    else:
+        fundefs_data = [reused[span.name] for span in spans]
+
+    return _split_sections(text,fundefs_data,file_path), changed
+
+
+def get_data_from_cfile(file_path,compiler='gcc',cache=None,lazy=False,functions=None):
+    """Split a C99 source code file in sections.
+
+    See get_data_from_text for the sections description.
+
+    Args:
+        file_path (str): The path to the C99 source file to be parsed.
+        compiler (str): The compiler to preprocess the c99 source code file.
+        cache (Optional[pragcc.core.cache.LRUCache]): A cache for the
+            functions data, keyed by the faked source code.
+        lazy (bool): If True, the loops of each function are extracted
+            on the first access to its for_loops. The cached data keeps
+            them unloaded, they are parsed from the code when needed.
+        functions (Optional[Iterable[str]]): Selective parsing, see
+            get_data_from_text.
+
+    Returns:
+        dict: a dict containing the sections of the C99 source code.
+    """
+    with open(file_path,'r') as file:
+        text = file.read()
+
+    return get_data_from_text(text,file_path,cache,lazy,functions)
@@ -0,0 +1,142 @@
+# -*- encoding: utf-8 -*-
+"""Parser Pool Module.
+Building a pycparser.CParser object is expensive, the lexer and the
+LALR tables of the C99 grammar need to be constructed by PLY. This
+module keeps the generated tables inside the vendored pycparser
+package and a process-wide pool of reusable CParser objects, so the
+tables are built once and every parse just borrows a ready parser.
+
+Example:
+
+    with pool.PARSERS.parser() as cparser:
+        ast = cparser.parse(text,filename)
+
+"""
+
+import os
+import sys
+import queue
+import importlib
+import contextlib
+from . import pycparser
+
+
+LEXTAB = pycparser.__name__ + '.lextab'
+"""str: Module path of the lexer table.
+The pycparser defaults ('pycparser.lextab') can not be imported when
+pycparser lives inside the pragcc package, so we point PLY to the
+vendored package path.
+"""
+
+YACCTAB = pycparser.__name__ + '.yacctab'
+"""str: Module path of the LALR parsing table."""
+
+TABLES_DIR = os.path.dirname(os.path.realpath(pycparser.__file__))
+"""str: Directory on which the lextab.py and yacctab.py are written."""
+
+POOL_SIZE = 8
+"""int: Maximum number of idle parsers kept by the pool."""
+
+
+def create_parser():
+    """Return a new CParser built from the prebuilt tables.
+
+    If the tables do not exist yet, PLY generates them and writes
+    them into TABLES_DIR, then the next parsers just import them.
+
+    Returns:
+        pycparser.CParser: A parser ready to be used.
+    """
+    return pycparser.CParser(
+        lex_optimize=True,
+        lextab=LEXTAB,
+        yacc_optimize=True,
+        yacctab=YACCTAB,
+        taboutputdir=TABLES_DIR
+    )
+
+
+def build_tables():
+    """Generate the lexer and LALR tables into the pycparser package.
+
+    This function is intended to be called at build or install
+    time, see pycparser/_build_tables.py.
+
+    Returns:
+        List[str]: The paths of the generated table modules.
+    """
+    # Stale tables are removed, otherwise PLY in optimized mode
+    # would load them without checking the grammar signature.
+    for module_path in (LEXTAB,YACCTAB):
+        table_path = os.path.join(TABLES_DIR,module_path.split('.')[-1] + '.py')
+        if os.path.exists(table_path):
+            os.remove(table_path)
+        sys.modules.pop(module_path,None)
+
+    create_parser()
+
+    # Load to compile into .pyc
+    tables = [importlib.import_module(module_path) for module_path in (LEXTAB,YACCTAB)]
+
+    return [table.__file__ for table in tables]
+
+
+class ParserPool(object):
+    """A thread safe pool of reusable pycparser.CParser objects."""
+
+    def __init__(self,size=POOL_SIZE,factory=create_parser):
+        """Create the pool.
+
+        Args:
+            size (int): Maximum number of idle parsers retained,
+                parsers released when the pool is full are discarded.
+            factory (callable): Returns a new parser when none is idle.
+        """
+        self._parsers = queue.LifoQueue(maxsize=size)
+        self._factory = factory
+
+    @property
+    def idle(self):
+        """int: Number of parsers waiting to be acquired."""
+        return self._parsers.qsize()
+
+    def acquire(self):
+        """Return an idle parser, a new one is created if none is available.
+
+        Returns:
+            pycparser.CParser: A parser in a clean state.
+        """
+        try:
+            return self._parsers.get_nowait()
+        except queue.Empty:
+            return self._factory()
+
+    def release(self,cparser):
+        """Reset the given parser and give it back to the pool.
+
+        Args:
+            cparser (pycparser.CParser): A parser previously acquired.
+        """
+        cparser.reset()
+        try:
+            self._parsers.put_nowait(cparser)
+        except queue.Full:
+            pass
+
+    @contextlib.contextmanager
+    def parser(self):
+        """Lend a parser for the duration of a with block."""
+        cparser = self.acquire()
+        try:
+            yield cparser
+        finally:
+            self.release(cparser)
+
+
+PARSERS = ParserPool()
+"""ParserPool: Process-wide parser pool.
+The first parser is created at import time, so the tables are loaded
+(or generated, when missing) only once per process.
+"""
+
+PARSERS.release(create_parser())
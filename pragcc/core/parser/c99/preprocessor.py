@@ -0,0 +1,250 @@
+# -*- encoding: utf-8 -*-
+"""Preprocessor Module.
+An in-process C preprocessor built on top of the PLY preprocessor
+shipped with pycparser (pycparser.ply.cpp). It avoids forking an
+external *cpp* on each parse, the include headers (typically the
+fake libc headers) are read and tokenized once, then they are served
+from memory on each subsequent preprocessing.
+
+The output keeps the line numbers of the given source, *# <line> "<file>"*
+markers are emitted around each included header, so the coordinates
+reported by the parser match the original file.
+
+Note:
+    Unlike *cpp*, unknown directives such as *#pragma* are dropped
+    from the output. The errors found, e.g. a missing header, raise a
+    PreprocessorError instead of being printed.
+"""
+
+import os
+import copy
+from .pycparser.ply import cpp
+from .pycparser.ply import lex
+
+
+LEXER = lex.lex(module=cpp)
+"""ply.lex.Lexer: The preprocessor lexer, each Preprocessor uses a clone."""
+
+_HEADERS = {}
+"""Dict[str,tuple]: Header path to its (mtime, size) and text, shared across preprocessors."""
+
+_TOKENIZED = {}
+"""Dict[str,List[list]]: Header text to its tokens grouped by line."""
+
+
+def _forget_header(header_path):
+    """Drop the cached text of a header, and its tokens unless another header has the same text."""
+    state, text = _HEADERS.pop(header_path)
+    if all(other_text != text for other_state, other_text in _HEADERS.values()):
+        _TOKENIZED.pop(cpp.trigraph(text),None)
+
+
+class PreprocessorError(RuntimeError):
+    """Raised when the source can not be preprocessed, as a failed *cpp* run."""
+
+
+class Preprocessor(cpp.Preprocessor):
+    """A PLY preprocessor which caches the headers found in its include dirs."""
+
+    def __init__(self,include_dirs=()):
+        """Create a preprocessor.
+
+        Args:
+            include_dirs (Iterable[str]): Directories where the headers
+                included as *#include <header.h>* are searched for.
+        """
+        super(Preprocessor,self).__init__(LEXER.clone())
+        for include_dir in include_dirs:
+            self.add_path(include_dir)
+
+        self._depth = 0
+
+    def error(self,file,line,msg):
+        raise PreprocessorError('%s:%d %s' % (file,line,msg))
+
+    def _line_marker(self,line,source):
+        """Return a token with a '# <line> "<source>"' line marker."""
+        marker = lex.LexToken()
+        marker.type = self.t_NEWLINE
+        marker.value = '\n# %d "%s"\n' % (line,source)
+        marker.lineno = line
+        marker.lexpos = 0
+        return marker
+
+    def _numbered_lines(self,grouped_lines):
+        """Fix the line grouping done by the PLY preprocessor.
+
+        A single whitespace token may hold several newlines, so the
+        blank lines following a directive are grouped with it, and line
+        comments do not increment the lexer line number. Here each group
+        ends with exactly one newline and its tokens get the right line.
+        """
+        lineno = 1
+        for line in grouped_lines:
+            last = line[-1]
+            newlines = last.value.count('\n') if last.type in self.t_WS else 0
+
+            for tok in line:
+                tok.lineno = lineno
+
+            if newlines > 1:
+                end = last.value.index('\n') + 1
+                rest = copy.copy(last)
+                rest.value = last.value[end:]
+                rest.lineno = lineno + 1
+                last.value = last.value[:end]
+                yield line
+                yield [rest]
+            else:
+                yield line
+
+            lineno += newlines
+
+    def _read_header(self,header_path):
+        """Return the text of a header, it is read and tokenized only once.
+
+        The header is read again if it was modified since then, the
+        entries of its previous text are dropped, as the ones of a
+        header which no longer exists.
+        """
+        header = _HEADERS.get(header_path)
+        try:
+            stat = os.stat(header_path)
+        except OSError:
+            if header is not None:
+                _forget_header(header_path)
+            raise
+
+        state = (stat.st_mtime_ns,stat.st_size)
+
+        if header is None or header[0] != state:
+            if header is not None:
+                _forget_header(header_path)
+
+            with open(header_path,'r') as file:
+                text = file.read()
+
+            input = cpp.trigraph(text)
+            _TOKENIZED[input] = list(self.group_lines(input))
+            _HEADERS[header_path] = header = (state,text)
+
+        return header[1]
+
+    def group_lines(self,input):
+        """Group the input in lines of tokens, cached headers are not re-tokenized."""
+        lines = _TOKENIZED.get(input)
+        if lines is None:
+            return self._numbered_lines(super(Preprocessor,self).group_lines(input))
+
+        # Tokens are copied since the macro expansion modifies them
+        return ([copy.copy(tok) for tok in line] for line in lines)
+
+    def parsegen(self,input,source=None):
+        if self._depth:
+            yield self._line_marker(1,source)
+
+        self._depth += 1
+        try:
+            for tok in super(Preprocessor,self).parsegen(input,source):
+                yield tok
+        finally:
+            self._depth -= 1
+
+    def include(self,tokens):
+        """Process an include directive.
+
+        The logic is the same as in pycparser.ply.cpp.Preprocessor.include,
+        but the headers found in the include dirs are served from memory
+        and a line marker is emitted to return to the including file.
+        """
+        if not tokens:
+            return
+
+        line = tokens[0].lineno
+        source = self.source
+
+        if tokens[0].value != '<' and tokens[0].type != self.t_STRING:
+            tokens = self.expand_macros(tokens)
+
+        if tokens[0].value == '<':
+            # Include <...>
+            i = 1
+            while i < len(tokens):
+                if tokens[i].value == '>':
+                    break
+                i += 1
+            else:
+                self.error(source,line,"Malformed #include <...>")
+            filename = "".join([x.value for x in tokens[1:i]])
+            path = self.path + [""] + self.temp_path
+        elif tokens[0].type == self.t_STRING:
+            filename = tokens[0].value[1:-1]
+            path = self.temp_path + [""] + self.path
+        else:
+            self.error(source,line,"Malformed #include statement")
+
+        for p in path:
+            iname = os.path.join(p,filename)
+            try:
+                if p in self.path:
+                    data = self._read_header(iname)
+                else:
+                    with open(iname,'r') as file:
+                        data = file.read()
+            except IOError:
+                continue
+
+            dname = os.path.dirname(iname)
+            if dname:
+                self.temp_path.insert(0,dname)
+            for tok in self.parsegen(data,filename):
+                yield tok
+            if dname:
+                del self.temp_path[0]
+
+            yield self._line_marker(line + 1,source)
+            break
+        else:
+            self.error(source,line,"Couldn't find '%s'" % filename)
+
+
+def preprocess_text(text,filename='',include_dirs=()):
+    """Preprocess a C source code given as text.
+
+    Args:
+        text (str): C source code.
+        filename (str): Name of the source, used in the line markers.
+        include_dirs (Iterable[str]): Directories to look for headers.
+
+    Returns:
+        str: The preprocessed source code.
+
+    Raises:
+        PreprocessorError: If the source can not be preprocessed.
+    """
+    preprocessor = Preprocessor(include_dirs)
+    preprocessor.parse(text,filename)
+
+    chunks = []
+    tok = preprocessor.token()
+    while tok:
+        chunks.append(str(tok.value))
+        tok = preprocessor.token()
+
+    return ''.join(chunks)
+
+
+def preprocess_file(file_path,include_dirs=()):
+    """Preprocess a C source code file.
+
+    Args:
+        file_path (str): Path to the C source code file.
+        include_dirs (Iterable[str]): Directories to look for headers.
+
+    Returns:
+        str: The preprocessed source code.
+    """
+    with open(file_path,'r') as file:
+        text = file.read()
+
+    return preprocess_text(text,file_path,include_dirs)
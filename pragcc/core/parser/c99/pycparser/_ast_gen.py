@@ -69,8 +69,13 @@ class NodeCfg(object):
         self.attr = []
         self.child = []
         self.seq_child = []
+        self.coords = []
 
         for entry in contents:
+            if entry.endswith('@'):
+                self.coords.append(entry[:-1])
+                continue
+
             clean_entry = entry.rstrip('*')
             self.all_entries.append(clean_entry)
 
@@ -83,30 +88,46 @@ class NodeCfg(object):
 
     def generate_source(self):
         src = self._gen_init()
+        if self.coords:
+            src += '\n' + self._gen_coords()
         src += '\n' + self._gen_children()
+        src += '\n' + self._gen_iter()
         src += '\n' + self._gen_attr_names()
         return src
 
     def _gen_init(self):
         src = "class %s(Node):\n" % self.name
 
-        if self.all_entries:
-            args = ', '.join(self.all_entries)
-            slots = ', '.join("'{0}'".format(e) for e in self.all_entries)
-            slots += ", 'coord', '__weakref__'"
-            arglist = '(self, %s, coord=None)' % args
-        else:
-            slots = "'coord', '__weakref__'"
-            arglist = '(self, coord=None)'
+        coords = ['coord'] + self.coords
+        slots = ', '.join(
+            ["'{0}'".format(e) for e in self.all_entries] +
+            ["'_{0}'".format(c) for c in coords])
+        arglist = ', '.join(
+            ['self'] + self.all_entries + ['%s=None' % c for c in coords])
 
         src += "    __slots__ = (%s)\n" % slots
-        src += "    def __init__%s:\n" % arglist
+        src += "    def __init__(%s):\n" % arglist
 
-        for name in self.all_entries + ['coord']:
+        for name in self.all_entries:
             src += "        self.%s = %s\n" % (name, name)
+        for coord in coords:
+            src += "        self._%s = %s\n" % (coord, coord)
 
         return src
 
+    def _gen_coords(self):
+        properties = []
+        for coord in self.coords:
+            properties.append((
+                '    @property\n'
+                '    def %(coord)s(self):\n'
+                '        return decode_coord(self._%(coord)s)\n\n'
+                '    @%(coord)s.setter\n'
+                '    def %(coord)s(self, %(coord)s):\n'
+                '        self._%(coord)s = %(coord)s\n') % dict(coord=coord))
+
+        return '\n'.join(properties)
+
     def _gen_children(self):
         src = '    def children(self):\n'
 
@@ -131,6 +152,27 @@ class NodeCfg(object):
 
         return src
 
+    def _gen_iter(self):
+        src = '    def __iter__(self):\n'
+
+        if self.child or self.seq_child:
+            for child in self.child:
+                src += (
+                    '        if self.%(child)s is not None:\n' +
+                    '            yield self.%(child)s\n') % (dict(child=child))
+
+            for seq_child in self.seq_child:
+                src += (
+                    '        for child in (self.%(child)s or []):\n'
+                    '            yield child\n') % (dict(child=seq_child))
+        else:
+            # A generator which yields nothing
+            src += (
+                '        return\n' +
+                '        yield\n')
+
+        return src
+
     def _gen_attr_names(self):
         src = "    attr_names = (" + ''.join("%r, " % nm for nm in self.attr) + ')'
         return src
@@ -158,17 +200,52 @@ r'''#-----------------------------------------------------------------
 
 _PROLOGUE_CODE = r'''
 import sys
+import types
+
+from .plyparser import decode_coord
 
 
 class Node(object):
     __slots__ = ()
     """ Abstract base class for AST nodes.
+
+        The coordinates of the nodes built by the parser are compact,
+        the Coord is created each time the coord attribute is read,
+        see plyparser.encode_coord.
     """
+    @property
+    def coord(self):
+        return decode_coord(self._coord)
+
+    @coord.setter
+    def coord(self, coord):
+        self._coord = coord
+
+    def __getstate__(self):
+        """ The compact coordinates are only valid in the process that
+            encoded them, so the state keeps their Coord objects.
+        """
+        state = {}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            state[slot] = decode_coord(value) if slot.startswith('_') else value
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     def children(self):
         """ A sequence of all children that are Nodes
         """
         pass
 
+    def __iter__(self):
+        """ Iterates over the children that are Nodes, without building
+            the (name, child) pairs of children()
+        """
+        return iter(())
+
     def show(self, buf=sys.stdout, offset=0, attrnames=False, nodenames=False, showcoord=False, _my_node_name=None):
         """ Pretty print the Node and all its attributes and
             children (recursively) to a buffer.
@@ -250,24 +327,62 @@ class NodeVisitor(object):
             generic_visit() on the node.
             You can use:
                 NodeVisitor.generic_visit(self, node)
+        *   The visit_XXX methods are looked up on the visitor class,
+            once per node class, and kept in a dispatch table. They
+            can be static or class methods, but a visit_XXX set on a
+            visitor instance is not used.
         *   Modeled after Python's own AST visiting facilities
             (the ast module of Python 3.0)
     """
     def visit(self, node):
         """ Visit a node.
         """
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        methods = _visit_methods.get(self.__class__)
+        if methods is None:
+            methods = _visit_methods.setdefault(self.__class__, {})
+
+        method = methods.get(node.__class__)
+        if method is None:
+            method = methods[node.__class__] = self._visit_method(node.__class__)
+
+        return method(self, node)
+
+    @classmethod
+    def _visit_method(cls, node_class):
+        """ Returns the function visiting the nodes of the given class,
+            it is called with the visitor and the node.
+        """
+        name = 'visit_' + node_class.__name__
+        if not hasattr(cls, name):
+            name = 'generic_visit'
+
+        # The class attribute itself, so static and class methods
+        # are bound to the visitor as an attribute access does.
+        method = next(
+            klass.__dict__[name] for klass in cls.__mro__ if name in klass.__dict__
+        )
+        if isinstance(method, types.FunctionType):
+            return method
+
+        if not hasattr(type(method), '__get__'):
+            return lambda visitor, node: method(node)
+
+        return lambda visitor, node: method.__get__(visitor, type(visitor))(node)
 
     def generic_visit(self, node):
         """ Called if no explicit visitor function exists for a
             node. Implements preorder visiting of the node.
         """
-        for c_name, c in node.children():
+        for c in node:
             self.visit(c)
 
 
+# The dispatch tables of the visitors, the visit_XXX function of each
+# node class by visitor class.
+#
+_visit_methods = {}
+
+
 '''
 
 
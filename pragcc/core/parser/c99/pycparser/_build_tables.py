@@ -3,31 +3,32 @@
 #
 # A dummy for generating the lexing/parsing tables and and
 # compiling them into .pyc for faster execution in optimized mode.
-# Also generates AST code from the configuration file.
-# Should be called from the pycparser directory.
+# Can be called from any directory, the tables are written inside
+# the vendored package, so they are importable as
+# pragcc.core.parser.c99.pycparser.lextab and yacctab.
 #
 # Eli Bendersky [http://eli.thegreenplace.net]
 # License: BSD
 #-----------------------------------------------------------------
+import os
+import sys
 
-# Generate c_ast.py
-from _ast_gen import ASTCodeGenerator
-ast_gen = ASTCodeGenerator('_c_ast.cfg')
-ast_gen.generate(open('c_ast.py', 'w'))
+PYCPARSER_DIR = os.path.dirname(os.path.realpath(__file__))
+PROJECT_DIR = os.path.realpath(os.path.join(PYCPARSER_DIR, *[os.pardir] * 5))
 
-import sys
-sys.path[0:0] = ['.', '..']
-from pycparser import c_parser
+sys.path[0:0] = [PROJECT_DIR]
 
-# Generates the tables
+# Generate c_ast.py
 #
-c_parser.CParser(
-    lex_optimize=True,
-    yacc_debug=False,
-    yacc_optimize=True)
+os.chdir(PYCPARSER_DIR)
+sys.path.insert(0, PYCPARSER_DIR)
+from _ast_gen import ASTCodeGenerator
+ast_gen = ASTCodeGenerator('_c_ast.cfg')
+with open('c_ast.py', 'w') as c_ast_file:
+    ast_gen.generate(c_ast_file)
 
-# Load to compile into .pyc
+# Generates the tables and load them to compile into .pyc
 #
-import lextab
-import yacctab
-import c_ast
+from pragcc.core.parser.c99 import pool
+for table_path in pool.build_tables():
+    print(table_path)
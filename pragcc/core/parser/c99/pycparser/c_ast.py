@@ -17,17 +17,52 @@
 
 
 import sys
+import types
+
+from .plyparser import decode_coord
 
 
 class Node(object):
     __slots__ = ()
     """ Abstract base class for AST nodes.
+
+        The coordinates of the nodes built by the parser are compact,
+        the Coord is created each time the coord attribute is read,
+        see plyparser.encode_coord.
     """
+    @property
+    def coord(self):
+        return decode_coord(self._coord)
+
+    @coord.setter
+    def coord(self, coord):
+        self._coord = coord
+
+    def __getstate__(self):
+        """ The compact coordinates are only valid in the process that
+            encoded them, so the state keeps their Coord objects.
+        """
+        state = {}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            state[slot] = decode_coord(value) if slot.startswith('_') else value
+        return state
+
+    def __setstate__(self, state):
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     def children(self):
         """ A sequence of all children that are Nodes
         """
         pass
 
+    def __iter__(self):
+        """ Iterates over the children that are Nodes, without building
+            the (name, child) pairs of children()
+        """
+        return iter(())
+
     def show(self, buf=sys.stdout, offset=0, attrnames=False, nodenames=False, showcoord=False, _my_node_name=None):
         """ Pretty print the Node and all its attributes and
             children (recursively) to a buffer.
@@ -109,31 +144,69 @@ class NodeVisitor(object):
             generic_visit() on the node.
             You can use:
                 NodeVisitor.generic_visit(self, node)
+        *   The visit_XXX methods are looked up on the visitor class,
+            once per node class, and kept in a dispatch table. They
+            can be static or class methods, but a visit_XXX set on a
+            visitor instance is not used.
         *   Modeled after Python's own AST visiting facilities
             (the ast module of Python 3.0)
     """
     def visit(self, node):
         """ Visit a node.
         """
-        method = 'visit_' + node.__class__.__name__
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node)
+        methods = _visit_methods.get(self.__class__)
+        if methods is None:
+            methods = _visit_methods.setdefault(self.__class__, {})
+
+        method = methods.get(node.__class__)
+        if method is None:
+            method = methods[node.__class__] = self._visit_method(node.__class__)
+
+        return method(self, node)
+
+    @classmethod
+    def _visit_method(cls, node_class):
+        """ Returns the function visiting the nodes of the given class,
+            it is called with the visitor and the node.
+        """
+        name = 'visit_' + node_class.__name__
+        if not hasattr(cls, name):
+            name = 'generic_visit'
+
+        # The class attribute itself, so static and class methods
+        # are bound to the visitor as an attribute access does.
+        method = next(
+            klass.__dict__[name] for klass in cls.__mro__ if name in klass.__dict__
+        )
+        if isinstance(method, types.FunctionType):
+            return method
+
+        if not hasattr(type(method), '__get__'):
+            return lambda visitor, node: method(node)
+
+        return lambda visitor, node: method.__get__(visitor, type(visitor))(node)
 
     def generic_visit(self, node):
         """ Called if no explicit visitor function exists for a
             node. Implements preorder visiting of the node.
         """
-        for c_name, c in node.children():
+        for c in node:
             self.visit(c)
 
 
+# The dispatch tables of the visitors, the visit_XXX function of each
+# node class by visitor class.
+#
+_visit_methods = {}
+
+
 class ArrayDecl(Node):
-    __slots__ = ('type', 'dim', 'dim_quals', 'coord', '__weakref__')
+    __slots__ = ('type', 'dim', 'dim_quals', '_coord')
     def __init__(self, type, dim, dim_quals, coord=None):
         self.type = type
         self.dim = dim
         self.dim_quals = dim_quals
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -141,14 +214,20 @@ class ArrayDecl(Node):
         if self.dim is not None: nodelist.append(("dim", self.dim))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+        if self.dim is not None:
+            yield self.dim
+
     attr_names = ('dim_quals', )
 
 class ArrayRef(Node):
-    __slots__ = ('name', 'subscript', 'coord', '__weakref__')
+    __slots__ = ('name', 'subscript', '_coord')
     def __init__(self, name, subscript, coord=None):
         self.name = name
         self.subscript = subscript
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -156,15 +235,21 @@ class ArrayRef(Node):
         if self.subscript is not None: nodelist.append(("subscript", self.subscript))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.name is not None:
+            yield self.name
+        if self.subscript is not None:
+            yield self.subscript
+
     attr_names = ()
 
 class Assignment(Node):
-    __slots__ = ('op', 'lvalue', 'rvalue', 'coord', '__weakref__')
+    __slots__ = ('op', 'lvalue', 'rvalue', '_coord')
     def __init__(self, op, lvalue, rvalue, coord=None):
         self.op = op
         self.lvalue = lvalue
         self.rvalue = rvalue
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -172,15 +257,21 @@ class Assignment(Node):
         if self.rvalue is not None: nodelist.append(("rvalue", self.rvalue))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.lvalue is not None:
+            yield self.lvalue
+        if self.rvalue is not None:
+            yield self.rvalue
+
     attr_names = ('op', )
 
 class BinaryOp(Node):
-    __slots__ = ('op', 'left', 'right', 'coord', '__weakref__')
+    __slots__ = ('op', 'left', 'right', '_coord')
     def __init__(self, op, left, right, coord=None):
         self.op = op
         self.left = left
         self.right = right
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -188,24 +279,34 @@ class BinaryOp(Node):
         if self.right is not None: nodelist.append(("right", self.right))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.left is not None:
+            yield self.left
+        if self.right is not None:
+            yield self.right
+
     attr_names = ('op', )
 
 class Break(Node):
-    __slots__ = ('coord', '__weakref__')
+    __slots__ = ('_coord')
     def __init__(self, coord=None):
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         return ()
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ()
 
 class Case(Node):
-    __slots__ = ('expr', 'stmts', 'coord', '__weakref__')
+    __slots__ = ('expr', 'stmts', '_coord')
     def __init__(self, expr, stmts, coord=None):
         self.expr = expr
         self.stmts = stmts
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -214,14 +315,20 @@ class Case(Node):
             nodelist.append(("stmts[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.expr is not None:
+            yield self.expr
+        for child in (self.stmts or []):
+            yield child
+
     attr_names = ()
 
 class Cast(Node):
-    __slots__ = ('to_type', 'expr', 'coord', '__weakref__')
+    __slots__ = ('to_type', 'expr', '_coord')
     def __init__(self, to_type, expr, coord=None):
         self.to_type = to_type
         self.expr = expr
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -229,14 +336,28 @@ class Cast(Node):
         if self.expr is not None: nodelist.append(("expr", self.expr))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.to_type is not None:
+            yield self.to_type
+        if self.expr is not None:
+            yield self.expr
+
     attr_names = ()
 
 class Compound(Node):
-    __slots__ = ('block_items', 'coord', 'end_coord','__weakref__')
+    __slots__ = ('block_items', '_coord', '_end_coord')
     def __init__(self, block_items, coord=None, end_coord=None):
         self.block_items = block_items
-        self.coord = coord
-        self.end_coord = end_coord
+        self._coord = coord
+        self._end_coord = end_coord
+
+    @property
+    def end_coord(self):
+        return decode_coord(self._end_coord)
+
+    @end_coord.setter
+    def end_coord(self, end_coord):
+        self._end_coord = end_coord
 
     def children(self):
         nodelist = []
@@ -244,14 +365,18 @@ class Compound(Node):
             nodelist.append(("block_items[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.block_items or []):
+            yield child
+
     attr_names = ()
 
 class CompoundLiteral(Node):
-    __slots__ = ('type', 'init', 'coord', '__weakref__')
+    __slots__ = ('type', 'init', '_coord')
     def __init__(self, type, init, coord=None):
         self.type = type
         self.init = init
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -259,33 +384,47 @@ class CompoundLiteral(Node):
         if self.init is not None: nodelist.append(("init", self.init))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+        if self.init is not None:
+            yield self.init
+
     attr_names = ()
 
 class Constant(Node):
-    __slots__ = ('type', 'value', 'coord', '__weakref__')
+    __slots__ = ('type', 'value', '_coord')
     def __init__(self, type, value, coord=None):
         self.type = type
         self.value = value
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         return tuple(nodelist)
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ('type', 'value', )
 
 class Continue(Node):
-    __slots__ = ('coord', '__weakref__')
+    __slots__ = ('_coord')
     def __init__(self, coord=None):
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         return ()
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ()
 
 class Decl(Node):
-    __slots__ = ('name', 'quals', 'storage', 'funcspec', 'type', 'init', 'bitsize', 'coord', '__weakref__')
+    __slots__ = ('name', 'quals', 'storage', 'funcspec', 'type', 'init', 'bitsize', '_coord')
     def __init__(self, name, quals, storage, funcspec, type, init, bitsize, coord=None):
         self.name = name
         self.quals = quals
@@ -294,7 +433,7 @@ class Decl(Node):
         self.type = type
         self.init = init
         self.bitsize = bitsize
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -303,13 +442,21 @@ class Decl(Node):
         if self.bitsize is not None: nodelist.append(("bitsize", self.bitsize))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+        if self.init is not None:
+            yield self.init
+        if self.bitsize is not None:
+            yield self.bitsize
+
     attr_names = ('name', 'quals', 'storage', 'funcspec', )
 
 class DeclList(Node):
-    __slots__ = ('decls', 'coord', '__weakref__')
+    __slots__ = ('decls', '_coord')
     def __init__(self, decls, coord=None):
         self.decls = decls
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -317,13 +464,17 @@ class DeclList(Node):
             nodelist.append(("decls[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.decls or []):
+            yield child
+
     attr_names = ()
 
 class Default(Node):
-    __slots__ = ('stmts', 'coord', '__weakref__')
+    __slots__ = ('stmts', '_coord')
     def __init__(self, stmts, coord=None):
         self.stmts = stmts
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -331,14 +482,18 @@ class Default(Node):
             nodelist.append(("stmts[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.stmts or []):
+            yield child
+
     attr_names = ()
 
 class DoWhile(Node):
-    __slots__ = ('cond', 'stmt', 'coord', '__weakref__')
+    __slots__ = ('cond', 'stmt', '_coord')
     def __init__(self, cond, stmt, coord=None):
         self.cond = cond
         self.stmt = stmt
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -346,61 +501,83 @@ class DoWhile(Node):
         if self.stmt is not None: nodelist.append(("stmt", self.stmt))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.cond is not None:
+            yield self.cond
+        if self.stmt is not None:
+            yield self.stmt
+
     attr_names = ()
 
 class EllipsisParam(Node):
-    __slots__ = ('coord', '__weakref__')
+    __slots__ = ('_coord')
     def __init__(self, coord=None):
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         return ()
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ()
 
 class EmptyStatement(Node):
-    __slots__ = ('coord', '__weakref__')
+    __slots__ = ('_coord')
     def __init__(self, coord=None):
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         return ()
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ()
 
 class Enum(Node):
-    __slots__ = ('name', 'values', 'coord', '__weakref__')
+    __slots__ = ('name', 'values', '_coord')
     def __init__(self, name, values, coord=None):
         self.name = name
         self.values = values
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.values is not None: nodelist.append(("values", self.values))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.values is not None:
+            yield self.values
+
     attr_names = ('name', )
 
 class Enumerator(Node):
-    __slots__ = ('name', 'value', 'coord', '__weakref__')
+    __slots__ = ('name', 'value', '_coord')
     def __init__(self, name, value, coord=None):
         self.name = name
         self.value = value
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.value is not None: nodelist.append(("value", self.value))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.value is not None:
+            yield self.value
+
     attr_names = ('name', )
 
 class EnumeratorList(Node):
-    __slots__ = ('enumerators', 'coord', '__weakref__')
+    __slots__ = ('enumerators', '_coord')
     def __init__(self, enumerators, coord=None):
         self.enumerators = enumerators
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -408,13 +585,17 @@ class EnumeratorList(Node):
             nodelist.append(("enumerators[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.enumerators or []):
+            yield child
+
     attr_names = ()
 
 class ExprList(Node):
-    __slots__ = ('exprs', 'coord', '__weakref__')
+    __slots__ = ('exprs', '_coord')
     def __init__(self, exprs, coord=None):
         self.exprs = exprs
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -422,13 +603,17 @@ class ExprList(Node):
             nodelist.append(("exprs[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.exprs or []):
+            yield child
+
     attr_names = ()
 
 class FileAST(Node):
-    __slots__ = ('ext', 'coord', '__weakref__')
+    __slots__ = ('ext', '_coord')
     def __init__(self, ext, coord=None):
         self.ext = ext
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -436,16 +621,20 @@ class FileAST(Node):
             nodelist.append(("ext[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.ext or []):
+            yield child
+
     attr_names = ()
 
 class For(Node):
-    __slots__ = ('init', 'cond', 'next', 'stmt', 'coord', '__weakref__')
+    __slots__ = ('init', 'cond', 'next', 'stmt', '_coord')
     def __init__(self, init, cond, next, stmt, coord=None):
         self.init = init
         self.cond = cond
         self.next = next
         self.stmt = stmt
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -455,14 +644,24 @@ class For(Node):
         if self.stmt is not None: nodelist.append(("stmt", self.stmt))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.init is not None:
+            yield self.init
+        if self.cond is not None:
+            yield self.cond
+        if self.next is not None:
+            yield self.next
+        if self.stmt is not None:
+            yield self.stmt
+
     attr_names = ()
 
 class FuncCall(Node):
-    __slots__ = ('name', 'args', 'coord', '__weakref__')
+    __slots__ = ('name', 'args', '_coord')
     def __init__(self, name, args, coord=None):
         self.name = name
         self.args = args
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -470,14 +669,20 @@ class FuncCall(Node):
         if self.args is not None: nodelist.append(("args", self.args))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.name is not None:
+            yield self.name
+        if self.args is not None:
+            yield self.args
+
     attr_names = ()
 
 class FuncDecl(Node):
-    __slots__ = ('args', 'type', 'coord', '__weakref__')
+    __slots__ = ('args', 'type', '_coord')
     def __init__(self, args, type, coord=None):
         self.args = args
         self.type = type
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -485,15 +690,21 @@ class FuncDecl(Node):
         if self.type is not None: nodelist.append(("type", self.type))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.args is not None:
+            yield self.args
+        if self.type is not None:
+            yield self.type
+
     attr_names = ()
 
 class FuncDef(Node):
-    __slots__ = ('decl', 'param_decls', 'body', 'coord', '__weakref__')
+    __slots__ = ('decl', 'param_decls', 'body', '_coord')
     def __init__(self, decl, param_decls, body, coord=None):
         self.decl = decl
         self.param_decls = param_decls
         self.body = body
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -503,51 +714,71 @@ class FuncDef(Node):
             nodelist.append(("param_decls[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.decl is not None:
+            yield self.decl
+        if self.body is not None:
+            yield self.body
+        for child in (self.param_decls or []):
+            yield child
+
     attr_names = ()
 
 class Goto(Node):
-    __slots__ = ('name', 'coord', '__weakref__')
+    __slots__ = ('name', '_coord')
     def __init__(self, name, coord=None):
         self.name = name
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         return tuple(nodelist)
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ('name', )
 
 class ID(Node):
-    __slots__ = ('name', 'coord', '__weakref__')
+    __slots__ = ('name', '_coord')
     def __init__(self, name, coord=None):
         self.name = name
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         return tuple(nodelist)
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ('name', )
 
 class IdentifierType(Node):
-    __slots__ = ('names', 'coord', '__weakref__')
+    __slots__ = ('names', '_coord')
     def __init__(self, names, coord=None):
         self.names = names
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         return tuple(nodelist)
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ('names', )
 
 class If(Node):
-    __slots__ = ('cond', 'iftrue', 'iffalse', 'coord', '__weakref__')
+    __slots__ = ('cond', 'iftrue', 'iffalse', '_coord')
     def __init__(self, cond, iftrue, iffalse, coord=None):
         self.cond = cond
         self.iftrue = iftrue
         self.iffalse = iffalse
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -556,13 +787,21 @@ class If(Node):
         if self.iffalse is not None: nodelist.append(("iffalse", self.iffalse))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.cond is not None:
+            yield self.cond
+        if self.iftrue is not None:
+            yield self.iftrue
+        if self.iffalse is not None:
+            yield self.iffalse
+
     attr_names = ()
 
 class InitList(Node):
-    __slots__ = ('exprs', 'coord', '__weakref__')
+    __slots__ = ('exprs', '_coord')
     def __init__(self, exprs, coord=None):
         self.exprs = exprs
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -570,28 +809,36 @@ class InitList(Node):
             nodelist.append(("exprs[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.exprs or []):
+            yield child
+
     attr_names = ()
 
 class Label(Node):
-    __slots__ = ('name', 'stmt', 'coord', '__weakref__')
+    __slots__ = ('name', 'stmt', '_coord')
     def __init__(self, name, stmt, coord=None):
         self.name = name
         self.stmt = stmt
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.stmt is not None: nodelist.append(("stmt", self.stmt))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.stmt is not None:
+            yield self.stmt
+
     attr_names = ('name', )
 
 class NamedInitializer(Node):
-    __slots__ = ('name', 'expr', 'coord', '__weakref__')
+    __slots__ = ('name', 'expr', '_coord')
     def __init__(self, name, expr, coord=None):
         self.name = name
         self.expr = expr
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -600,13 +847,19 @@ class NamedInitializer(Node):
             nodelist.append(("name[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.expr is not None:
+            yield self.expr
+        for child in (self.name or []):
+            yield child
+
     attr_names = ()
 
 class ParamList(Node):
-    __slots__ = ('params', 'coord', '__weakref__')
+    __slots__ = ('params', '_coord')
     def __init__(self, params, coord=None):
         self.params = params
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -614,41 +867,53 @@ class ParamList(Node):
             nodelist.append(("params[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.params or []):
+            yield child
+
     attr_names = ()
 
 class PtrDecl(Node):
-    __slots__ = ('quals', 'type', 'coord', '__weakref__')
+    __slots__ = ('quals', 'type', '_coord')
     def __init__(self, quals, type, coord=None):
         self.quals = quals
         self.type = type
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.type is not None: nodelist.append(("type", self.type))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+
     attr_names = ('quals', )
 
 class Return(Node):
-    __slots__ = ('expr', 'coord', '__weakref__')
+    __slots__ = ('expr', '_coord')
     def __init__(self, expr, coord=None):
         self.expr = expr
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.expr is not None: nodelist.append(("expr", self.expr))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.expr is not None:
+            yield self.expr
+
     attr_names = ()
 
 class Struct(Node):
-    __slots__ = ('name', 'decls', 'coord', '__weakref__')
+    __slots__ = ('name', 'decls', '_coord')
     def __init__(self, name, decls, coord=None):
         self.name = name
         self.decls = decls
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -656,15 +921,19 @@ class Struct(Node):
             nodelist.append(("decls[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.decls or []):
+            yield child
+
     attr_names = ('name', )
 
 class StructRef(Node):
-    __slots__ = ('name', 'type', 'field', 'coord', '__weakref__')
+    __slots__ = ('name', 'type', 'field', '_coord')
     def __init__(self, name, type, field, coord=None):
         self.name = name
         self.type = type
         self.field = field
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -672,14 +941,20 @@ class StructRef(Node):
         if self.field is not None: nodelist.append(("field", self.field))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.name is not None:
+            yield self.name
+        if self.field is not None:
+            yield self.field
+
     attr_names = ('type', )
 
 class Switch(Node):
-    __slots__ = ('cond', 'stmt', 'coord', '__weakref__')
+    __slots__ = ('cond', 'stmt', '_coord')
     def __init__(self, cond, stmt, coord=None):
         self.cond = cond
         self.stmt = stmt
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -687,15 +962,21 @@ class Switch(Node):
         if self.stmt is not None: nodelist.append(("stmt", self.stmt))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.cond is not None:
+            yield self.cond
+        if self.stmt is not None:
+            yield self.stmt
+
     attr_names = ()
 
 class TernaryOp(Node):
-    __slots__ = ('cond', 'iftrue', 'iffalse', 'coord', '__weakref__')
+    __slots__ = ('cond', 'iftrue', 'iffalse', '_coord')
     def __init__(self, cond, iftrue, iffalse, coord=None):
         self.cond = cond
         self.iftrue = iftrue
         self.iffalse = iffalse
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -704,74 +985,98 @@ class TernaryOp(Node):
         if self.iffalse is not None: nodelist.append(("iffalse", self.iffalse))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.cond is not None:
+            yield self.cond
+        if self.iftrue is not None:
+            yield self.iftrue
+        if self.iffalse is not None:
+            yield self.iffalse
+
     attr_names = ()
 
 class TypeDecl(Node):
-    __slots__ = ('declname', 'quals', 'type', 'coord', '__weakref__')
+    __slots__ = ('declname', 'quals', 'type', '_coord')
     def __init__(self, declname, quals, type, coord=None):
         self.declname = declname
         self.quals = quals
         self.type = type
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.type is not None: nodelist.append(("type", self.type))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+
     attr_names = ('declname', 'quals', )
 
 class Typedef(Node):
-    __slots__ = ('name', 'quals', 'storage', 'type', 'coord', '__weakref__')
+    __slots__ = ('name', 'quals', 'storage', 'type', '_coord')
     def __init__(self, name, quals, storage, type, coord=None):
         self.name = name
         self.quals = quals
         self.storage = storage
         self.type = type
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.type is not None: nodelist.append(("type", self.type))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+
     attr_names = ('name', 'quals', 'storage', )
 
 class Typename(Node):
-    __slots__ = ('name', 'quals', 'type', 'coord', '__weakref__')
+    __slots__ = ('name', 'quals', 'type', '_coord')
     def __init__(self, name, quals, type, coord=None):
         self.name = name
         self.quals = quals
         self.type = type
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.type is not None: nodelist.append(("type", self.type))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.type is not None:
+            yield self.type
+
     attr_names = ('name', 'quals', )
 
 class UnaryOp(Node):
-    __slots__ = ('op', 'expr', 'coord', '__weakref__')
+    __slots__ = ('op', 'expr', '_coord')
     def __init__(self, op, expr, coord=None):
         self.op = op
         self.expr = expr
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         if self.expr is not None: nodelist.append(("expr", self.expr))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.expr is not None:
+            yield self.expr
+
     attr_names = ('op', )
 
 class Union(Node):
-    __slots__ = ('name', 'decls', 'coord', '__weakref__')
+    __slots__ = ('name', 'decls', '_coord')
     def __init__(self, name, decls, coord=None):
         self.name = name
         self.decls = decls
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -779,14 +1084,18 @@ class Union(Node):
             nodelist.append(("decls[%d]" % i, child))
         return tuple(nodelist)
 
+    def __iter__(self):
+        for child in (self.decls or []):
+            yield child
+
     attr_names = ('name', )
 
 class While(Node):
-    __slots__ = ('cond', 'stmt', 'coord', '__weakref__')
+    __slots__ = ('cond', 'stmt', '_coord')
     def __init__(self, cond, stmt, coord=None):
         self.cond = cond
         self.stmt = stmt
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
@@ -794,17 +1103,27 @@ class While(Node):
         if self.stmt is not None: nodelist.append(("stmt", self.stmt))
         return tuple(nodelist)
 
+    def __iter__(self):
+        if self.cond is not None:
+            yield self.cond
+        if self.stmt is not None:
+            yield self.stmt
+
     attr_names = ()
 
 class Pragma(Node):
-    __slots__ = ('string', 'coord', '__weakref__')
+    __slots__ = ('string', '_coord')
     def __init__(self, string, coord=None):
         self.string = string
-        self.coord = coord
+        self._coord = coord
 
     def children(self):
         nodelist = []
         return tuple(nodelist)
 
+    def __iter__(self):
+        return
+        yield
+
     attr_names = ('string', )
 
@@ -9,8 +9,8 @@
 from . import c_ast
 
 
-class CGenerator(object):
-    """ Uses the same visitor pattern as c_ast.NodeVisitor, but modified to
+class CGenerator(c_ast.NodeVisitor):
+    """ Uses the visitor pattern of c_ast.NodeVisitor, but modified to
         return a value from each visit method, using string accumulation in
         generic_visit.
     """
@@ -23,16 +23,12 @@ class CGenerator(object):
     def _make_indent(self):
         return ' ' * self.indent_level
 
-    def visit(self, node):
-        method = 'visit_' + node.__class__.__name__
-        return getattr(self, method, self.generic_visit)(node)
-
     def generic_visit(self, node):
         #~ print('generic:', type(node))
         if node is None:
             return ''
         else:
-            return ''.join(self.visit(c) for c_name, c in node.children())
+            return ''.join(self.visit(c) for c in node)
 
     def visit_Constant(self, n):
         return n.value
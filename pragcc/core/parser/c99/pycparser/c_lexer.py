@@ -474,6 +474,9 @@ class CLexer(object):
 
     @TOKEN(identifier)
     def t_ID(self, t):
+        # The identifiers and type names repeat all over the code, they
+        # are interned so the AST nodes share a single string for each.
+        t.value = sys.intern(t.value)
         t.type = self.keyword_map.get(t.value, "ID")
         if t.type == 'ID' and self.type_lookup_func(t.value):
             t.type = "TYPEID"
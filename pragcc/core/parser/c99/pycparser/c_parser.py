@@ -129,7 +129,7 @@ class CParser(PLYParser):
         # Keeps track of the last token given to yacc (the lookahead token)
         self._last_yielded_token = None
 
-    def parse(self, text, filename='', debuglevel=0):
+    def parse(self, text, filename='', debuglevel=0, scope=None):
         """ Parses C code and returns an AST.
 
             text:
@@ -141,16 +141,42 @@ class CParser(PLYParser):
 
             debuglevel:
                 Debug level to yacc
+
+            scope:
+                Names already declared at file scope, as returned
+                by snapshot_scope after parsing some headers. The
+                text is parsed as if it followed those headers.
         """
-        self.clex.filename = filename
-        self.clex.reset_lineno()
-        self._scope_stack = [dict()]
-        self._last_yielded_token = None
+        self.reset(filename)
+        if scope:
+            self._scope_stack[0].update(scope)
         return self.cparser.parse(
                 input=text,
                 lexer=self.clex,
                 debug=debuglevel)
 
+    def reset(self, filename=''):
+        """ Brings the parser back to a clean state, so the same
+            CParser object can be reused to parse another text
+            without rebuilding the lexer and the LALR tables.
+
+            filename:
+                Name of the file that will be parsed next
+        """
+        self.clex.filename = filename
+        self.clex.reset_lineno()
+        self.clex.last_token = None
+        self.clex.lexer.begin('INITIAL')
+        self._scope_stack = [dict()]
+        self._last_yielded_token = None
+
+    def snapshot_scope(self):
+        """ Returns a copy of the file scope of the last parse, the
+            typedef names and the identifiers declared at file
+            scope, to be given to a later parse.
+        """
+        return dict(self._scope_stack[0])
+
     ######################--   PRIVATE   --######################
 
     def _push_scope(self):
@@ -338,14 +364,14 @@ class CParser(PLYParser):
                         "Missing type in declaration", decl.coord)
             type.type = c_ast.IdentifierType(
                     ['int'],
-                    coord=decl.coord)
+                    coord=decl._coord)
         else:
             # At this point, we know that typename is a list of IdentifierType
             # nodes. Concatenate all the names into a single list.
             #
             type.type = c_ast.IdentifierType(
                 [name for id in typename for name in id.names],
-                coord=typename[0].coord)
+                coord=typename[0]._coord)
         return decl
 
     def _add_declaration_specifier(self, declspec, newspec, kind, append=False):
@@ -406,7 +432,7 @@ class CParser(PLYParser):
                 declname=spec['type'][-1].names[0],
                 type=None,
                 quals=None,
-                coord=spec['type'][-1].coord)
+                coord=spec['type'][-1]._coord)
             # Remove the "new" type's name from the end of spec['type']
             del spec['type'][-1]
 
@@ -430,7 +456,7 @@ class CParser(PLYParser):
                     quals=spec['qual'],
                     storage=spec['storage'],
                     type=decl['decl'],
-                    coord=decl['decl'].coord)
+                    coord=decl['decl']._coord)
             else:
                 declaration = c_ast.Decl(
                     name=None,
@@ -440,7 +466,7 @@ class CParser(PLYParser):
                     type=decl['decl'],
                     init=decl.get('init'),
                     bitsize=decl.get('bitsize'),
-                    coord=decl['decl'].coord)
+                    coord=decl['decl']._coord)
 
             if isinstance(declaration.type,
                     (c_ast.Struct, c_ast.Union, c_ast.IdentifierType)):
@@ -453,9 +479,9 @@ class CParser(PLYParser):
             #
             if typedef_namespace:
                 if is_typedef:
-                    self._add_typedef_name(fixed_decl.name, fixed_decl.coord)
+                    self._add_typedef_name(fixed_decl.name, fixed_decl._coord)
                 else:
-                    self._add_identifier(fixed_decl.name, fixed_decl.coord)
+                    self._add_identifier(fixed_decl.name, fixed_decl._coord)
 
             declarations.append(fixed_decl)
 
@@ -475,7 +501,7 @@ class CParser(PLYParser):
             decl=declaration,
             param_decls=param_decls,
             body=body,
-            coord=decl.coord)
+            coord=decl._coord)
 
     def _select_struct_union_class(self, token):
         """ Given a token (either STRUCT or UNION), selects the
@@ -649,7 +675,7 @@ class CParser(PLYParser):
                     type=ty[0],
                     init=None,
                     bitsize=None,
-                    coord=ty[0].coord)]
+                    coord=ty[0]._coord)]
 
             # However, this case can also occur on redeclared identifiers in
             # an inner scope.  The trouble is that the redeclared type's name
@@ -985,7 +1011,7 @@ class CParser(PLYParser):
                             | enumerator_list COMMA enumerator
         """
         if len(p) == 2:
-            p[0] = c_ast.EnumeratorList([p[1]], p[1].coord)
+            p[0] = c_ast.EnumeratorList([p[1]], p[1]._coord)
         elif len(p) == 3:
             p[0] = p[1]
         else:
@@ -1004,7 +1030,7 @@ class CParser(PLYParser):
             enumerator = c_ast.Enumerator(
                         p[1], p[3],
                         self._token_coord(p, 1))
-        self._add_identifier(enumerator.name, enumerator.coord)
+        self._add_identifier(enumerator.name, enumerator._coord)
 
         p[0] = enumerator
 
@@ -1053,7 +1079,7 @@ class CParser(PLYParser):
             type=None,
             dim=p[4] if len(p) > 5 else p[3],
             dim_quals=quals,
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
@@ -1073,7 +1099,7 @@ class CParser(PLYParser):
             type=None,
             dim=p[5],
             dim_quals=dim_quals,
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
@@ -1087,7 +1113,7 @@ class CParser(PLYParser):
             type=None,
             dim=c_ast.ID(p[4], self._token_coord(p, 4)),
             dim_quals=p[3] if p[3] != None else [],
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
@@ -1099,7 +1125,7 @@ class CParser(PLYParser):
         func = c_ast.FuncDecl(
             args=p[3],
             type=None,
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         # To see why _get_yacc_lookahead_token is needed, consider:
         #   typedef char TT;
@@ -1116,7 +1142,7 @@ class CParser(PLYParser):
             if func.args is not None:
                 for param in func.args.params:
                     if isinstance(param, c_ast.EllipsisParam): break
-                    self._add_identifier(param.name, param.coord)
+                    self._add_identifier(param.name, param._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=func)
 
@@ -1170,7 +1196,7 @@ class CParser(PLYParser):
                             | parameter_list COMMA parameter_declaration
         """
         if len(p) == 2: # single parameter
-            p[0] = c_ast.ParamList([p[1]], p[1].coord)
+            p[0] = c_ast.ParamList([p[1]], p[1]._coord)
         else:
             p[1].params.append(p[3])
             p[0] = p[1]
@@ -1233,7 +1259,7 @@ class CParser(PLYParser):
                             | identifier_list COMMA identifier
         """
         if len(p) == 2: # single parameter
-            p[0] = c_ast.ParamList([p[1]], p[1].coord)
+            p[0] = c_ast.ParamList([p[1]], p[1]._coord)
         else:
             p[1].params.append(p[3])
             p[0] = p[1]
@@ -1258,7 +1284,7 @@ class CParser(PLYParser):
         """
         if len(p) == 3: # single initializer
             init = p[2] if p[1] is None else c_ast.NamedInitializer(p[1], p[2])
-            p[0] = c_ast.InitList([init], p[2].coord)
+            p[0] = c_ast.InitList([init], p[2]._coord)
         else:
             init = p[4] if p[3] is None else c_ast.NamedInitializer(p[3], p[4])
             p[1].exprs.append(init)
@@ -1329,7 +1355,7 @@ class CParser(PLYParser):
             type=None,
             dim=p[3],
             dim_quals=[],
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
@@ -1349,7 +1375,7 @@ class CParser(PLYParser):
             type=None,
             dim=c_ast.ID(p[3], self._token_coord(p, 3)),
             dim_quals=[],
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=arr)
 
@@ -1368,7 +1394,7 @@ class CParser(PLYParser):
         func = c_ast.FuncDecl(
             args=p[3],
             type=None,
-            coord=p[1].coord)
+            coord=p[1]._coord)
 
         p[0] = self._type_modify_decl(decl=p[1], modifier=func)
 
@@ -1480,7 +1506,7 @@ class CParser(PLYParser):
             p[0] = p[1]
         else:
             if not isinstance(p[1], c_ast.ExprList):
-                p[1] = c_ast.ExprList([p[1]], p[1].coord)
+                p[1] = c_ast.ExprList([p[1]], p[1]._coord)
 
             p[1].exprs.append(p[3])
             p[0] = p[1]
@@ -1496,7 +1522,7 @@ class CParser(PLYParser):
         if len(p) == 2:
             p[0] = p[1]
         else:
-            p[0] = c_ast.Assignment(p[2], p[1], p[3], p[1].coord)
+            p[0] = c_ast.Assignment(p[2], p[1], p[3], p[1]._coord)
 
     # K&R2 defines these as many separate rules, to encode
     # precedence and associativity. Why work hard ? I'll just use
@@ -1529,7 +1555,7 @@ class CParser(PLYParser):
         if len(p) == 2:
             p[0] = p[1]
         else:
-            p[0] = c_ast.TernaryOp(p[1], p[3], p[5], p[1].coord)
+            p[0] = c_ast.TernaryOp(p[1], p[3], p[5], p[1]._coord)
 
     def p_binary_expression(self, p):
         """ binary_expression   : cast_expression
@@ -1555,7 +1581,7 @@ class CParser(PLYParser):
         if len(p) == 2:
             p[0] = p[1]
         else:
-            p[0] = c_ast.BinaryOp(p[2], p[1], p[3], p[1].coord)
+            p[0] = c_ast.BinaryOp(p[2], p[1], p[3], p[1]._coord)
 
     def p_cast_expression_1(self, p):
         """ cast_expression : unary_expression """
@@ -1574,7 +1600,7 @@ class CParser(PLYParser):
                                 | MINUSMINUS unary_expression
                                 | unary_operator cast_expression
         """
-        p[0] = c_ast.UnaryOp(p[1], p[2], p[2].coord)
+        p[0] = c_ast.UnaryOp(p[1], p[2], p[2]._coord)
 
     def p_unary_expression_3(self, p):
         """ unary_expression    : SIZEOF unary_expression
@@ -1601,13 +1627,13 @@ class CParser(PLYParser):
 
     def p_postfix_expression_2(self, p):
         """ postfix_expression  : postfix_expression LBRACKET expression RBRACKET """
-        p[0] = c_ast.ArrayRef(p[1], p[3], p[1].coord)
+        p[0] = c_ast.ArrayRef(p[1], p[3], p[1]._coord)
 
     def p_postfix_expression_3(self, p):
         """ postfix_expression  : postfix_expression LPAREN argument_expression_list RPAREN
                                 | postfix_expression LPAREN RPAREN
         """
-        p[0] = c_ast.FuncCall(p[1], p[3] if len(p) == 5 else None, p[1].coord)
+        p[0] = c_ast.FuncCall(p[1], p[3] if len(p) == 5 else None, p[1]._coord)
 
     def p_postfix_expression_4(self, p):
         """ postfix_expression  : postfix_expression PERIOD ID
@@ -1616,13 +1642,13 @@ class CParser(PLYParser):
                                 | postfix_expression ARROW TYPEID
         """
         field = c_ast.ID(p[3], self._token_coord(p, 3))
-        p[0] = c_ast.StructRef(p[1], p[2], field, p[1].coord)
+        p[0] = c_ast.StructRef(p[1], p[2], field, p[1]._coord)
 
     def p_postfix_expression_5(self, p):
         """ postfix_expression  : postfix_expression PLUSPLUS
                                 | postfix_expression MINUSMINUS
         """
-        p[0] = c_ast.UnaryOp('p' + p[2], p[1], p[1].coord)
+        p[0] = c_ast.UnaryOp('p' + p[2], p[1], p[1]._coord)
 
     def p_postfix_expression_6(self, p):
         """ postfix_expression  : LPAREN type_name RPAREN brace_open initializer_list brace_close
@@ -1665,9 +1691,9 @@ class CParser(PLYParser):
             p[0] = p[1]
         elif len(p) == 4:
             field = c_ast.ID(p[3], self._token_coord(p, 3))
-            p[0] = c_ast.StructRef(p[1], p[2], field, p[1].coord)
+            p[0] = c_ast.StructRef(p[1], p[2], field, p[1]._coord)
         elif len(p) == 5:
-            p[0] = c_ast.ArrayRef(p[1], p[3], p[1].coord)
+            p[0] = c_ast.ArrayRef(p[1], p[3], p[1]._coord)
         else:
             raise NotImplementedError("Unexpected parsing state. len(p): %u" % len(p))
 
@@ -1676,7 +1702,7 @@ class CParser(PLYParser):
                                         | argument_expression_list COMMA assignment_expression
         """
         if len(p) == 2: # single expr
-            p[0] = c_ast.ExprList([p[1]], p[1].coord)
+            p[0] = c_ast.ExprList([p[1]], p[1]._coord)
         else:
             p[1].exprs.append(p[3])
             p[0] = p[1]
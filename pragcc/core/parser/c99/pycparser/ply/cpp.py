@@ -795,6 +795,7 @@ class Preprocessor(object):
             tokens = self.tokenize(tokens)
 
         linetok = tokens
+        line = linetok[0].lineno if linetok else 0
         try:
             name = linetok[0]
             if len(linetok) > 1:
@@ -814,7 +815,7 @@ class Preprocessor(object):
                 variadic = False
                 for a in args:
                     if variadic:
-                        print("No more arguments may follow a variadic argument")
+                        self.error(self.source,line,"No more arguments may follow a variadic argument")
                         break
                     astr = "".join([str(_i.value) for _i in a])
                     if astr == "...":
@@ -833,7 +834,7 @@ class Preprocessor(object):
                             a[0].value = a[0].value[:-3]
                         continue
                     if len(a) > 1 or a[0].type != self.t_ID:
-                        print("Invalid macro argument")
+                        self.error(self.source,line,"Invalid macro argument")
                         break
                 else:
                     mvalue = self.tokenstrip(linetok[1+tokcount:])
@@ -850,9 +851,9 @@ class Preprocessor(object):
                     self.macro_prescan(m)
                     self.macros[name.value] = m
             else:
-                print("Bad macro definition")
+                self.error(self.source,line,"Bad macro definition")
         except LookupError:
-            print("Bad macro definition")
+            self.error(self.source,line,"Bad macro definition")
 
     # ----------------------------------------------------------------------
     # undef()
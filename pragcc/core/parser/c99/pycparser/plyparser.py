@@ -9,6 +9,7 @@
 #-----------------------------------------------------------------
 
 import warnings
+import threading
 
 class Coord(object):
     """ Coordinates of a syntactic element. Consists of:
@@ -28,6 +29,70 @@ class Coord(object):
         return str
 
 
+#
+# Compact coordinates
+#
+# The nodes keep their coordinates as a single int, the index of the
+# file name in a process-wide table, the line and the column packed
+# together. The Coord objects are only created when they are read,
+# see encode_coord and decode_coord.
+#
+# The table is process-wide on purpose, not kept by each parse: the
+# nodes outlive their parser and their FileAST, e.g. the lazy loaders
+# of the functions keep their FuncDef nodes, so a node could not reach
+# a per-parse table, and resetting a shared one would give the live
+# nodes wrong file names. The table only grows with the distinct file
+# names, the source paths and the headers named in the line markers;
+# the codes given as text are all parsed with the same name. The
+# pickled nodes carry their decoded coordinates, see c_ast.Node.
+#
+COLUMN_BITS = 16
+LINE_BITS = 32
+
+_COLUMN_MASK = (1 << COLUMN_BITS) - 1
+_LINE_MASK = (1 << LINE_BITS) - 1
+_FILE_SHIFT = COLUMN_BITS + LINE_BITS
+
+_file_indexes = {}
+_file_names = []
+_file_lock = threading.Lock()
+
+def _file_index(file):
+    """ Returns the index of the file name in the file table, the name
+        is added to the table the first time it is seen and it is kept
+        for the life of the process.
+    """
+    index = _file_indexes.get(file)
+    if index is None:
+        with _file_lock:
+            index = _file_indexes.get(file)
+            if index is None:
+                index = len(_file_names)
+                _file_names.append(file)
+                _file_indexes[file] = index
+    return index
+
+def encode_coord(file, line, column=None):
+    """ Returns the compact coordinate of a position, a Coord if the
+        line or the column do not fit in their bits.
+    """
+    column = column or 0
+    if line > _LINE_MASK or column > _COLUMN_MASK:
+        return Coord(file, line, column)
+    return (_file_index(file) << _FILE_SHIFT) | (line << COLUMN_BITS) | column
+
+def decode_coord(coord):
+    """ Returns the Coord of a compact coordinate. Coord objects and
+        None are returned as they are.
+    """
+    if coord.__class__ is not int:
+        return coord
+    return Coord(
+            file=_file_names[coord >> _FILE_SHIFT],
+            line=(coord >> COLUMN_BITS) & _LINE_MASK,
+            column=(coord & _COLUMN_MASK) or None)
+
+
 class ParseError(Exception): pass
 
 
@@ -53,18 +118,19 @@ class PLYParser(object):
                 column=column)
 
     def _token_coord(self, p, token_idx):
-        """ Returns the coordinates for the YaccProduction objet 'p' indexed
-            with 'token_idx'. The coordinate includes the 'lineno' and
-            'column'. Both follow the lex semantic, starting from 1.
+        """ Returns the compact coordinates for the YaccProduction objet 'p'
+            indexed with 'token_idx', see encode_coord. The coordinate
+            includes the 'lineno' and 'column'. Both follow the lex
+            semantic, starting from 1.
         """
         last_cr = p.lexer.lexer.lexdata.rfind('\n', 0, p.lexpos(token_idx))
         if last_cr < 0:
             last_cr = -1
         column = (p.lexpos(token_idx) - (last_cr))
-        return self._coord(p.lineno(token_idx), column)
+        return encode_coord(self.clex.filename, p.lineno(token_idx), column)
 
     def _parse_error(self, msg, coord):
-        raise ParseError("%s: %s" % (coord, msg))
+        raise ParseError("%s: %s" % (decode_coord(coord), msg))
 
 
 def parameterized(*params):
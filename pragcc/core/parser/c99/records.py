@@ -0,0 +1,188 @@
+# -*- encoding: utf-8 -*-
+"""Records of the functions and loops found in a C99 source code.
+
+The records use *__slots__*, so they are much smaller than the dicts
+they replace when thousands of parse results are kept in memory. They
+also support the dict access of the former data, so the existing
+callers keep working:
+
+    loop.begin                  # absolute line where the loop begins
+    loop['begin']['relative']   # line relative to the function begin
+"""
+
+
+class Record(object):
+    """Base class of the slot based records with a dict compatible view."""
+
+    __slots__ = ()
+
+    #: Tuple[str]: The record fields, in the order of the constructor arguments.
+    _fields = ()
+
+    def __init__(self,*args,**kwargs):
+        for field, value in zip(self._fields,args):
+            setattr(self,field,value)
+        for field, value in kwargs.items():
+            setattr(self,field,value)
+
+    def keys(self):
+        """Return the keys of the dict view."""
+        return list(self._fields)
+
+    def __getitem__(self,key):
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self,key)
+
+    def __setitem__(self,key,value):
+        if key not in self._fields:
+            raise KeyError(key)
+        setattr(self,key,value)
+
+    def __contains__(self,key):
+        return key in self.keys()
+
+    def get(self,key,default=None):
+        return self[key] if key in self else default
+
+    def to_dict(self):
+        """Return the record as the dict used before the records."""
+        return {key: self[key] for key in self.keys()}
+
+    def __reduce__(self):
+        # Pickled as the constructor arguments, without the field names
+        return (type(self),tuple(getattr(self,field) for field in self._fields))
+
+    def __eq__(self,other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(
+            getattr(self,field) == getattr(other,field)
+            for field in self._fields
+        )
+
+    def __ne__(self,other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        fields = ', '.join(
+            '%s=%r' % (field,getattr(self,field))
+            for field in self._fields
+        )
+        return '%s(%s)' % (type(self).__name__,fields)
+
+
+class LoopInfo(Record):
+    """A for loop inside a function.
+
+    Attributes:
+        nro (int): Position of the loop inside its function, from 0.
+        depth (int): Number of loops the loop is nested in.
+        begin (int): Line where the loop begins.
+        end (int): Line where the loop ends.
+        function_begin (int): Line where the function of the loop begins.
+    """
+
+    __slots__ = ('nro','depth','begin','end','function_begin')
+
+    _fields = __slots__
+
+    def keys(self):
+        return ['nro','depth','begin','end']
+
+    def __getitem__(self,key):
+        if key in ('begin','end'):
+            line = getattr(self,key)
+            return {
+                'relative': line - self.function_begin,
+                'absolute': line
+            }
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self,key)
+
+    def __setitem__(self,key,value):
+        if key in ('begin','end'):
+            value = value['absolute']
+        elif key not in self.keys():
+            raise KeyError(key)
+        setattr(self,key,value)
+
+
+class FunctionInfo(Record):
+    """A function definition.
+
+    The loops can be loaded lazily, on the first access to for_loops,
+    from a loader which usually holds the function AST node. The loops
+    are loaded before the record is pickled or deep copied, unless the
+    loader is marked as picklable, e.g. parser.FunctionLoopsLoader.
+    to_dict and the comparisons load the loops too.
+
+    Attributes:
+        name (str): Name of the function.
+        begin (int): Line where the function begins.
+        end (int): Line where the function ends.
+        for_loops (List[LoopInfo]): The loops of the function, in the
+            order they appear in the code.
+        raw (Optional[str]): The source code of the function.
+    """
+
+    __slots__ = ('name','begin','end','raw','_for_loops','_loader')
+
+    _fields = ('name','begin','end','for_loops','raw')
+
+    def __init__(self,name,begin,end,for_loops=None,raw=None,loader=None):
+        """
+        Args:
+            loader (Optional[callable]): Returns the loops of the function,
+                it is called once if for_loops is not given.
+        """
+        self.name = name
+        self.begin = begin
+        self.end = end
+        self.raw = raw
+        self._for_loops = for_loops
+        self._loader = loader
+
+        if for_loops is None and loader is None:
+            self._for_loops = []
+
+    @property
+    def for_loops(self):
+        if self._for_loops is None:
+            self._for_loops = self._loader()
+            self._loader = None
+        return self._for_loops
+
+    @for_loops.setter
+    def for_loops(self,for_loops):
+        self._for_loops = for_loops
+        self._loader = None
+
+    def __reduce__(self):
+        if self._for_loops is None and getattr(self._loader,'picklable',False):
+            return (type(self),(self.name,self.begin,self.end,None,self.raw,self._loader))
+        return super(FunctionInfo,self).__reduce__()
+
+    def copy(self):
+        """Return a shallow copy, the loops are shared and they are not loaded."""
+        return FunctionInfo(
+            self.name,self.begin,self.end,self._for_loops,self.raw,self._loader
+        )
+
+    @property
+    def loops_loaded(self):
+        """bool: If the loops were already loaded."""
+        return self._for_loops is not None
+
+    def keys(self):
+        keys = ['name','begin','end','for_loops']
+        if self.raw is not None:
+            keys.append('raw')
+        return keys
+
+    def to_dict(self):
+        data = super(FunctionInfo,self).to_dict()
+        data['for_loops'] = [loop.to_dict() for loop in self.for_loops]
+        return data
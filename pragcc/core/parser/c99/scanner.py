@@ -0,0 +1,179 @@
+# -*- encoding: utf-8 -*-
+"""Scanner Module.
+Locates the function definitions of a C99 source code without parsing
+it. Only the tokens needed to track the top level braces are recognized
+(comments, literals, directives, identifiers and a few punctuators), so
+the scan is much cheaper than lexing the code for the parser. It allows
+to parse only the functions which are going to be annotated.
+
+Example:
+
+    spans = scanner.function_spans(text)
+    if spans is not None:
+        for span in spans:
+            print(span.name,span.begin,span.end)
+
+"""
+
+import re
+
+from .records import Record
+from .pycparser.c_lexer import CLexer
+
+
+TOKENS = re.compile(r"""
+    (?P<COMMENT>/\*.*?\*/|//[^\n]*)
+  | (?P<STRING>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<DIRECTIVE>^[ \t]*\#(?:\\\n|[^\n])*)
+  | (?P<ID>[A-Za-z_]\w*)
+  | (?P<PUNCTUATOR>[(){};=])
+  | (?P<NEWLINE>\n)
+""",re.VERBOSE | re.DOTALL | re.MULTILINE)
+"""re.Pattern: The tokens of the scan, any other character is skipped."""
+
+CONDITIONAL = re.compile(r'[ \t]*\#[ \t]*(?:if|ifdef|ifndef|elif|else)\b')
+"""re.Pattern: A conditional compilation directive, its branches may hold definitions."""
+
+AGGREGATE_KEYWORDS = frozenset(('struct','union','enum'))
+"""frozenset: Keywords which introduce a top level brace which is not a function body."""
+
+KEYWORDS = frozenset(CLexer.keyword_map)
+"""frozenset: The C99 keywords, they can not be function names."""
+
+
+class FunctionSpan(Record):
+    """The lines of a function definition.
+
+    Attributes:
+        name (str): Name of the function.
+        begin (int): Line of the function name, as reported by the parser.
+        end (int): Line of the closing brace of the function body.
+        first_line (int): First line of the definition, where its
+            return type begins.
+    """
+
+    __slots__ = ('name','begin','end','first_line')
+
+    _fields = __slots__
+
+
+def _tokens(text):
+    """Yield (type, value, line) for each token of the scan."""
+    line = 1
+    for match in TOKENS.finditer(text):
+        kind = match.lastgroup
+        value = match.group()
+
+        if kind == 'NEWLINE':
+            line += 1
+            continue
+
+        if kind == 'ID':
+            yield (kind,value,line)
+        elif kind == 'PUNCTUATOR':
+            yield (value,value,line)
+        elif kind == 'DIRECTIVE' and CONDITIONAL.match(value):
+            yield ('#if',value,line)
+
+        # Comments, literals and directives may span several lines
+        line += value.count('\n')
+
+
+def function_spans(text):
+    """Return the lines of each function definition in the given code.
+
+    Args:
+        text (str): C99 source code, preprocessor directives are skipped.
+
+    Returns:
+        List[FunctionSpan]: The functions in the order they appear in
+            the code, or None if the code can not be split in whole lines
+            by function, e.g. two definitions share a line, a function
+            definition is not recognized or there is a conditional
+            compilation directive out of the function bodies, which
+            could leave out or repeat definitions.
+    """
+    spans = []
+    depth = 0
+
+    # State of the current top level statement
+    first_line = None
+    first_shared = False
+    name = None
+    name_line = None
+    parens = 0
+    aggregate = False
+    function = False
+
+    previous_kind = None
+    previous_value = None
+    previous_line = 0
+    closed_span = None
+
+    for kind, value, line in _tokens(text):
+
+        # A function must end alone in its last line
+        if closed_span is not None:
+            if line == closed_span.end:
+                return None
+            closed_span = None
+
+        if depth == 0:
+            if kind == '#if':
+                return None
+
+            if first_line is None:
+                first_line = line
+                first_shared = line == previous_line
+
+            if kind == 'ID':
+                if value in AGGREGATE_KEYWORDS and parens == 0:
+                    aggregate = True
+
+            elif kind == '=':
+                if parens == 0:
+                    aggregate = True
+
+            elif kind == '(':
+                if (parens == 0 and name is None and previous_kind == 'ID'
+                    and previous_value not in KEYWORDS):
+                    name = previous_value
+                    name_line = previous_line
+                parens += 1
+
+            elif kind == ')':
+                parens -= 1
+
+            elif kind == '{':
+                if previous_kind == ')':
+                    # A function must begin alone in its first line
+                    if name is None or first_shared:
+                        return None
+                    function = True
+                elif not aggregate:
+                    # K&R definitions and unknown constructs
+                    return None
+                depth = 1
+
+            elif kind == ';':
+                first_line = name = name_line = None
+                parens = 0
+                aggregate = False
+
+        elif kind == '{':
+            depth += 1
+
+        elif kind == '}':
+            depth -= 1
+            if depth == 0 and function:
+                closed_span = FunctionSpan(name,name_line,line,first_line)
+                spans.append(closed_span)
+                first_line = name = name_line = None
+                parens = 0
+                aggregate = function = False
+
+        previous_kind = kind
+        previous_value = value
+        previous_line = line
+
+    return spans
@@ -0,0 +1,144 @@
+# -*- encoding: utf-8 -*-
+"""Spans Parser Module.
+pragcc only needs the lines of the function definitions and of their
+loops, but pycparser.CParser builds the whole AST, a node and a Coord
+for each identifier, constant and operator. The SpansCParser keeps the
+C99 grammar and the LALR tables, so it accepts and rejects the same
+codes, but its grammar actions do not build the expressions. It
+returns a skeletal AST: the file holds the function definitions, each
+body holds compounds, loops and the other statements which may enclose
+loops.
+
+Declarations are still built while parsing, the parser needs them to
+know the typedef names in scope, but they are not kept in the AST.
+
+Example:
+
+    with spans_parser.PARSERS.parser() as cparser:
+        ast = cparser.parse(text,filename)
+
+"""
+
+from . import pool
+from .pycparser import c_ast
+from .pycparser import c_parser
+
+
+class Skipped(c_ast.Node):
+    """An expression or a statement which was not built."""
+
+    __slots__ = ()
+
+    attr_names = ()
+
+    #: Expressions used where a node with a coord or a name is expected,
+    #: e.g. in a K&R identifier list.
+    _coord = None
+    name = None
+
+    def children(self):
+        return ()
+
+    def __iter__(self):
+        return iter(())
+
+    def __reduce__(self):
+        # The unpickled node is the SKIPPED singleton
+        return 'SKIPPED'
+
+
+SKIPPED = Skipped()
+"""Skipped: The single node which replaces every skipped subtree."""
+
+
+def _skip(method):
+    """Return a grammar action which reduces its production to SKIPPED.
+
+    The action keeps the docstring, i.e. the production, of the action
+    it replaces.
+    """
+    def action(self,p):
+        p[0] = SKIPPED
+
+    action.__name__ = method.__name__
+    action.__doc__ = method.__doc__
+    return action
+
+
+class SpansCParser(c_parser.CParser):
+    """A CParser which builds only the nodes of the function and loop spans."""
+
+    # Expressions, from the primary ones to the comma separated lists
+    p_identifier = _skip(c_parser.CParser.p_identifier)
+    p_constant_1 = _skip(c_parser.CParser.p_constant_1)
+    p_constant_2 = _skip(c_parser.CParser.p_constant_2)
+    p_constant_3 = _skip(c_parser.CParser.p_constant_3)
+    p_unified_string_literal = _skip(c_parser.CParser.p_unified_string_literal)
+    p_unified_wstring_literal = _skip(c_parser.CParser.p_unified_wstring_literal)
+    p_primary_expression_5 = _skip(c_parser.CParser.p_primary_expression_5)
+    p_offsetof_member_designator = _skip(c_parser.CParser.p_offsetof_member_designator)
+    p_postfix_expression_2 = _skip(c_parser.CParser.p_postfix_expression_2)
+    p_postfix_expression_3 = _skip(c_parser.CParser.p_postfix_expression_3)
+    p_postfix_expression_4 = _skip(c_parser.CParser.p_postfix_expression_4)
+    p_postfix_expression_5 = _skip(c_parser.CParser.p_postfix_expression_5)
+    p_postfix_expression_6 = _skip(c_parser.CParser.p_postfix_expression_6)
+    p_argument_expression_list = _skip(c_parser.CParser.p_argument_expression_list)
+    p_unary_expression_2 = _skip(c_parser.CParser.p_unary_expression_2)
+    p_unary_expression_3 = _skip(c_parser.CParser.p_unary_expression_3)
+    p_cast_expression_2 = _skip(c_parser.CParser.p_cast_expression_2)
+    p_binary_expression = _skip(c_parser.CParser.p_binary_expression)
+    p_conditional_expression = _skip(c_parser.CParser.p_conditional_expression)
+    p_assignment_expression = _skip(c_parser.CParser.p_assignment_expression)
+    p_expression = _skip(c_parser.CParser.p_expression)
+
+    # Initializers
+    p_initializer_2 = _skip(c_parser.CParser.p_initializer_2)
+    p_initializer_list = _skip(c_parser.CParser.p_initializer_list)
+    p_designation = _skip(c_parser.CParser.p_designation)
+    p_designator_list = _skip(c_parser.CParser.p_designator_list)
+    p_designator = _skip(c_parser.CParser.p_designator)
+
+    # Statements which can not enclose a loop
+    p_expression_statement = _skip(c_parser.CParser.p_expression_statement)
+    p_jump_statement_1 = _skip(c_parser.CParser.p_jump_statement_1)
+    p_jump_statement_2 = _skip(c_parser.CParser.p_jump_statement_2)
+    p_jump_statement_3 = _skip(c_parser.CParser.p_jump_statement_3)
+    p_jump_statement_4 = _skip(c_parser.CParser.p_jump_statement_4)
+
+    def p_external_declaration_2(self,p):
+        p[0] = []
+
+    p_external_declaration_2.__doc__ = c_parser.CParser.p_external_declaration_2.__doc__
+
+    def p_block_item(self,p):
+        # Declarations and skipped statements are left out of the compounds
+        p[0] = [] if isinstance(p[1],list) or p[1] is SKIPPED else [p[1]]
+
+    p_block_item.__doc__ = c_parser.CParser.p_block_item.__doc__
+
+    def p_iteration_statement_3(self,p):
+        p[0] = c_ast.For(None,None,None,p[9],self._token_coord(p,1))
+
+    p_iteration_statement_3.__doc__ = c_parser.CParser.p_iteration_statement_3.__doc__
+
+    def p_iteration_statement_4(self,p):
+        p[0] = c_ast.For(None,None,None,p[8],self._token_coord(p,1))
+
+    p_iteration_statement_4.__doc__ = c_parser.CParser.p_iteration_statement_4.__doc__
+
+
+def create_parser():
+    """Return a new SpansCParser built from the prebuilt tables, see pool.create_parser."""
+    # The tables are the ones of CParser, they are built by pool
+    # at import time, so they are never written by this parser.
+    return SpansCParser(
+        lex_optimize=True,
+        lextab=pool.LEXTAB,
+        yacc_optimize=True,
+        yacctab=pool.YACCTAB,
+        taboutputdir=pool.TABLES_DIR
+    )
+
+
+PARSERS = pool.ParserPool(factory=create_parser)
+"""pool.ParserPool: Process-wide pool of spans parsers."""
@@ -8,4 +8,29 @@ BASE_DIR = os.path.dirname(os.path.realpath(__file__))
 TEMPLATES_DIR = 'templates'
 
 PARALLEL_FILE_NAME = 'parallel.yml'
-PARALLEL_FILE_DIR = os.path.join(BASE_DIR,TEMPLATES_DIR)
\ No newline at end of file
+PARALLEL_FILE_DIR = os.path.join(BASE_DIR,TEMPLATES_DIR)
+
+# Parse results cache, the functions data of each parsed source code
+# is kept in memory (and on disk if a directory is given) keyed by
+# the hash of the source code. The cached data includes the loops of
+# every function, when the cache is disabled the loops of a function
+# are only extracted if the function is parallelized.
+PARSE_CACHE_ENABLED = True
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+PARSE_CACHE_DIR = None
+PARSE_CACHE_MAX_DISK_BYTES = None
+
+# Selective parsing, the managers parse only the functions named in the
+# parallel file, the other function definitions are just located.
+SELECTIVE_PARSING = False
+
+# Incremental annotation, the managers keep the last version of this
+# many documents to re-parse and re-annotate only their changed functions.
+MAX_DOCUMENTS = 128
+
+# Parallel files, the directive plan of each parallel file is loaded and
+# validated once, then shared by the requests with the same parallel file.
+PARALLEL_PLAN_CACHE_SIZE = 256
+
+# Rendered pragmas of the directive plans, see parallelizer.PragmaCache.
+PRAGMA_CACHE_SIZE = 4096
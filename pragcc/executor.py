@@ -0,0 +1,269 @@
+# -*- encoding: utf-8 -*-
+"""Executor Module.
+Parsing with PLY is pure Python and CPU bound, so a single process can
+not use more than one core. This module dispatches the annotation of
+the managers to a pool of pre-forked worker processes, each worker has
+the parser tables already loaded.
+
+Each worker process is a pool of its own, so the tasks of a document
+always run on the same worker, which keeps the previous version of the
+document to annotate the next one incrementally.
+
+Example:
+
+    executor = ProcessExecutor(workers=4,timeout=30)
+    data, error = executor.get_annotated_code_data('openmp',raw_parallel_file,raw_c_code)
+
+"""
+
+import os
+import zlib
+import signal
+import itertools
+import threading
+import multiprocessing
+from concurrent import futures
+
+from .manager import OpenMPManager, OpenACCManager
+
+
+MANAGERS = {
+    'openmp': OpenMPManager,
+    'openacc': OpenACCManager
+}
+"""Dict[str,type]: Managers by the kind of directives they annotate."""
+
+TIMEOUT_ERROR = "The code annotation took too long and it was cancelled."
+
+
+_STARTED = None
+"""Optional[multiprocessing.SimpleQueue]: Where a worker reports the tasks it starts."""
+
+
+class TaskTimeout(Exception):
+    """Raised when a task exceeds its time limit."""
+
+
+def _initialize(started=None):
+    """Prepare a worker process, the parser tables are loaded once."""
+    global _STARTED
+    _STARTED = started
+
+    from .core.parser.c99 import pool
+    pool.PARSERS.release(pool.PARSERS.acquire())
+
+
+def _raise_timeout(signum,frame):
+    raise TaskTimeout('The task exceeded its time limit')
+
+
+def _run(timeout,function,args,task_id=None):
+    """Run a function on a worker process, limiting its execution time."""
+    if task_id is not None and _STARTED is not None:
+        _STARTED.put(task_id)
+
+    if timeout and hasattr(signal,'SIGALRM'):
+        signal.signal(signal.SIGALRM,_raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL,timeout)
+
+    try:
+        return function(*args)
+    finally:
+        if timeout and hasattr(signal,'SIGALRM'):
+            signal.setitimer(signal.ITIMER_REAL,0)
+
+
+def annotate(directives,raw_parallel_file,raw_c_code):
+    """Annotate a code, see BaseManager.get_annotated_code_data."""
+    manager = MANAGERS[directives]()
+    return manager.get_annotated_code_data(raw_parallel_file,raw_c_code)
+
+
+def annotate_batch(directives,raw_parallel_files,raw_c_code):
+    """Annotate a code several times, see BaseManager.get_annotated_codes_data."""
+    manager = MANAGERS[directives]()
+    return manager.get_annotated_codes_data(raw_parallel_files,raw_c_code)
+
+
+def annotate_document(directives,document_id,raw_parallel_file,raw_c_code):
+    """Annotate a document incrementally, see BaseManager.get_annotated_document_data."""
+    manager = MANAGERS[directives]()
+    return manager.get_annotated_document_data(document_id,raw_parallel_file,raw_c_code)
+
+
+class ProcessExecutor(object):
+    """Runs functions on a pool of pre-forked worker processes.
+
+    The tasks without a key run on the least busy worker, the tasks
+    with the same key run on the same worker.
+    """
+
+    def __init__(self,workers=None,timeout=None):
+        """Create the pool, the worker processes are started right away.
+
+        Args:
+            workers (Optional[int]): Number of worker processes, the
+                number of CPUs by default.
+            timeout (Optional[float]): Maximum seconds a task can run.
+        """
+        self._timeout = timeout
+
+        # The workers report the tasks they start, so their
+        # futures are set as running by the watcher thread.
+        self._started = multiprocessing.SimpleQueue()
+
+        # A single worker pool for each worker, so a task can be
+        # sent to a given worker.
+        self._pools = [
+            multiprocessing.Pool(
+                processes=1,
+                initializer=_initialize,
+                initargs=(self._started,)
+            )
+            for worker in range(workers or os.cpu_count() or 1)
+        ]
+        self._pending = [0] * len(self._pools)
+
+        self._task_ids = itertools.count()
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+        self._watcher = threading.Thread(target=self._watch_started)
+        self._watcher.daemon = True
+        self._watcher.start()
+
+    def _watch_started(self):
+        """Set the future of each task started by a worker as running."""
+        while True:
+            task_id = self._started.get()
+            if task_id is None:
+                break
+
+            with self._lock:
+                future = self._tasks.get(task_id)
+                if future is not None and not future.running():
+                    future.set_running_or_notify_cancel()
+
+    def _task_done(self,task_id,worker,set_outcome,outcome):
+        """Complete the future of a task with its result or exception."""
+        with self._lock:
+            self._tasks.pop(task_id,None)
+            self._pending[worker] -= 1
+            set_outcome(outcome)
+
+    @property
+    def workers(self):
+        """int: Number of worker processes."""
+        return len(self._pools)
+
+    def worker_of(self,key):
+        """Return the index of the worker which runs the tasks with the given key."""
+        return zlib.crc32(str(key).encode('utf-8')) % len(self._pools)
+
+    def submit(self,function,*args,key=None):
+        """Queue a function call.
+
+        Args:
+            function (callable): A module level function.
+            *args: The function arguments, they must be picklable.
+            key (Optional[str]): The calls with the same key run on the
+                same worker, the calls without a key on the least busy one.
+
+        Returns:
+            concurrent.futures.Future: The result of the call, it is
+                running once a worker starts the call, and it fails with
+                TaskTimeout if the call takes too long.
+        """
+        future = futures.Future()
+
+        with self._lock:
+            task_id = next(self._task_ids)
+            self._tasks[task_id] = future
+
+            if key is None:
+                worker = self._pending.index(min(self._pending))
+            else:
+                worker = self.worker_of(key)
+            self._pending[worker] += 1
+
+        self._pools[worker].apply_async(
+            _run,
+            (self._timeout,function,args,task_id),
+            callback=lambda result: self._task_done(
+                task_id,worker,future.set_result,result
+            ),
+            error_callback=lambda error: self._task_done(
+                task_id,worker,future.set_exception,error
+            )
+        )
+        return future
+
+    def run(self,function,*args,key=None):
+        """Call a function on a worker process and wait for its result.
+
+        Raises:
+            TaskTimeout: If the call takes too long.
+        """
+        future = self.submit(function,*args,key=key)
+
+        # The worker stops the task itself, the extra time
+        # just covers the task dispatching.
+        wait = self._timeout + 1 if self._timeout else None
+
+        try:
+            return future.result(timeout=wait)
+        except futures.TimeoutError:
+            raise TaskTimeout('The task exceeded its time limit')
+
+    def get_annotated_code_data(self,directives,raw_parallel_file,raw_c_code):
+        """Annotate a code on a worker process.
+
+        Args:
+            directives (str): 'openmp' or 'openacc'.
+            raw_parallel_file (str): The parallel.yml content.
+            raw_c_code (str): The C99 source code to be annotated.
+
+        Returns:
+            tuple(dict,str): The annotated code data and None, or None
+                and an error message.
+        """
+        try:
+            return self.run(annotate,directives,raw_parallel_file,raw_c_code)
+        except TaskTimeout:
+            return None, TIMEOUT_ERROR
+
+    def get_annotated_codes_data(self,directives,raw_parallel_files,raw_c_code):
+        """Annotate a code once for each parallel file on a worker process.
+
+        Returns:
+            List[tuple(dict,str)]: The result of each annotation.
+        """
+        try:
+            return self.run(annotate_batch,directives,raw_parallel_files,raw_c_code)
+        except TaskTimeout:
+            return [(None, TIMEOUT_ERROR) for raw_parallel_file in raw_parallel_files]
+
+    def get_annotated_document_data(self,directives,document_id,raw_parallel_file,raw_c_code):
+        """Annotate a document incrementally on a worker process.
+
+        Each worker keeps its own documents, so the versions of a
+        document always run on the worker chosen by its document_id.
+
+        Returns:
+            tuple(dict,str): The annotated code data and None, or None
+                and an error message.
+        """
+        try:
+            return self.run(
+                annotate_document,directives,document_id,raw_parallel_file,raw_c_code,
+                key=document_id
+            )
+        except TaskTimeout:
+            return None, TIMEOUT_ERROR
+
+    def shutdown(self):
+        """Stop the worker processes."""
+        for pool in self._pools:
+            pool.terminate()
+            pool.join()
+        self._started.put(None)
@@ -1,21 +1,165 @@
 # -*- encoding: utf-8 -*-
 
+import yaml
+import threading
+import collections
+
+from .core import code
 from .core import metadata
 from .core import parallelizer
+from .core import settings
+from .core.parser.c99 import parser
 from .core.parser.c99.pycparser.plyparser import ParseError
 
 
-class OpenMPManager(object):
+class Document(object):
+    """The last version of a code annotated incrementally."""
 
-    def get_annotated_code_data(self,raw_parallel_file,raw_c_code):
+    def __init__(self,code_data,raw_parallel_file,annotated_raws):
+        """
+        Args:
+            code_data (dict): The parsed data of the code, its functions
+                raw code is not annotated.
+            raw_parallel_file (str): The parallel.yml content used to
+                annotate the code.
+            annotated_raws (Dict[str,str]): The annotated raw code of
+                each function by name.
+        """
+        self.code_data = code_data
+        self.raw_parallel_file = raw_parallel_file
+        self.annotated_raws = annotated_raws
+
+
+class DocumentStore(object):
+    """Keeps the last version of the most recently annotated documents."""
+
+    def __init__(self,max_documents=settings.MAX_DOCUMENTS):
+        self._max_documents = max_documents
+        self._documents = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self,key):
+        with self._lock:
+            document = self._documents.get(key)
+            if document is not None:
+                self._documents.move_to_end(key)
+            return document
+
+    def set(self,key,document):
+        with self._lock:
+            self._documents[key] = document
+            self._documents.move_to_end(key)
+            while len(self._documents) > self._max_documents:
+                self._documents.popitem(last=False)
+
+
+DOCUMENTS = DocumentStore()
+"""DocumentStore: Documents annotated with get_annotated_document_data."""
 
-        parallel_meta = metadata.Parallel(raw_text=raw_parallel_file)
-        openmp_parallelizer = parallelizer.OpenMP(raw_code=raw_c_code)
 
+class BaseManager(object):
+    """Annotates raw C99 code and reports the errors found on the way."""
+
+    #: type: The parallelizer class used to annotate the code.
+    parallelizer_class = None
+
+    #: str: Name given to the annotated code file.
+    file_name = None
+
+    # Possible reason
+    # As parallelization runs having as a reference the parallel file
+    # if a function contained in the parallel file is not in the
+    # raw code, it can raise a value error.
+    FUNCTIONS_ERROR = (
+        "Probably, the functions specified in the parallel.yml file do not match "
+        "the functions that are present in the source code."
+    )
+
+    # Possible reason
+    # The code is splitted in sections to be handled easily during
+    # parallelization, to perform the code splitting, the source code
+    # must follow the the following format
+    #
+    #   // Include section
+    #   #include <....h>
+    #   #include <....h>
+    #
+    #   // Defines section
+    #
+    #   // Functions sectio
+    #   int main () {
+    #
+    #   }
+    # if this format is not present, an IndexError may occurs during code
+    # splitting.
+    FORMAT_ERROR = (
+        "Your code must be have at least two '#include' lines, "
+        "some contants definitions, finally, function definitions."
+    )
+
+    # Possible reason
+    # This error can occurs when the code does not compile correctly
+    # or the given code is not completely C99 that is the versión supported
+    # by 'pycparser'
+    PARSE_ERROR = (
+        "The code does not compile correctly or "
+        "it has syntax that is not supported yet by Pycparser."
+    )
+
+    # Possible reason
+    # The parallel file is not valid YAML or it does not follow the
+    # parallel file schema, see metadata.validate.
+    PARALLEL_FILE_ERROR = (
+        "The parallel.yml file is not valid: %s"
+    )
+
+    def _load_parallel_file(self,raw_parallel_file):
+        """Load the given parallel file.
+
+        Returns:
+            tuple(metadata.Parallel,str): The parallel file metadata and
+                None, or None and an error message.
+        """
         try:
-            ccode = openmp_parallelizer.parallelize(parallel_meta)
+            return metadata.Parallel(raw_text=raw_parallel_file), None
+
+        except (yaml.YAMLError,metadata.ParallelFileError) as error:
+            return None, self.PARALLEL_FILE_ERROR % error
+
+    def _annotate(self,ccode,raw_parallel_file,annotated_raws=None):
+        """Annotate the given code following the given parallel file.
+
+        Args:
+            ccode (code.CCode): The code to be annotated, it is modified.
+            raw_parallel_file (str): The parallel.yml content.
+            annotated_raws (Optional[Dict[str,str]]): Functions already
+                annotated with this parallel file, their annotated raw
+                code is reused.
+
+        Returns:
+            tuple(dict,str): The annotated code data and None, or None
+                and an error message.
+        """
+        parallel_meta, error = self._load_parallel_file(raw_parallel_file)
+        if error:
+            return None, error
+
+        code_parallelizer = self.parallelizer_class(ccode=ccode)
+
+        try:
+            functions = None
+            if annotated_raws:
+                for function_name, raw in annotated_raws.items():
+                    ccode.update_function_raw_code(function_name,raw)
+
+                functions = [
+                    function_name for function_name in parallel_meta.get_functions()
+                    if function_name not in annotated_raws
+                ]
+
+            ccode = code_parallelizer.parallelize(parallel_meta,functions)
             data = {
-                'name': 'omp.c',
+                'name': self.file_name,
                 'ftype': ccode.file_type,
                 'text': ccode.raw
             }
@@ -25,131 +169,153 @@ class OpenMPManager(object):
             return data, error
 
         except ValueError:
-            # Possible reason
-            # As parallelization runs having as a reference the parallel file
-            # if a function contained in the parallel file is not in the 
-            # raw code, it can raise a value error.
-            
-            data = None
-            error = (
-                "Probably, the functions specified in the parallel.yml file do not match "
-                "the functions that are present in the source code."
-            )
-            return data, error
+            return None, self.FUNCTIONS_ERROR
 
         except IndexError:
-            # Possible reason
-            # The code is splitted in sections to be handled easily during 
-            # parallelization, to perform the code splitting, the source code
-            # must follow the the following format
-            #   
-            #   // Include section 
-            #   #include <....h>
-            #   #include <....h>
-            # 
-            #   // Defines section
-            # 
-            #   // Functions sectio
-            #   int main () {
-            # 
-            #   }
-            # if this format is not present, an IndexError may occurs during code 
-            # splitting. 
-
-            data = None
-            error = (
-                "Your code must be have at least two '#include' lines, "
-                "some contants definitions, finally, function definitions."
-            )
-
-            return data, error
+            return None, self.FORMAT_ERROR
 
         except ParseError:
-            # Possible reason
-            # This error can occurs when the code does not compile correctly 
-            # or the given code is not completely C99 that is the versión supported
-            # by 'pycparser'
-
-            data = None
-            error = (
-                "The code does not compile correctly or "
-                "it has syntax that is not supported yet by Pycparser."
-            )
-            
-            return data, error
+            return None, self.PARSE_ERROR
+
+    def _load_code(self,raw_c_code,functions=None):
+        """Parse the given code.
 
+        Args:
+            raw_c_code (str): The C99 source code.
+            functions (Optional[Iterable[str]]): Parse only these
+                functions, see code.CCode.
 
+        Returns:
+            tuple(code.CCode,str): The parsed code and None, or None
+                and an error message.
+        """
+        try:
+            return code.CCode(raw_code=raw_c_code,functions=functions), None
 
+        except IndexError:
+            return None, self.FORMAT_ERROR
 
-class OpenACCManager(object):
+        except ParseError:
+            return None, self.PARSE_ERROR
 
     def get_annotated_code_data(self,raw_parallel_file,raw_c_code):
+        """Annotate a C99 code following a parallel file.
+
+        Args:
+            raw_parallel_file (str): The parallel.yml content.
+            raw_c_code (str): The C99 source code to be annotated.
 
-        parallel_meta = metadata.Parallel(raw_text=raw_parallel_file)
-        openmp_parallelizer = parallelizer.OpenACC(raw_code=raw_c_code)
+        Returns:
+            tuple(dict,str): The annotated code data and None, or None
+                and an error message.
+        """
+        functions = None
+        if settings.SELECTIVE_PARSING:
+            parallel_meta, error = self._load_parallel_file(raw_parallel_file)
+            if error:
+                return None, error
+            functions = parallel_meta.get_functions()
+
+        ccode, error = self._load_code(raw_c_code,functions)
+        if error:
+            return None, error
+
+        return self._annotate(ccode,raw_parallel_file)
+
+    def get_annotated_codes_data(self,raw_parallel_files,raw_c_code):
+        """Annotate a C99 code once for each of the given parallel files.
+
+        The code is parsed only once, then each parallel file
+        is applied to a copy of the parsed code.
+
+        Args:
+            raw_parallel_files (List[str]): parallel.yml contents.
+            raw_c_code (str): The C99 source code to be annotated.
+
+        Returns:
+            List[tuple(dict,str)]: The result of each annotation, in
+                the same order as the parallel files.
+        """
+        ccode, error = self._load_code(raw_c_code)
+        if error:
+            return [(None, error) for raw_parallel_file in raw_parallel_files]
+
+        return [
+            self._annotate(ccode.copy(),raw_parallel_file)
+            for raw_parallel_file in raw_parallel_files
+        ]
+
+
+    def get_annotated_document_data(self,document_id,raw_parallel_file,raw_c_code):
+        """Annotate a new version of a document incrementally.
+
+        The previous version of the document is kept, only the functions
+        whose code changed since then are parsed and annotated again, the
+        other ones are reused.
+
+        Args:
+            document_id (str): Identifies the document across versions.
+            raw_parallel_file (str): The parallel.yml content.
+            raw_c_code (str): The new version of the C99 source code.
+
+        Returns:
+            tuple(dict,str): The annotated code data and None, or None
+                and an error message.
+        """
+        key = (self.file_name,document_id)
+        document = DOCUMENTS.get(key)
 
         try:
-            ccode = openmp_parallelizer.parallelize(parallel_meta)
-            data = {
-                'name': 'acc.c',
-                'ftype': ccode.file_type,
-                'text': ccode.raw
+            if document is None:
+                code_data, changed = code.CCode.load_data_from_text(raw_c_code), None
+            else:
+                code_data, changed = parser.get_updated_data_from_text(
+                    document.code_data,raw_c_code,lazy=True
+                )
+
+        except IndexError:
+            return None, self.FORMAT_ERROR
+
+        except ParseError:
+            return None, self.PARSE_ERROR
+
+        # The code is annotated on a copy, the document keeps the raw
+        # code of its functions as it is in the source code.
+        annotated_data = dict(code_data)
+        annotated_data['functions'] = [
+            function.copy() for function in code_data['functions']
+        ]
+        ccode = code.CCode(raw_code=raw_c_code,code_data=annotated_data)
+
+        annotated_raws = None
+        if changed is not None and document.raw_parallel_file == raw_parallel_file:
+            annotated_raws = {
+                function_name: raw
+                for function_name, raw in document.annotated_raws.items()
+                if function_name not in changed and ccode.get_function_raw(function_name)
             }
 
-            error = None
+        data, error = self._annotate(ccode,raw_parallel_file,annotated_raws)
 
-            return data, error
+        if not error:
+            annotated_raws = {
+                function['name']: function['raw']
+                for function in annotated_data['functions']
+            }
+            DOCUMENTS.set(key,Document(code_data,raw_parallel_file,annotated_raws))
 
-        except ValueError:
-            # Possible reason
-            # As parallelization runs having as a reference the parallel file
-            # if a function contained in the parallel file is not in the 
-            # raw code, it can raise a value error.
-            
-            data = None
-            error = (
-                "Probably, the functions specified in the parallel.yml file do not match "
-                "the functions that are present in the source code."
-            )
-            return data, error
+        return data, error
 
-        except IndexError:
-            # Possible reason
-            # The code is splitted in sections to be handled easily during 
-            # parallelization, to perform the code splitting, the source code
-            # must follow the the following format
-            #   
-            #   // Include section 
-            #   #include <....h>
-            #   #include <....h>
-            # 
-            #   // Defines section
-            # 
-            #   // Functions sectio
-            #   int main () {
-            # 
-            #   }
-            # if this format is not present, an IndexError may occurs during code 
-            # splitting. 
-
-            data = None
-            error = (
-                "Your code must be have at least two '#include' lines, "
-                "some contants definitions, finally, function definitions."
-            )
 
-            return data, error
+class OpenMPManager(BaseManager):
 
-        except ParseError:
-            # Possible reason
-            # This error can occurs when the code does not compile correctly 
-            # or the given code is not completely C99 that is the versión supported
-            # by 'pycparser'
-
-            data = None
-            error = (
-                "The code does not compile correctly or "
-                "it has syntax that is not supported yet by Pycparser."
-            )
-            
-            return data, error
\ No newline at end of file
+    parallelizer_class = parallelizer.OpenMP
+
+    file_name = 'omp.c'
+
+
+class OpenACCManager(BaseManager):
+
+    parallelizer_class = parallelizer.OpenACC
+
+    file_name = 'acc.c'
@@ -0,0 +1,41 @@
+# -*- encoding: utf-8 -*-
+
+from flask import Flask
+
+from api import apis
+from api.apis import data
+
+import json
+import unittest
+
+
+class TestBatchApi(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        app = Flask(__name__)
+        apis.api.init_app(app)
+        cls._client = app.test_client()
+
+    def _post(self,url,payload):
+        response = self._client.post(url,data=json.dumps(payload),content_type='application/json')
+        return response.status_code, json.loads(response.get_data(as_text=True))
+
+    def test_code_is_annotated_once_for_each_parallel_file(self):
+        for url, file_name in (('/openmp/batch','omp.c'),('/openacc/batch','acc.c')):
+            status_code, batch = self._post(url,{
+                'raw_parallel_files': [data.PARALLEL_FILE,data.PARALLEL_FILE],
+                'raw_c_code': data.RAW_C_CODE
+            })
+
+            self.assertEqual(status_code,200)
+            self.assertEqual([result['name'] for result in batch['results']],[file_name] * 2)
+
+    def test_parallel_files_must_be_given(self):
+        status_code, message = self._post('/openmp/batch',{'raw_c_code': data.RAW_C_CODE})
+        self.assertEqual(status_code,400)
+
+    def test_both_resources_are_documented(self):
+        swagger = json.loads(self._client.get('/swagger.json').get_data(as_text=True))
+        self.assertIn('/openmp/batch',swagger['paths'])
+        self.assertIn('/openacc/batch',swagger['paths'])
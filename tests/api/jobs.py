@@ -0,0 +1,101 @@
+# -*- encoding: utf-8 -*-
+
+from flask import Flask
+
+from api import apis
+from api.apis import data, tasks
+
+import json
+import time
+import unittest
+
+
+def setUpModule():
+    tasks.configure(workers=2)
+
+
+def tearDownModule():
+    tasks.EXECUTOR.shutdown()
+    tasks.EXECUTOR = None
+
+
+class TestJobQueue(unittest.TestCase):
+
+    def test_job_runs_until_it_finishes(self):
+        queue = tasks.JobQueue()
+        job = queue.submit(time.sleep,0.5)
+
+        start = time.time()
+        while job.status == 'queued' and time.time() - start < 5:
+            time.sleep(0.01)
+        self.assertEqual(job.status,'running')
+
+        self.assertIs(queue.get(job.id,wait=5),job)
+        self.assertEqual(job.status,'finished')
+
+    def test_failed_job(self):
+        queue = tasks.JobQueue()
+        job = queue.get(queue.submit(sum,None).id,wait=5)
+
+        self.assertEqual(job.status,'failed')
+        self.assertIn('error',job.to_dict())
+
+    def test_jobs_beyond_max_pending_are_rejected(self):
+        queue = tasks.JobQueue(max_pending=1)
+        job = queue.submit(time.sleep,0.5)
+
+        with self.assertRaises(tasks.QueueFull):
+            queue.submit(time.sleep,0.5)
+
+        queue.get(job.id,wait=5)
+        self.assertEqual(queue.stats['pending'],0)
+
+    def test_wait_is_capped(self):
+        queue = tasks.JobQueue(max_wait=0.1)
+        job = queue.submit(time.sleep,2)
+
+        start = time.time()
+        queue.get(job.id,wait=60)
+        self.assertLess(time.time() - start,1)
+        self.assertIn(job.status,('queued','running'))
+
+    def test_unknown_job(self):
+        self.assertIsNone(tasks.JobQueue().get('unknown',wait=1))
+
+
+class TestJobsApi(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        app = Flask(__name__)
+        apis.api.init_app(app)
+        cls._client = app.test_client()
+
+    def _get(self,url):
+        response = self._client.get(url)
+        return response.status_code, json.loads(response.get_data(as_text=True))
+
+    def test_submitted_job_returns_the_annotated_code(self):
+        response = self._client.post('/openmp/jobs',data=json.dumps({
+            'raw_parallel_file': data.PARALLEL_FILE,
+            'raw_c_code': data.RAW_C_CODE
+        }),content_type='application/json')
+        self.assertEqual(response.status_code,202)
+        job_id = json.loads(response.get_data(as_text=True))['job_id']
+
+        status_code, job = self._get('/jobs/%s?wait=10' % job_id)
+        self.assertEqual(status_code,200)
+        self.assertEqual(job['status'],'finished')
+        self.assertEqual(job['status_code'],200)
+        self.assertEqual(job['result']['name'],'omp.c')
+
+    def test_wait_must_be_a_number(self):
+        self.assertEqual(self._get('/jobs/unknown?wait=never')[0],400)
+
+    def test_unknown_job(self):
+        self.assertEqual(self._get('/jobs/unknown')[0],404)
+
+    def test_queue_stats(self):
+        status_code, stats = self._get('/jobs')
+        self.assertEqual(status_code,200)
+        self.assertEqual(stats['max_pending'],tasks.MAX_PENDING_JOBS)
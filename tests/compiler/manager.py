@@ -0,0 +1,80 @@
+# -*- encoding: utf-8 -*-
+
+from compiler.manager import GccManager
+from pragcc.core.cache import LRUCache
+
+import subprocess
+import unittest
+from unittest import mock
+
+
+VALID_CODE = '#include <stdio.h>\nint main(){ return 0; }\n'
+
+WARNING_CODE = '#warning "a warning"\nint main(){ return 0; }\n'
+
+INVALID_CODE = 'int main(){ return 0 }\n'
+
+
+class TestGccManager(unittest.TestCase):
+
+    def setUp(self):
+        self._manager = GccManager(std='c99',cache=LRUCache(max_bytes=1024 * 1024))
+
+    def test_valid_code_succeeds(self):
+        result = self._manager.check_raw_code(VALID_CODE)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(result.stderr,'')
+
+    def test_warnings_do_not_fail_the_check(self):
+        for result in (self._manager.check_raw_code(WARNING_CODE),self._manager.compile_raw_code(WARNING_CODE)):
+            self.assertTrue(result.succeeded)
+            self.assertIn('a warning',result.stderr)
+
+    def test_invalid_code_fails(self):
+        result = self._manager.check_raw_code(INVALID_CODE)
+        self.assertFalse(result.succeeded)
+        self.assertIn('error',result.stderr)
+
+    def test_missing_compiler_fails_with_a_message(self):
+        manager = GccManager(compiler='pragcc-missing-gcc',cache=self._manager.cache)
+
+        result = manager.check_raw_code(VALID_CODE)
+        self.assertFalse(result.succeeded)
+        self.assertIn('pragcc-missing-gcc',result.stderr)
+
+
+class TestGccManagerCache(unittest.TestCase):
+
+    def setUp(self):
+        self._manager = GccManager(cache=LRUCache(max_bytes=1024 * 1024))
+
+    def _runs(self,function,*args):
+        with mock.patch('compiler.manager.subprocess.run',wraps=subprocess.run) as run:
+            result = function(*args)
+        return result, run.call_count
+
+    def test_results_are_cached(self):
+        self.assertEqual(self._runs(self._manager.check_raw_code,VALID_CODE)[1],1)
+        self.assertEqual(self._runs(self._manager.check_raw_code,VALID_CODE)[1],0)
+
+    def test_a_successful_compile_passes_the_check(self):
+        self._manager.compile_raw_code(VALID_CODE)
+
+        result, runs = self._runs(self._manager.check_raw_code,VALID_CODE)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(runs,0)
+
+    def test_a_failed_compile_does_not_fail_the_check(self):
+        # Linking fails without main, the syntax is still valid
+        code = 'int function(){ return 0; }\n'
+        self.assertFalse(self._manager.compile_raw_code(code).succeeded)
+
+        result, runs = self._runs(self._manager.check_raw_code,code)
+        self.assertTrue(result.succeeded)
+        self.assertEqual(runs,1)
+
+    def test_the_flags_are_part_of_the_key(self):
+        self._manager.check_raw_code(VALID_CODE)
+
+        manager = GccManager(std='c99',cache=self._manager.cache)
+        self.assertEqual(self._runs(manager.check_raw_code,VALID_CODE)[1],1)
@@ -0,0 +1,112 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc.core import cache, code
+from pragcc.core.parser.c99 import parser
+
+from tests.pragcc import test_data
+
+import os
+import time
+import tempfile
+import unittest
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def setUp(self):
+        self._cache = cache.LRUCache(max_bytes=1024)
+
+    def test_key_depends_on_the_content(self):
+        self.assertEqual(cache.LRUCache.key('int a;'),cache.LRUCache.key('int a;'))
+        self.assertNotEqual(cache.LRUCache.key('int a;'),cache.LRUCache.key('int b;'))
+
+    def test_hits_and_misses_are_counted(self):
+        self.assertIsNone(self._cache.get('key'))
+        self._cache.set('key',{'name': 'main'})
+        self.assertEqual(self._cache.get('key'),{'name': 'main'})
+        self.assertEqual(self._cache.stats['hits'],1)
+        self.assertEqual(self._cache.stats['misses'],1)
+
+    def test_cached_values_are_copies(self):
+        self._cache.set('key',[{'raw': ''}])
+        value = self._cache.get('key')
+        value[0]['raw'] = 'modified'
+        self.assertEqual(self._cache.get('key'),[{'raw': ''}])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        self._cache.set('a','x' * 400)
+        self._cache.set('b','x' * 400)
+        self._cache.get('a')
+        self._cache.set('c','x' * 400)
+
+        self.assertIsNotNone(self._cache.get('a'))
+        self.assertIsNone(self._cache.get('b'))
+        self.assertEqual(self._cache.stats['evictions'],1)
+        self.assertLessEqual(self._cache.stats['bytes'],1024)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as dir_path:
+            disk_cache = cache.LRUCache(dir_path=dir_path)
+            disk_cache.set('key',{'name': 'main'})
+
+            other_cache = cache.LRUCache(dir_path=dir_path)
+            self.assertEqual(other_cache.get('key'),{'name': 'main'})
+            self.assertEqual(other_cache.stats['disk_hits'],1)
+
+    def test_disk_tier_eviction(self):
+        with tempfile.TemporaryDirectory() as dir_path:
+            disk_cache = cache.LRUCache(dir_path=dir_path,max_disk_bytes=1024)
+            for key in ('a','b','c'):
+                disk_cache.set(key,'x' * 400)
+
+            self.assertEqual(len(os.listdir(dir_path)),2)
+
+    def test_entries_expire_after_the_ttl(self):
+        ttl_cache = cache.LRUCache(ttl=0.05)
+        ttl_cache.set('key','value')
+        self.assertEqual(ttl_cache.get('key'),'value')
+
+        time.sleep(0.1)
+        self.assertIsNone(ttl_cache.get('key'))
+        self.assertEqual(ttl_cache.stats['expirations'],1)
+        self.assertEqual(ttl_cache.stats['entries'],0)
+
+    def test_disk_tier_entries_expire_after_the_ttl(self):
+        with tempfile.TemporaryDirectory() as dir_path:
+            cache.LRUCache(dir_path=dir_path).set('key','value')
+
+            # The entry was set a minute ago
+            old = time.time() - 60
+            os.utime(os.path.join(dir_path,'key.pickle'),(time.time(),old))
+
+            ttl_cache = cache.LRUCache(dir_path=dir_path,ttl=30)
+            self.assertIsNone(ttl_cache.get('key'))
+            self.assertEqual(os.listdir(dir_path),[])
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self._cache = cache.LRUCache()
+        self._code = test_data.SIMPLE_CODE_FUNCTION_LOOP
+
+    def test_parse_results_are_reused(self):
+        data = parser.get_data_from_text(self._code,cache=self._cache)
+        cached_data = parser.get_data_from_text(self._code,cache=self._cache)
+
+        self.assertEqual(data,cached_data)
+        self.assertEqual(self._cache.stats['hits'],1)
+
+    def test_sections_are_taken_from_the_given_code(self):
+        parser.get_data_from_text(self._code,cache=self._cache)
+        other_code = self._code.replace('<stdio.h>','<math.h>')
+        data = parser.get_data_from_text(other_code,cache=self._cache)
+
+        self.assertEqual(self._cache.stats['hits'],1)
+        self.assertIn('<math.h>',data['include'])
+
+    def test_ccode_uses_the_parse_cache(self):
+        hits = code.PARSE_CACHE.stats['hits']
+        code.CCode(raw_code=self._code)
+        code.CCode(raw_code=self._code)
+        self.assertGreater(code.PARSE_CACHE.stats['hits'],hits)
@@ -0,0 +1,123 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc import cli
+
+from tests.pragcc import test_data
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._project = os.path.join(self._dir,'project')
+        self._output = os.path.join(self._dir,'output')
+
+        os.makedirs(os.path.join(self._project,'sub'))
+        self._write('main.c','int main(){ return 0; }\n')
+        self._write('sub/kernel.c','void kernel(){}\n')
+        self._write('sub/kernel.yml','')
+        self._write('sub/notes.txt','')
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write(self,relative_path,text):
+        with open(os.path.join(self._project,relative_path),'w') as file:
+            file.write(text)
+
+    def test_c_files_are_found_in_directories(self):
+        c_files = cli.find_c_files([self._project])
+        self.assertEqual(
+            [relative_path for _, relative_path in c_files],
+            ['main.c',os.path.join('sub','kernel.c')]
+        )
+
+    def test_c_files_are_found_with_glob_patterns(self):
+        pattern = os.path.join(self._project,'**','*.c')
+        c_files = cli.find_c_files([pattern,self._project])
+        self.assertEqual(len(c_files),2)
+
+    def test_c_files_of_several_directories_keep_their_structure(self):
+        self._write('kernel.c','int main(){ return 0; }\n')
+        pattern = os.path.join(self._project,'**','kernel.c')
+
+        c_files = cli.find_c_files([pattern])
+        self.assertEqual(
+            [relative_path for _, relative_path in c_files],
+            ['kernel.c',os.path.join('sub','kernel.c')]
+        )
+
+    def test_parallel_file_of_the_c_file_is_preferred(self):
+        c_file = os.path.join(self._project,'sub','kernel.c')
+        self.assertEqual(
+            cli.find_parallel_file(c_file,'project.yml'),
+            os.path.join(self._project,'sub','kernel.yml')
+        )
+
+    def test_project_parallel_file_is_the_fallback(self):
+        c_file = os.path.join(self._project,'main.c')
+        self.assertIsNone(cli.find_parallel_file(c_file))
+
+        project_parallel_file = os.path.join(self._project,'sub','kernel.yml')
+        self.assertEqual(
+            cli.find_parallel_file(c_file,project_parallel_file),
+            project_parallel_file
+        )
+
+    def test_failed_files_are_reported(self):
+        args = cli.create_parser().parse_args([
+            'annotate',self._project,'--output',self._output,'--workers','1'
+        ])
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        self.assertEqual(cli.annotate(args,stdout,stderr),1)
+        self.assertIn('main.c: parallel file not found',stderr.getvalue())
+        self.assertIn('kernel.c',stderr.getvalue())
+        self.assertIn('0 files annotated, 2 failed',stdout.getvalue())
+        self.assertFalse(os.path.exists(self._output))
+
+    def test_output_inside_the_input_is_rejected(self):
+        for output in (self._project,os.path.join(self._project,'sub','annotated')):
+            args = cli.create_parser().parse_args([
+                'annotate',self._project,'--output',output,'--workers','1'
+            ])
+            stdout, stderr = io.StringIO(), io.StringIO()
+
+            self.assertEqual(cli.annotate(args,stdout,stderr),1)
+            self.assertIn('is inside the input directory',stderr.getvalue())
+            self.assertEqual(stdout.getvalue(),'')
+
+        self.assertFalse(os.path.exists(os.path.join(self._project,'sub','annotated')))
+
+    def test_output_next_to_an_input_file_is_rejected(self):
+        args = cli.create_parser().parse_args([
+            'annotate',os.path.join(self._project,'main.c'),
+            '--output',os.path.join(self._project,'annotated'),'--workers','1'
+        ])
+        stderr = io.StringIO()
+
+        self.assertEqual(cli.annotate(args,io.StringIO(),stderr),1)
+        self.assertIn('is inside the input directory',stderr.getvalue())
+
+    def test_annotated_files_are_written_to_the_output(self):
+        c_file = os.path.join(self._project,'sub','complex.c')
+        shutil.copy(test_data.COMPLEX_FILE_PATH,c_file)
+
+        args = cli.create_parser().parse_args([
+            'annotate',c_file,'--output',self._output,
+            '--parallel-file',test_data.PARALLEL_FILE_PATH,
+            '--directives','openacc','--workers','1'
+        ])
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        self.assertEqual(cli.annotate(args,stdout,stderr),0)
+        self.assertIn('1 files annotated, 0 failed',stdout.getvalue())
+
+        with open(os.path.join(self._output,'complex.c'),'r') as file:
+            self.assertIn('#pragma acc',file.read())
@@ -1,6 +1,6 @@
 # -*- encoding: utf-8 -*-
 
-from pragcc.core import code
+from pragcc.core import code, settings
 from pragcc.core.parser.c99.pycparser.plyparser import ParseError
 
 from tests import utils
@@ -89,3 +89,96 @@ class TestCCodeObject(unittest.TestCase):
     def test_read_supported_code_file(self):
         ccode = code.CCode(file_path=self._supported)
         self.assertIsInstance(ccode,code.CCode)
+
+
+class TestCCodeLookups(unittest.TestCase):
+
+    def setUp(self):
+        self._ccode = code.CCode(raw_code=test_data.SIMPLE_CODE_FUNCTION_LOOP)
+
+    def test_functions_are_found_by_exact_name(self):
+        self.assertTrue(self._ccode.get_function_raw('some_function'))
+        self.assertEqual(self._ccode.get_function_raw('some_function_2'),'')
+        self.assertEqual(self._ccode.get_function_raw('function'),'')
+
+    def test_loop_lookups(self):
+        self.assertEqual(self._ccode.get_loop_line('some_function',0),6)
+        self.assertEqual(self._ccode.get_for_loops_scope('some_function',0),(6,8))
+        self.assertIsNone(self._ccode.get_loop_line('some_function',1))
+        self.assertEqual(self._ccode.get_for_loops_scope('main',0),())
+
+    def test_loops_are_found_by_their_nro(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            ccode = code.CCode(raw_code=file.read())
+
+        loops = [
+            (function['name'],loop)
+            for function in ccode._data['functions'] for loop in function['for_loops']
+        ]
+        self.assertGreater(len(loops),1)
+
+        for function_name, loop in loops:
+            self.assertIs(ccode._get_loop(function_name,loop['nro']),loop)
+
+        self.assertIsNone(ccode._get_loop(loops[0][0],-1))
+        self.assertIsNone(ccode._get_loop(loops[0][0],'0'))
+
+    def test_updates_are_seen_by_lookups(self):
+        self._ccode.update_function_raw_code('main','int main(){}')
+        self.assertEqual(self._ccode.get_function_raw('main'),'int main(){}')
+        self.assertIn('int main(){}',self._ccode.raw)
+
+    def test_update_unknown_function(self):
+        with self.assertRaises(ValueError):
+            self._ccode.update_function_raw_code('unknown','')
+
+
+class TestCCodeLazyLoops(unittest.TestCase):
+
+    def setUp(self):
+        self._parse_cache_enabled = settings.PARSE_CACHE_ENABLED
+        settings.PARSE_CACHE_ENABLED = False
+        self._ccode = code.CCode(raw_code=test_data.SIMPLE_CODE_FUNCTION_LOOP)
+
+    def tearDown(self):
+        settings.PARSE_CACHE_ENABLED = self._parse_cache_enabled
+
+    def test_loops_are_not_loaded_until_needed(self):
+        self.assertEqual(self._ccode.stats['loaded_functions'],0)
+
+        self.assertEqual(self._ccode.get_loop_line('some_function',0),6)
+        self.assertEqual(self._ccode.stats['loaded_functions'],1)
+        self.assertEqual(self._ccode.stats['loaded_loops'],1)
+
+    def test_cached_code_keeps_its_loops_unloaded(self):
+        settings.PARSE_CACHE_ENABLED = True
+        code.PARSE_CACHE.clear()
+
+        for _ in range(2):
+            ccode = code.CCode(raw_code=test_data.SIMPLE_CODE_FUNCTION_LOOP)
+            self.assertEqual(ccode.stats['loaded_functions'],0)
+
+            self.assertEqual(ccode.get_loop_line('some_function',0),6)
+            self.assertEqual(ccode.stats['loaded_functions'],1)
+
+        self.assertGreater(code.PARSE_CACHE.hits,0)
+
+    def test_copies_keep_their_loops_unloaded(self):
+        ccode = self._ccode.copy()
+        ccode.update_function_raw_code('some_function','void some_function(){}')
+
+        self.assertEqual(ccode.stats['loaded_functions'],0)
+        self.assertEqual(self._ccode.stats['loaded_functions'],0)
+        self.assertNotEqual(
+            self._ccode.get_function_raw('some_function'),
+            ccode.get_function_raw('some_function')
+        )
+
+    def test_selective_parsing(self):
+        ccode = code.CCode(
+            raw_code=test_data.SIMPLE_CODE_FUNCTION_LOOP,
+            functions=['some_function']
+        )
+        self.assertEqual(ccode.get_loop_line('some_function',0),6)
+        self.assertEqual(ccode.raw,self._ccode.raw)
+        self.assertEqual(ccode.stats['loaded_functions'],1)
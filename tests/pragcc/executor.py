@@ -0,0 +1,100 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc import executor, manager
+from pragcc.manager import OpenMPManager
+
+from tests.pragcc import test_data
+
+import time
+import unittest
+import yaml
+
+
+def _has_document(directives,document_id):
+    """Return if the worker running this call keeps the given document."""
+    file_name = executor.MANAGERS[directives].file_name
+    return manager.DOCUMENTS.get((file_name,document_id)) is not None
+
+
+class TestProcessExecutor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._executor = executor.ProcessExecutor(workers=2,timeout=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._executor.shutdown()
+
+    def test_executor_starts_the_given_workers(self):
+        self.assertEqual(self._executor.workers,2)
+
+    def test_function_runs_on_a_worker(self):
+        self.assertEqual(self._executor.run(sum,[1,2,3]),6)
+
+    def test_submitted_function_returns_a_future(self):
+        future = self._executor.submit(sum,[1,2,3])
+        self.assertEqual(future.result(timeout=5),6)
+
+    def test_future_is_running_once_a_worker_starts_it(self):
+        future = self._executor.submit(time.sleep,0.5)
+
+        start = time.time()
+        while not future.running() and time.time() - start < 5:
+            time.sleep(0.01)
+
+        self.assertTrue(future.running())
+        self.assertIsNone(future.result(timeout=5))
+        self.assertFalse(future.running())
+
+    def test_task_exceeding_the_timeout_is_stopped(self):
+        start = time.time()
+        with self.assertRaises(executor.TaskTimeout):
+            self._executor.run(time.sleep,10)
+        self.assertLess(time.time() - start,5)
+
+        # The worker is still usable after the timeout
+        self.assertEqual(self._executor.run(sum,[1,2,3]),6)
+
+    def test_annotation_errors_are_returned_from_the_worker(self):
+        code_data, error = self._executor.get_annotated_code_data(
+            'openmp','',test_data.SIMPLE_CODE + 'int main(){ return 0 }'
+        )
+        self.assertIsNone(code_data)
+        self.assertEqual(error,OpenMPManager.PARSE_ERROR)
+
+    def test_batch_annotation_returns_a_result_per_parallel_file(self):
+        codes_data = self._executor.get_annotated_codes_data(
+            'openmp',['',''],test_data.SIMPLE_CODE + 'int main(){ return 0 }'
+        )
+        self.assertEqual(codes_data,[(None, OpenMPManager.PARSE_ERROR)] * 2)
+
+    def test_document_annotation_runs_on_a_worker(self):
+        code_data, error = self._executor.get_annotated_document_data(
+            'openmp','doc','',test_data.SIMPLE_CODE + 'int main(){ return 0 }'
+        )
+        self.assertIsNone(code_data)
+        self.assertEqual(error,OpenMPManager.PARSE_ERROR)
+
+    def test_versions_of_a_document_run_on_the_same_worker(self):
+        parallel_file = yaml.dump(test_data.METADATA_FOR_SIMPLE_CODE_FUNCTION_LOOP)
+        code = test_data.SIMPLE_CODE_FUNCTION_LOOP
+        new_code = code.replace('some_function();','some_function();\n    return 0;')
+
+        document_ids = ['document-%d' % index for index in range(8)]
+        self.assertEqual(
+            len({self._executor.worker_of(document_id) for document_id in document_ids}),2
+        )
+
+        for document_id in document_ids:
+            self._executor.get_annotated_document_data('openmp',document_id,parallel_file,code)
+
+        for document_id in document_ids:
+            # The previous version is kept by the worker of the new one
+            self.assertTrue(self._executor.run(_has_document,'openmp',document_id,key=document_id))
+            self.assertEqual(
+                self._executor.get_annotated_document_data(
+                    'openmp',document_id,parallel_file,new_code
+                ),
+                OpenMPManager().get_annotated_code_data(parallel_file,new_code)
+            )
@@ -0,0 +1,79 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc import manager
+from pragcc.core import parallelizer
+
+from tests.pragcc import test_data
+
+from unittest import mock
+import unittest
+import yaml
+
+
+class TestDocumentAnnotation(unittest.TestCase):
+
+    def setUp(self):
+        self._documents = manager.DOCUMENTS
+        manager.DOCUMENTS = manager.DocumentStore()
+
+        self._parallel_file = yaml.dump(test_data.METADATA_FOR_SIMPLE_CODE_FUNCTION_LOOP)
+        self._code = test_data.SIMPLE_CODE_FUNCTION_LOOP
+
+    def tearDown(self):
+        manager.DOCUMENTS = self._documents
+
+    def _assert_same_annotation(self,raw_c_code):
+        for manager_class in (manager.OpenMPManager,manager.OpenACCManager):
+            code_manager = manager_class()
+            code_manager.get_annotated_document_data('doc',self._parallel_file,self._code)
+
+            self.assertEqual(
+                code_manager.get_annotated_document_data('doc',self._parallel_file,raw_c_code),
+                code_manager.get_annotated_code_data(self._parallel_file,raw_c_code)
+            )
+
+    def test_first_version_is_annotated_as_a_whole(self):
+        code_manager = manager.OpenMPManager()
+        self.assertEqual(
+            code_manager.get_annotated_document_data('doc',self._parallel_file,self._code),
+            code_manager.get_annotated_code_data(self._parallel_file,self._code)
+        )
+
+    def test_edit_outside_the_annotated_function(self):
+        self._assert_same_annotation(
+            self._code.replace('some_function();','some_function();\n    return 0;')
+        )
+
+    def test_edit_inside_the_annotated_function(self):
+        self._assert_same_annotation(
+            self._code.replace('C[i] = A[i] + B[i];','C[i] = A[i] * B[i];')
+        )
+
+    def test_edit_moving_the_annotated_function(self):
+        self._assert_same_annotation(
+            self._code.replace('#define N 10','#define N 10\n#define M 20\n')
+        )
+
+    def test_unchanged_function_is_not_annotated_again(self):
+        code_manager = manager.OpenMPManager()
+        code_manager.get_annotated_document_data('doc',self._parallel_file,self._code)
+
+        parallelize = parallelizer.OpenMP.parallelize
+        with mock.patch.object(
+            parallelizer.OpenMP,'parallelize',autospec=True,side_effect=parallelize) as patched:
+            code_manager.get_annotated_document_data(
+                'doc',self._parallel_file,self._code.replace('some_function();','')
+            )
+
+        functions = patched.call_args[0][2]
+        self.assertEqual(functions,[])
+
+    def test_errors_are_not_kept_as_document(self):
+        code_manager = manager.OpenMPManager()
+        code_data, error = code_manager.get_annotated_document_data(
+            'doc',self._parallel_file,test_data.SIMPLE_CODE + 'int main(){ return 0 }'
+        )
+
+        self.assertIsNone(code_data)
+        self.assertEqual(error,code_manager.PARSE_ERROR)
+        self.assertIsNone(manager.DOCUMENTS.get((code_manager.file_name,'doc')))
@@ -4,6 +4,7 @@ from pragcc.core import metadata
 
 from tests.pragcc import test_data
 
+import yaml
 import unittest
 
 
@@ -15,4 +16,49 @@ class TestParallelFile(unittest.TestCase):
 	def test_parallel_metadata_object_creation(self):
 		parallel_metadata = metadata.Parallel(file_path=self._file_path_1)
 		self.assertIsInstance(parallel_metadata,metadata.Parallel)
-		self.assertIsInstance(parallel_metadata.data,dict)
\ No newline at end of file
+		self.assertIsInstance(parallel_metadata.data,dict)
+
+	def test_parallel_file_is_loaded_with_the_safe_loader(self):
+		with self.assertRaises(yaml.YAMLError):
+			metadata.Parallel(raw_text="functs: !!python/object/apply:os.getcwd []")
+
+	def test_parallel_file_not_following_the_schema_is_rejected(self):
+		with self.assertRaises(metadata.ParallelFileError):
+			metadata.Parallel(raw_text="functs: {parallel: {f: {mp: {for: [{clauses: {}}]}}}}")
+
+		with self.assertRaises(metadata.ParallelFileError):
+			metadata.Parallel(data={'functs': {'all': ['main']}})
+
+	def test_quoted_integers_are_accepted(self):
+		parallel_metadata = metadata.Parallel(
+			raw_text="functs: {parallel: {f: {mp: {parallel: {scope: '0'}, for: [{nro: '1'}]}}}}"
+		)
+		function_name, directives = parallel_metadata.get_directives('mp')[0]
+
+		self.assertEqual(directives['parallel']['scope'],0)
+		self.assertEqual(directives['for'][0]['nro'],1)
+
+		with self.assertRaises(metadata.ParallelFileError):
+			metadata.Parallel(raw_text="functs: {parallel: {f: {mp: {for: [{nro: one}]}}}}")
+
+	def test_directive_plan_is_memoized_by_content(self):
+		with open(self._file_path_1,'r') as file:
+			raw_text = file.read()
+
+		parallel_metadata_1 = metadata.Parallel(raw_text=raw_text)
+		parallel_metadata_2 = metadata.Parallel(file_path=self._file_path_1)
+		self.assertIs(parallel_metadata_1.plan,parallel_metadata_2.plan)
+
+	def test_directives_are_read_only(self):
+		parallel_metadata = metadata.Parallel(file_path=self._file_path_1)
+		function_name, directives = parallel_metadata.get_directives('omp')[0]
+
+		self.assertEqual(function_name,'evolve')
+		self.assertEqual(parallel_metadata.get_functions(),('evolve',))
+		self.assertEqual(directives['for'][1]['nro'],0)
+		with self.assertRaises(TypeError):
+			directives['for'][1]['nro'] = 2
+
+		# The data is a copy that can be modified
+		parallel_metadata.data['functs']['parallel'].clear()
+		self.assertEqual(len(parallel_metadata.get_directives('omp')),1)
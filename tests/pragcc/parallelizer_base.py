@@ -120,6 +120,53 @@ class TestBaseParallelizer(unittest.TestCase):
 
         self.assertEqual(new_raw,'')
 
+    def test_insertions_on_the_same_line_keep_their_order(self):
+        insertions = [
+            ('#pragma omp parallel',2),
+            ('{',2),
+            ('}',5)
+        ]
+
+        new_raw = self._parallelizer.insert_lines(
+            self._raw_code,
+            insertions
+        )
+
+        lines = new_raw.splitlines()
+
+        self.assertEqual(lines[2:4],['#pragma omp parallel','{'])
+        self.assertEqual(lines[7],'}')
+
+    def test_unsorted_insertions(self):
+        insertions = [
+            ('Second insertion',2),
+            ('First insertion',1)
+        ]
+
+        new_raw = self._parallelizer.insert_lines(
+            self._raw_code,
+            insertions
+        )
+
+        self.assertEqual(new_raw.splitlines()[1],'First insertion')
+        self.assertEqual(new_raw.splitlines()[3],'Second insertion')
+
+    def test_insert_in_large_raw_code(self):
+        """Line numbers are compared by value, not by identity."""
+        raw = '\n'.join(str(line) for line in range(2000))
+
+        insertions = [
+            ('Insertion',1500),
+            ('Last insertion',1999)
+        ]
+
+        new_raw = self._parallelizer.insert_lines(raw,insertions)
+        lines = new_raw.splitlines()
+
+        self.assertEqual(len(lines),2002)
+        self.assertEqual(lines[1500:1502],['Insertion','1500'])
+        self.assertEqual(lines[-2:],['Last insertion','1999'])
+
     def test_not_implemented_methods(self):
         """Testing methods that needs to be implemented."""
         with self.assertRaises(NotImplementedError):
@@ -50,3 +50,26 @@ class TestDirectiveFactory(unittest.TestCase):
         expected_pragma = '#pragma omp parallel '
 
         self.assertTrue(pragmas_equals(pragma,expected_pragma))
+
+    def test_create_pragma_of_directive_plan_clauses_is_cached(self):
+        functions_directives = self._parallel.get_directives('acc')
+        function_name, directives = functions_directives[0]
+        clauses = directives['parallel_loop'][0]['clauses']
+
+        pragma_1 = self._directive_factory.create_raw_pragma('acc','parallel loop',clauses)
+        pragma_2 = self._directive_factory.create_raw_pragma('acc','parallel loop',clauses)
+
+        expected_pragma = '#pragma acc parallel loop num_gangs(100) num_workers(100) gang vector '
+
+        self.assertTrue(pragmas_equals(pragma_1,expected_pragma))
+        self.assertIs(pragma_1,pragma_2)
+
+        # The same clauses give the same pragma when they are not cached
+        pragma_3 = self._directive_factory.create_raw_pragma(
+            'acc','parallel loop',dict(clauses)
+        )
+        self.assertEqual(pragma_1,pragma_3)
+
+    def test_create_pragma_with_empty_clauses(self):
+        pragma = self._directive_factory.create_raw_pragma('acc','kernels',None)
+        self.assertEqual(pragma,'#pragma acc kernels ')
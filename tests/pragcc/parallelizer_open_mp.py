@@ -435,3 +435,16 @@ class TestOpenMPWholeParallelization(unittest.TestCase):
         # NOTE: we need to check the paralwllization was
         # driven correctly.
         ccode = self._omp.parallelize(self._parallel)
+
+    def test_parallelize_copies_of_the_same_code(self):
+        ccode = code.CCode(raw_code=test_data.SIMPLE_CODE_FUNCTION_LOOP)
+
+        omp_1 = parallelizer.OpenMP(ccode=ccode.copy())
+        omp_2 = parallelizer.OpenMP(ccode=ccode.copy())
+
+        raw_1 = omp_1.parallelize(self._parallel).raw
+        raw_2 = omp_2.parallelize(self._parallel).raw
+
+        self.assertEqual(raw_1,raw_2)
+        self.assertIn('#pragma omp parallel for',raw_1)
+        self.assertNotIn('#pragma',ccode.raw)
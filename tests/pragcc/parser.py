@@ -1,12 +1,18 @@
 # -*- encoding: utf-8 -*-
 
-from pragcc.core.parser.c99 import parser
+from pragcc.core.parser.c99 import parser, ast_visitor
+from pragcc.core.parser.c99.pycparser import c_ast, _ast_gen, plyparser
 from pragcc.core.parser.c99.pycparser.c_ast import FileAST
+from pragcc.core.parser.c99.pycparser.plyparser import Coord, encode_coord
 from pragcc.core.parser.c99.pycparser.plyparser import ParseError
 
 from tests import utils
 from tests.pragcc import test_data
 
+import io
+import os
+import sys
+import pickle
 import unittest
 
 
@@ -56,3 +62,355 @@ class TestCCodeParsing(unittest.TestCase):
         self.assertIsInstance(ast,FileAST)
 
 
+
+class TestCCodeTextParsing(unittest.TestCase):
+
+    def setUp(self):
+        self._complex = test_data.COMPLEX_FILE_PATH
+        self._code = test_data.SIMPLE_CODE_FUNCTION_LOOP
+
+    def tearDown(self):
+        utils.purge(dir=test_data.TEST_DIR,pattern='fake_*')
+
+    def test_fake_ctext_keeps_the_number_of_lines(self):
+        faked_text = parser.fake_ctext(self._code)
+        self.assertEqual(len(faked_text.splitlines()),len(self._code.splitlines()))
+        self.assertIn(parser.FAKE_DEFINES,faked_text)
+        self.assertIn(parser.FAKE_TYPEDEFS,faked_text)
+
+    def test_parse_code_text(self):
+        ast = parser.parse_ctext(self._code)
+        self.assertIsInstance(ast,FileAST)
+
+    def test_parse_unsupported_code_text(self):
+        with self.assertRaises(ParseError):
+            ast = parser.parse_ctext('int main(){ return 0 }')
+
+    def test_data_from_text_matches_data_from_file(self):
+        with open(self._complex,'r') as file:
+            text = file.read()
+
+        text_data = parser.get_data_from_text(text)
+        file_data = parser.get_data_from_cfile(self._complex)
+
+        self.assertIsNone(text_data['file_path'])
+        self.assertEqual(text_data['include'],file_data['include'])
+        self.assertEqual(text_data['declaration'],file_data['declaration'])
+        self.assertEqual(text_data['functions'],file_data['functions'])
+
+
+class TestFuncDefForVisitor(unittest.TestCase):
+
+    def setUp(self):
+        self._complex = test_data.COMPLEX_FILE_PATH
+
+    def tearDown(self):
+        utils.purge(dir=test_data.TEST_DIR,pattern='fake_*')
+
+    def test_single_pass_matches_the_function_and_loop_visitors(self):
+        ast = parser.parse_cfile(self._complex)
+
+        visitor = ast_visitor.FuncDefVisitor()
+        funcdefs_data = visitor.funcdefs_data(visitor.funcdefs(ast))
+
+        functions = ast_visitor.FuncDefForVisitor.funcdefs_data(ast)
+        self.assertEqual([function.to_dict() for function in functions],funcdefs_data)
+
+    def test_deeply_nested_loops(self):
+        nesting = sys.getrecursionlimit()
+        code = (
+            'int main(){ int i; ' +
+            'for(i=0;i<1;i++){ ' * nesting +
+            '}' * nesting +
+            ' return 0; }'
+        )
+
+        ast = parser.parse_ctext(code)
+        loops_data = ast_visitor.FuncDefForVisitor.funcdefs_data(ast)[0]['for_loops']
+
+        self.assertEqual(len(loops_data),nesting)
+        self.assertEqual(loops_data[-1]['depth'],nesting - 1)
+        self.assertEqual(len(ast_visitor.ForVisitor._for_loops(ast)),nesting)
+
+
+class TestIncrementalParsing(unittest.TestCase):
+
+    def setUp(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            self._text = file.read()
+
+        self._data = parser.get_data_from_text(self._text)
+
+        # A line is added to the first function, the following ones move
+        self._new_text = self._text.replace(
+            'matrix[10*ColDim+10] = 1;',
+            'matrix[10*ColDim+10] = 1;\n    matrix[0] = 1;'
+        )
+
+    def test_only_the_changed_functions_are_parsed(self):
+        data, changed = parser.get_updated_data_from_text(self._data,self._new_text)
+        self.assertEqual(changed,{'initialize'})
+        self.assertEqual(data['functions'],parser.get_data_from_text(self._new_text)['functions'])
+
+    def test_unchanged_code_is_not_parsed(self):
+        data, changed = parser.get_updated_data_from_text(self._data,self._text)
+        self.assertEqual(changed,set())
+        self.assertEqual(data['functions'],self._data['functions'])
+
+    def test_changed_declarations_are_parsed_whole(self):
+        new_text = self._new_text.replace('#define RowDim 20','#define RowDim 30')
+        data, changed = parser.get_updated_data_from_text(self._data,new_text)
+        self.assertIsNone(changed)
+        self.assertEqual(data['declaration'],parser.get_data_from_text(new_text)['declaration'])
+
+
+class TestFakeHeadersSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            self._text = file.read()
+
+    def tearDown(self):
+        parser.SNAPSHOT_FAKE_HEADERS = True
+
+    def test_fake_headers_are_removed_from_the_preprocessed_code(self):
+        for backend in (parser.CPP_BACKEND,parser.PLY_BACKEND):
+            preprocessed_text = parser.preprocess_ctext(
+                parser.fake_ctext(self._text),'code.c',backend=backend
+            )
+            stripped_text, headers = parser.strip_fake_headers(preprocessed_text)
+
+            self.assertEqual(headers,['_fake_defines.h','_fake_typedefs.h'])
+            self.assertNotIn('typedef',stripped_text)
+
+    def test_fake_header_scope_has_its_typedefs(self):
+        scope = parser.fake_header_scope('_fake_typedefs.h')
+        self.assertTrue(scope['size_t'])
+        self.assertTrue(scope['bool'])
+        self.assertNotIn('bool',parser.fake_header_scope('_fake_defines.h'))
+
+    def test_snapshot_parse_matches_the_whole_parse(self):
+        data = parser.get_data_from_text(self._text)
+
+        parser.SNAPSHOT_FAKE_HEADERS = False
+        self.assertEqual(data,parser.get_data_from_text(self._text))
+
+
+class TestSpansParsing(unittest.TestCase):
+
+    def setUp(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            self._text = file.read()
+
+        self._loops = (
+            '#include <stdio.h>\n'
+            '#include <stdlib.h>\n'
+            'int main(){\n'
+            '    int i, j, a[10];\n'
+            '    for(i=0;i<10;i++) a[i] = i;\n'
+            '    if (a[0] == 0) {\n'
+            '        while (1) { for(j=0;j<10;j++) { a[j] *= 2; } break; }\n'
+            '    }\n'
+            '    for(int k=0;k<10;k++)\n'
+            '        for(j=0;j<10;j++)\n'
+            '        {\n'
+            '            printf("%d", a[j] + k);\n'
+            '        }\n'
+            '    return 0;\n'
+            '}\n'
+        )
+
+    def tearDown(self):
+        parser.SPANS_PARSING = True
+
+    def test_spans_data_matches_the_whole_parse(self):
+        for text in (self._text,self._loops):
+            data = parser.get_data_from_text(text)
+
+            parser.SPANS_PARSING = False
+            self.assertEqual(data,parser.get_data_from_text(text))
+            parser.SPANS_PARSING = True
+
+    def test_spans_ast_is_skeletal(self):
+        ast = parser._parse_faked_ctext(parser.fake_ctext(self._loops),skeletal=True)
+
+        funcdef, = ast.ext
+        loops = ast_visitor.ForVisitor._for_loops(funcdef.body)
+        self.assertEqual(len(loops),4)
+
+        for depth, loop in loops:
+            self.assertIsNone(loop.init)
+            self.assertIsNone(loop.cond)
+            self.assertIsNone(loop.next)
+
+        # Only the statements which enclose loops are kept
+        self.assertEqual(
+            [type(item).__name__ for item in funcdef.body.block_items],
+            ['For','If','For']
+        )
+
+    def test_spans_data_of_k_and_r_definitions(self):
+        text = (
+            '#include <stdio.h>\n'
+            'int f(a, b) int a; int b;\n'
+            '{\n'
+            '    int i;\n'
+            '    for(i=0;i<a;i++) b++;\n'
+            '    return b;\n'
+            '}\n'
+        )
+        data = parser.get_data_from_text(text)
+        self.assertEqual(data['functions'][0]['for_loops'][0]['begin']['absolute'],5)
+
+        parser.SPANS_PARSING = False
+        self.assertEqual(data,parser.get_data_from_text(text))
+
+    def test_spans_parse_rejects_unsupported_code(self):
+        with open(test_data.UNSUPPORTED_CODE_FILE_PATH_1,'r') as file:
+            text = file.read()
+
+        with self.assertRaises(ParseError):
+            parser._parse_faked_ctext(parser.fake_ctext(text),skeletal=True)
+
+
+class TestCompactCoords(unittest.TestCase):
+
+    def setUp(self):
+        self._code = (
+            '#include <stdio.h>\n'
+            '#include <stdlib.h>\n'
+            'int main(){\n'
+            '    int i, total;\n'
+            '    for(i=0;i<10;i++) { total += i; }\n'
+            '    return 0;\n'
+            '}\n'
+        )
+
+    def test_coords_are_materialised_on_access(self):
+        funcdef = parser.parse_ctext(self._code).ext[-1]
+        loop = funcdef.body.block_items[2]
+
+        self.assertIsInstance(loop.coord,Coord)
+        self.assertEqual((loop.coord.line,loop.coord.column),(5,5))
+        self.assertEqual(loop.stmt.end_coord.line,5)
+        self.assertEqual(funcdef.body.end_coord.line,7)
+
+    def test_compact_coords_round_trip(self):
+        coord = encode_coord('code.c',12,7)
+        self.assertIsInstance(coord,int)
+
+        decl = parser.parse_ctext(self._code).ext[-1].decl
+        decl.coord = coord
+        self.assertEqual(str(decl.coord),'code.c:12:7')
+
+        decl.coord = Coord('other.c',3)
+        self.assertEqual(str(decl.coord),'other.c:3')
+
+        # Positions which do not fit are kept as Coord objects
+        self.assertIsInstance(encode_coord('code.c',1,1 << 20),Coord)
+
+    def test_file_table_does_not_grow_with_the_parses(self):
+        parser.parse_ctext(self._code,'code.c')
+        files = len(plyparser._file_names)
+
+        for _ in range(3):
+            parser.parse_ctext(self._code,'code.c')
+            parser.parse_ctext(self._code.replace('main','other'))
+        parser.parse_ctext(self._code,'code.c')
+
+        self.assertLessEqual(len(plyparser._file_names),files + 1)
+
+    def test_pickled_nodes_keep_their_coords(self):
+        node = c_ast.ID('x',encode_coord('kernel_a.c',3,5))
+        node_bytes = pickle.dumps(node)
+
+        # The compact coord is only valid in this process
+        self.assertIn(b'kernel_a.c',node_bytes)
+        self.assertEqual(str(pickle.loads(node_bytes).coord),'kernel_a.c:3:5')
+
+        ast = parser.parse_ctext(self._code)
+        loop = pickle.loads(pickle.dumps(ast)).ext[-1].body.block_items[2]
+        self.assertEqual((loop.coord.line,loop.stmt.end_coord.line),(5,5))
+
+    def test_parse_errors_report_the_coords(self):
+        with self.assertRaisesRegex(ParseError,r':3:\d+: before: ;'):
+            parser.parse_ctext('#include <stdio.h>\n\nint main(){ int x = ; }\n')
+
+    def test_identifiers_are_interned(self):
+        ast = parser.parse_ctext(self._code + 'int other(){ int i; return i; }\n')
+        main, other = ast.ext[-2:]
+
+        self.assertIs(main.body.block_items[0].name,other.body.block_items[0].name)
+        self.assertIs(
+            main.body.block_items[0].type.type.names[0],
+            other.body.block_items[0].type.type.names[0]
+        )
+
+
+class TestNodeVisitorDispatch(unittest.TestCase):
+
+    def setUp(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            self._ast = parser.parse_ctext(file.read())
+
+    def test_iteration_matches_the_children(self):
+        stack = [self._ast]
+        while stack:
+            node = stack.pop()
+            children = [child for name, child in node.children()]
+            self.assertEqual(list(node),children)
+            stack.extend(children)
+
+    def test_dispatch_table_of_each_visitor_class(self):
+        class IDVisitor(c_ast.NodeVisitor):
+            def __init__(self):
+                self.names = []
+
+            def visit_ID(self,node):
+                self.names.append(node.name)
+
+        class ForIDVisitor(IDVisitor):
+            def visit_For(self,node):
+                pass
+
+        id_visitor = IDVisitor()
+        id_visitor.visit(self._ast)
+        for_id_visitor = ForIDVisitor()
+        for_id_visitor.visit(self._ast)
+
+        self.assertIn('i',id_visitor.names)
+        self.assertLess(len(for_id_visitor.names),len(id_visitor.names))
+
+    def test_static_and_class_visit_methods(self):
+        names = []
+
+        class StaticIDVisitor(c_ast.NodeVisitor):
+            @staticmethod
+            def visit_ID(node):
+                names.append(node.name)
+
+        class ClassIDVisitor(c_ast.NodeVisitor):
+            @classmethod
+            def visit_ID(cls,node):
+                self.assertIs(cls,ClassIDVisitor)
+                names.append(node.name)
+
+        StaticIDVisitor().visit(self._ast)
+        static_names = names[:]
+        ClassIDVisitor().visit(self._ast)
+
+        self.assertIn('i',static_names)
+        self.assertEqual(names,static_names * 2)
+
+    def test_c_ast_is_generated_from_the_configuration(self):
+        pycparser_dir = os.path.dirname(c_ast.__file__)
+
+        generated = io.StringIO()
+        _ast_gen.ASTCodeGenerator(os.path.join(pycparser_dir,'_c_ast.cfg')).generate(generated)
+
+        with open(os.path.join(pycparser_dir,'c_ast.py'),'r') as file:
+            # The header names the configuration file it was generated from
+            self.assertEqual(
+                generated.getvalue().split('\n')[5:],
+                file.read().split('\n')[5:]
+            )
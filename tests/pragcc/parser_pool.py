@@ -0,0 +1,40 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc.core.parser.c99 import pool
+from pragcc.core.parser.c99.pycparser.c_ast import FileAST
+from pragcc.core.parser.c99.pycparser.plyparser import ParseError
+
+import sys
+import unittest
+
+
+class TestParserPool(unittest.TestCase):
+
+    def setUp(self):
+        self._pool = pool.ParserPool(size=2)
+
+    def test_tables_are_loaded_from_the_vendored_package(self):
+        self.assertIn(pool.LEXTAB,sys.modules)
+        self.assertIn(pool.YACCTAB,sys.modules)
+
+    def test_released_parser_is_reused(self):
+        cparser = self._pool.acquire()
+        self._pool.release(cparser)
+        self.assertIs(self._pool.acquire(),cparser)
+
+    def test_pool_does_not_exceed_its_size(self):
+        parsers = [self._pool.acquire() for i in range(3)]
+        for cparser in parsers:
+            self._pool.release(cparser)
+        self.assertEqual(self._pool.idle,2)
+
+    def test_parser_is_reset_after_a_parse_error(self):
+        with self.assertRaises(ParseError):
+            with self._pool.parser() as cparser:
+                cparser.parse('typedef int T; int main(){ return 0 }')
+
+        with self._pool.parser() as cparser:
+            ast = cparser.parse('int T; int main(){ return 0; }')
+
+        self.assertIsInstance(ast,FileAST)
+        self.assertEqual(cparser._scope_stack,[dict()])
@@ -0,0 +1,155 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc.core.parser.c99 import parser, preprocessor
+from pragcc.core.parser.c99.pycparser.c_ast import FileAST
+from pragcc.core.parser.c99.pycparser.plyparser import ParseError
+
+from tests import utils
+from tests.pragcc import test_data
+
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TestInProcessPreprocessor(unittest.TestCase):
+
+    def setUp(self):
+        self._complex = test_data.COMPLEX_FILE_PATH
+        self._unsupported_1 = test_data.UNSUPPORTED_CODE_FILE_PATH_1
+
+    def tearDown(self):
+        utils.purge(dir=test_data.TEST_DIR,pattern='fake_*')
+
+    def test_macros_are_expanded(self):
+        text = preprocessor.preprocess_text('#define N 10\nint A[N];\n')
+        self.assertIn('int A[10];',text)
+
+    def test_line_numbers_are_kept_after_includes(self):
+        code = '// headers\n#include <_fake_defines.h>\n\n\nint *p = NULL;\n'
+        text = preprocessor.preprocess_text(code,'code.c',[parser.FAKE_INCLUDES_DIR])
+        lines = text.splitlines()
+        marker = lines.index('# 3 "code.c"')
+        self.assertEqual(lines[marker + 3],'int *p = 0;')
+
+    def test_missing_header_raises_an_error(self):
+        with self.assertRaises(preprocessor.PreprocessorError) as context:
+            preprocessor.preprocess_text('\n#include "nonexistent_hdr.h"\n','code.c')
+        self.assertIn('code.c:2',str(context.exception))
+
+    def test_malformed_define_raises_an_error(self):
+        for code in ('#define F(1) 1\n','#define F(...,a) a\n'):
+            with self.assertRaises(preprocessor.PreprocessorError) as context:
+                preprocessor.preprocess_text(code,'code.c')
+            self.assertIn('code.c:1',str(context.exception))
+
+    def test_changed_header_drops_its_previous_text(self):
+        include_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree,include_dir)
+        header = os.path.join(include_dir,'values.h')
+        code = '#include <values.h>\nint value = VALUE;\n'
+
+        for mtime, value in ((0,1),(1,2)):
+            with open(header,'w') as file:
+                file.write('#define VALUE %d\n' % value)
+            os.utime(header,(mtime,mtime))
+
+            text = preprocessor.preprocess_text(code,'code.c',[include_dir])
+            self.assertIn('int value = %d;' % value,text)
+
+        self.assertEqual(preprocessor._HEADERS[header][1],'#define VALUE 2\n')
+        self.assertNotIn('#define VALUE 1\n',preprocessor._TOKENIZED)
+
+        os.remove(header)
+        with self.assertRaises(preprocessor.PreprocessorError):
+            preprocessor.preprocess_text(code,'code.c',[include_dir])
+        self.assertNotIn(header,preprocessor._HEADERS)
+
+    def test_parse_complex_code_file(self):
+        ast = parser.parse_cfile(file_path=self._complex,backend=parser.PLY_BACKEND)
+        self.assertIsInstance(ast,FileAST)
+
+    def test_same_lines_as_cpp_backend(self):
+        cpp_data = parser.get_data_from_cfile(self._complex)
+        parser.PREPROCESSOR_BACKEND = parser.PLY_BACKEND
+        try:
+            ply_data = parser.get_data_from_cfile(self._complex)
+        finally:
+            parser.PREPROCESSOR_BACKEND = parser.CPP_BACKEND
+
+        self.assertEqual(ply_data['functions'],cpp_data['functions'])
+
+    def test_parse_unsupported_code_file(self):
+        with self.assertRaises(ParseError):
+            parser.parse_cfile(file_path=self._unsupported_1,backend=parser.PLY_BACKEND)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            parser.parse_cfile(file_path=self._complex,backend='unknown')
+
+
+class TestPreprocessCache(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.mkdtemp()
+        self._header = os.path.join(self._dir,'values.h')
+        self._write_header('#define VALUE 1\n',0)
+        self._code = '#include "%s"\nint value = VALUE;\n' % self._header
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def _write_header(self,text,mtime):
+        with open(self._header,'w') as file:
+            file.write(text)
+        os.utime(self._header,(mtime,mtime))
+
+    def test_preprocessed_code_is_cached(self):
+        for backend in (parser.CPP_BACKEND,parser.PLY_BACKEND):
+            hits = parser.PREPROCESS_CACHE.hits
+            text = parser.preprocess_ctext(self._code,'code.c',backend=backend)
+
+            self.assertEqual(parser.preprocess_ctext(self._code,'code.c',backend=backend),text)
+            self.assertEqual(parser.PREPROCESS_CACHE.hits,hits + 1)
+
+    def test_cached_code_is_discarded_when_a_header_changes(self):
+        text = parser.preprocess_ctext(self._code)
+        self.assertIn('int value = 1;',text)
+
+        self._write_header('#define VALUE 2\n',1)
+        text = parser.preprocess_ctext(self._code)
+        self.assertIn('int value = 2;',text)
+
+    def test_failures_are_not_cached(self):
+        code = '#include "%s"\nint value = VALUE;\n' % os.path.join(self._dir,'missing.h')
+        hits = parser.PREPROCESS_CACHE.hits
+
+        for backend in (parser.CPP_BACKEND,parser.PLY_BACKEND):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    parser.preprocess_ctext(code,backend=backend)
+
+        self.assertEqual(parser.PREPROCESS_CACHE.hits,hits)
+
+    def test_cpp_names_the_source(self):
+        text = parser.preprocess_ctext(self._code,'code.c',backend=parser.CPP_BACKEND)
+        self.assertIn('# 2 "code.c"',text)
+
+        code = '\n#include "%s"\n' % os.path.join(self._dir,'missing.h')
+        with self.assertRaises(RuntimeError) as context:
+            parser.preprocess_ctext(code,'code.c',backend=parser.CPP_BACKEND)
+        self.assertIn('code.c:2',str(context.exception))
+
+    def test_source_file_changes_keep_the_cached_code(self):
+        source = os.path.join(self._dir,'code.c')
+        for backend in (parser.CPP_BACKEND,parser.PLY_BACKEND):
+            for mtime in (0,1):
+                with open(source,'w') as file:
+                    file.write(self._code)
+                os.utime(source,(mtime,mtime))
+
+                hits = parser.PREPROCESS_CACHE.hits
+                parser.preprocess_ctext(self._code,source,backend=backend)
+
+            self.assertEqual(parser.PREPROCESS_CACHE.hits,hits + 1)
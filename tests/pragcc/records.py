@@ -0,0 +1,69 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc.core.parser.c99.records import FunctionInfo, LoopInfo
+
+import copy
+import pickle
+import unittest
+
+
+class TestRecords(unittest.TestCase):
+
+    def setUp(self):
+        self._loop = LoopInfo(nro=0,depth=0,begin=12,end=15,function_begin=10)
+        self._function = FunctionInfo(name='main',begin=10,end=20,for_loops=[self._loop])
+
+    def test_records_do_not_have_a_dict(self):
+        self.assertFalse(hasattr(self._loop,'__dict__'))
+        self.assertFalse(hasattr(self._function,'__dict__'))
+
+    def test_loop_dict_view(self):
+        self.assertEqual(self._loop['begin'],{'relative': 2,'absolute': 12})
+        self.assertEqual(self._loop['end']['relative'],5)
+        self.assertEqual(self._loop['nro'],0)
+
+        with self.assertRaises(KeyError):
+            self._loop['function_begin']
+
+    def test_function_dict_view(self):
+        self.assertNotIn('raw',self._function)
+        self._function['raw'] = 'int main(){}'
+        self.assertEqual(self._function.get('raw'),'int main(){}')
+
+        self.assertEqual(self._function.to_dict(),{
+            'name': 'main',
+            'begin': 10,
+            'end': 20,
+            'raw': 'int main(){}',
+            'for_loops': [{
+                'nro': 0,
+                'depth': 0,
+                'begin': {'relative': 2,'absolute': 12},
+                'end': {'relative': 5,'absolute': 15}
+            }]
+        })
+
+    def test_records_can_be_pickled_and_copied(self):
+        self.assertEqual(pickle.loads(pickle.dumps(self._function)),self._function)
+
+        function = copy.deepcopy(self._function)
+        function.for_loops[0].end = 16
+        self.assertNotEqual(function,self._function)
+
+    def test_loops_are_loaded_once_on_first_access(self):
+        calls = []
+        def loader():
+            calls.append(1)
+            return [self._loop]
+
+        function = FunctionInfo(name='main',begin=10,end=20,loader=loader)
+        self.assertFalse(function.loops_loaded)
+
+        self.assertEqual(function['for_loops'],[self._loop])
+        self.assertEqual(function.for_loops,[self._loop])
+        self.assertTrue(function.loops_loaded)
+        self.assertEqual(len(calls),1)
+
+        # The loops are loaded before pickling, the loader is not pickled
+        lazy_function = FunctionInfo(name='main',begin=10,end=20,loader=loader)
+        self.assertEqual(pickle.loads(pickle.dumps(lazy_function)),function)
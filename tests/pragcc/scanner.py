@@ -0,0 +1,97 @@
+# -*- encoding: utf-8 -*-
+
+from pragcc.core.parser.c99 import scanner, parser, ast_visitor
+
+from tests.pragcc import test_data
+
+import unittest
+
+
+class TestFunctionSpans(unittest.TestCase):
+
+    def test_spans_match_the_parsed_functions(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            text = file.read()
+
+        ast = parser.parse_ctext(text)
+        functions = ast_visitor.FuncDefForVisitor.funcdefs_data(ast)
+
+        self.assertEqual(
+            [(span.name,span.begin,span.end) for span in scanner.function_spans(text)],
+            [(function.name,function.begin,function.end) for function in functions]
+        )
+
+    def test_braces_in_comments_literals_and_directives_are_ignored(self):
+        text = (
+            'int\n'
+            'f(void)\n'
+            '{ char *s = "}"; /* } */ return \'}\'; }\n'
+            '#define X \\\n'
+            '  }\n'
+            'struct S { int a; } s = { 1 };\n'
+            'struct S g(int a)\n'
+            '{\n'
+            '}\n'
+        )
+        spans = scanner.function_spans(text)
+
+        self.assertEqual(spans,[
+            scanner.FunctionSpan(name='f',begin=2,end=3,first_line=1),
+            scanner.FunctionSpan(name='g',begin=7,end=9,first_line=7)
+        ])
+
+    def test_definitions_sharing_a_line_are_not_split(self):
+        self.assertIsNone(scanner.function_spans('int a; int f(){\n}\n'))
+        self.assertIsNone(scanner.function_spans('int f(){\n} int g(){\n}\n'))
+
+    def test_unrecognized_definitions_are_reported(self):
+        self.assertIsNone(scanner.function_spans('int (*f(int a))(int)\n{\n}\n'))
+        self.assertIsNone(scanner.function_spans('int f(a)\nint a;\n{\n}\n'))
+
+    def test_conditional_compilation_is_reported(self):
+        for directive in ('#if 0','#ifdef X','#ifndef X',' # if defined(X)'):
+            text = '%s\nint f(){\n}\n#else\nint f(){\n}\n#endif\n' % directive
+            self.assertIsNone(scanner.function_spans(text))
+
+        # The conditionals inside a function body do not hide definitions
+        spans = scanner.function_spans('int f(){\n#ifdef X\n    x();\n#endif\n}\n')
+        self.assertEqual([span.name for span in spans],['f'])
+
+        # Neither are other directives which start with the same letters
+        spans = scanner.function_spans('#include <a.h>\n#ident "x"\nint f(){\n}\n')
+        self.assertEqual([span.name for span in spans],['f'])
+
+
+class TestSelectiveParsing(unittest.TestCase):
+
+    def setUp(self):
+        with open(test_data.COMPLEX_FILE_PATH,'r') as file:
+            self._text = file.read()
+
+    def test_selective_data_matches_the_whole_data(self):
+        data = parser.get_data_from_text(self._text)
+        selective_data = parser.get_data_from_text(self._text,functions=['evolve'])
+
+        self.assertEqual(selective_data['declaration'],data['declaration'])
+        self.assertEqual(selective_data['functions'],data['functions'])
+
+    def test_only_the_given_functions_are_parsed(self):
+        functions = parser.get_data_from_text(self._text,functions=['evolve'])['functions']
+
+        self.assertEqual(
+            [function.name for function in functions if function.loops_loaded],
+            ['evolve']
+        )
+
+    def test_code_that_can_not_be_scanned_is_parsed_whole(self):
+        text = test_data.SIMPLE_CODE_ALLOWED_FORMAT_2 + 'int (*f(int a))(int)\n{\n    return 0;\n}\n'
+        data = parser.get_data_from_text(text,functions=['f'])
+        self.assertEqual([function.name for function in data['functions']],['main','f'])
+
+    def test_code_with_conditional_definitions_is_parsed_whole(self):
+        text = test_data.SIMPLE_CODE_ALLOWED_FORMAT_2 + (
+            '#if 0\nint f(){\n    return 1;\n}\n#else\n'
+            'int f(){\n    return 0;\n}\n#endif\n'
+        )
+        data = parser.get_data_from_text(text,functions=['f'])
+        self.assertEqual([function.name for function in data['functions']],['main','f'])